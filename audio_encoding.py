@@ -0,0 +1,112 @@
+"""
+Inkrementelle Kodierung der Aufnahme (WAV, FLAC, Opus/OGG) für den Upload zu den STT-Diensten.
+"""
+import io
+import sys
+import time
+import wave
+
+import numpy as np
+
+from metrics import metrics
+
+try:
+    import soundfile
+except ImportError:  # libsndfile/soundfile not installed - only WAV is available
+    soundfile = None
+
+
+# Upload codecs selectable per service in the settings dialog
+CODECS = {
+    'wav': {'label': 'WAV (uncompressed)', 'mimetype': 'audio/wav'},
+    'flac': {'label': 'FLAC (lossless)', 'mimetype': 'audio/flac'},
+    'opus': {'label': 'Opus/OGG (lossy, smallest)', 'mimetype': 'audio/ogg'},
+}
+DEFAULT_CODEC = 'flac'
+
+# Opus only supports these sample rates
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def resolve_codec(codec, rate):
+    """Return the codec that can actually be used for this rate and installation"""
+    if codec not in CODECS:
+        codec = DEFAULT_CODEC
+    if codec != 'wav' and soundfile is None:
+        print(f"⚠️ soundfile is not installed, uploading WAV instead of {codec}", file=sys.stderr)
+        return 'wav'
+    if codec == 'opus' and rate not in OPUS_SAMPLE_RATES:
+        print(f"⚠️ Opus does not support {rate} Hz, using FLAC instead", file=sys.stderr)
+        return 'flac'
+    return codec
+
+
+class StreamingEncoder:
+    """Encodes PCM chunks into an in-memory container while audio is being captured.
+
+    write() is called for every captured chunk, so when the recording stops
+    only the container trailer is left to write in finish().
+    """
+
+    def __init__(self, codec, channels, rate, sample_width=2):
+        self.codec = resolve_codec(codec, rate)
+        self.mimetype = CODECS[self.codec]['mimetype']
+        self.channels = channels
+        self.rate = rate
+        self.sample_width = sample_width
+        self.buffer = io.BytesIO()
+        self.pcm_bytes = 0
+        self._finished = False
+
+        if self.codec == 'wav':
+            self._writer = wave.open(self.buffer, 'wb')
+            self._writer.setnchannels(channels)
+            self._writer.setsampwidth(sample_width)
+            self._writer.setframerate(rate)
+        else:
+            format_name, subtype = ('FLAC', 'PCM_16') if self.codec == 'flac' else ('OGG', 'OPUS')
+            self._writer = soundfile.SoundFile(
+                self.buffer,
+                mode='w',
+                samplerate=rate,
+                channels=channels,
+                format=format_name,
+                subtype=subtype
+            )
+
+    def write(self, pcm):
+        """Encode one chunk of interleaved int16 PCM"""
+        if not pcm:
+            return
+        self.pcm_bytes += len(pcm)
+        if self.codec == 'wav':
+            self._writer.writeframes(pcm)
+        else:
+            self._writer.write(np.frombuffer(pcm, dtype=np.int16).reshape(-1, self.channels))
+
+    def finish(self):
+        """Finalize the container and return a BytesIO positioned at 0"""
+        if not self._finished:
+            start = time.perf_counter()
+            self._writer.close()
+            self._finished = True
+            metrics.observe(f"encode.{self.codec}.finish_ms", (time.perf_counter() - start) * 1000)
+            encoded_bytes = self.buffer.getbuffer().nbytes
+            if self.pcm_bytes:
+                metrics.observe(f"encode.{self.codec}.ratio", encoded_bytes / float(self.pcm_bytes))
+        self.buffer.seek(0)
+        return self.buffer
+
+    def close(self):
+        """Discard the recording: close the container writer and free the buffer"""
+        if not self._finished:
+            self._writer.close()
+            self._finished = True
+        self.buffer.close()
+
+
+def encode_pcm(pcm, codec, channels, rate, sample_width=2):
+    """Encode a complete PCM buffer in one go. Returns (BytesIO, mimetype)"""
+    encoder = StreamingEncoder(codec, channels, rate, sample_width)
+    encoder.write(pcm)
+    return encoder.finish(), encoder.mimetype
@@ -0,0 +1,407 @@
+"""
+Langlebige Audio-Engine: eine PyAudio-Instanz und ein vorab geöffneter Eingabestream für alle Diktate.
+"""
+import queue
+import sys
+import threading
+import wave
+
+import pyaudio
+
+from audio_processing import negotiate_capture_format
+from audio_utils import PcmRingBuffer
+from metrics import metrics
+
+# 'callback': PortAudio pushes chunks from its own thread, 'blocking': stream.read() in the recording thread
+CAPTURE_MODES = ('callback', 'blocking')
+DEFAULT_CAPTURE_MODE = 'callback'
+
+# Audio the capture queue can hold before chunks are dropped (and counted)
+CAPTURE_QUEUE_SECONDS = 2.0
+# How long read() waits for the next chunk before returning an empty one
+READ_TIMEOUT_SECONDS = 0.5
+
+
+def empty_capture_stats():
+    return {'input_overflows': 0, 'input_underflows': 0, 'dropped_chunks': 0}
+
+
+def record_capture_stats(stats):
+    """Add the lost-audio counters of one recording to the metrics and log them"""
+    for name, value in stats.items():
+        metrics.increment(f"capture.{name}", value)
+    if any(stats.values()):
+        print(
+            f"⚠️ Capture lost audio: {stats['input_overflows']} input overflows, "
+            f"{stats['input_underflows']} underflows, {stats['dropped_chunks']} dropped chunks",
+            file=sys.stderr
+        )
+
+
+class AudioEngine:
+    """Owns the single PyAudio instance of the app and keeps the input stream warm.
+
+    PortAudio initialization, device enumeration and opening the input stream
+    happen once (warm_up() at startup). Between dictations the stream is only
+    paused, so starting a recording is a cheap start_stream() call.
+
+    With pre-roll enabled the stream keeps running: a monitor thread reads it
+    continuously into a fixed-size PcmRingBuffer, and start_capture() hands
+    the last preroll_ms of audio to the recording before the live chunks.
+
+    In callback mode PortAudio delivers every chunk on its own thread to
+    _on_input(), which only pushes it into a bounded queue (or the pre-roll
+    ring) and returns. Capture then no longer depends on the recording
+    thread getting the GIL in time. Input overflows/underflows reported by
+    PortAudio and chunks dropped because the queue was full are counted per
+    recording in capture_stats.
+    """
+
+    def __init__(self, chunk=1024, sample_format=pyaudio.paInt16, capture_mode=DEFAULT_CAPTURE_MODE):
+        self.chunk = chunk
+        self.sample_format = sample_format
+        self.capture_mode = capture_mode if capture_mode in CAPTURE_MODES else DEFAULT_CAPTURE_MODE
+        self._lock = threading.RLock()
+        self._pa = None
+        self._stream = None
+        self._stream_profile = None
+        self.capture_rate = None
+        self.capture_channels = None
+
+        # Pre-roll state
+        self.preroll_ms = 0
+        self._ring = None
+        self._monitor_thread = None
+        self._monitor_running = False
+        self._recording = False
+        self._capture_queue = queue.Queue()
+        # Guards the hand-over between ring buffer and capture queue
+        self._handover_lock = threading.Lock()
+        self._stats = empty_capture_stats()
+
+        self.cues = CuePlayer(self)
+
+    @property
+    def pa(self):
+        """The shared PyAudio instance (created on first use)"""
+        with self._lock:
+            if self._pa is None:
+                self._pa = pyaudio.PyAudio()
+            return self._pa
+
+    @property
+    def sample_width(self):
+        return pyaudio.get_sample_size(self.sample_format)
+
+    @property
+    def capture_stats(self):
+        """Overflow/underflow/drop counters of the current (or last) recording"""
+        return dict(self._stats)
+
+    @property
+    def preroll_bytes(self):
+        """Memory held by the pre-roll ring buffer"""
+        return self._ring.capacity if self._ring is not None else 0
+
+    def capture_format(self, profile):
+        """(rate, channels) the input stream for profile was opened with, None if it is not open"""
+        with self._lock:
+            if self._stream is not None and self._stream_profile == (profile['rate'], profile['channels']):
+                return self.capture_rate, self.capture_channels
+            return None
+
+    def warm_up(self, profile, preroll_ms=0, capture_mode=None):
+        """Initialize PortAudio, pre-open the input stream and configure pre-roll"""
+        try:
+            if capture_mode is not None:
+                self.set_capture_mode(capture_mode)
+            self.configure_preroll(profile, preroll_ms)
+        except Exception as e:
+            print(f"⚠️ Audio warm-up failed: {str(e)}", file=sys.stderr)
+
+    def set_capture_mode(self, capture_mode):
+        """Switch between callback and blocking capture (reopens the stream on next use)"""
+        with self._lock:
+            capture_mode = capture_mode if capture_mode in CAPTURE_MODES else DEFAULT_CAPTURE_MODE
+            if capture_mode != self.capture_mode:
+                self._stop_monitor()
+                self._close_stream()
+                self.capture_mode = capture_mode
+
+    def open_input(self, profile):
+        """Make sure a (paused) input stream for profile exists. Returns (rate, channels)"""
+        with self._lock:
+            profile_key = (profile['rate'], profile['channels'])
+            if self._stream is not None and self._stream_profile == profile_key:
+                return self.capture_rate, self.capture_channels
+
+            self._stop_monitor()
+            self._close_stream()
+            rate, channels = negotiate_capture_format(self.pa, profile, self.sample_format)
+            self._capture_queue = queue.Queue(maxsize=max(4, int(CAPTURE_QUEUE_SECONDS * rate / self.chunk)))
+            self._stream = self.pa.open(
+                format=self.sample_format,
+                channels=channels,
+                rate=rate,
+                frames_per_buffer=self.chunk,
+                input=True,
+                start=False,
+                stream_callback=self._on_input if self.capture_mode == 'callback' else None
+            )
+            self._stream_profile = profile_key
+            self.capture_rate = rate
+            self.capture_channels = channels
+            print(f"🎙️ Input stream ready: {rate} Hz, {channels} ch ({self.capture_mode} mode)", file=sys.stderr)
+            if self.preroll_ms:
+                self._allocate_ring()
+                self._start_monitor()
+            return rate, channels
+
+    def configure_preroll(self, profile, preroll_ms):
+        """Enable (preroll_ms > 0) or disable the always-on pre-roll buffer"""
+        with self._lock:
+            self.open_input(profile)
+            preroll_ms = int(preroll_ms or 0)
+            if preroll_ms == self.preroll_ms and (not preroll_ms or self._monitor_running):
+                return
+            self._stop_monitor()
+            self.preroll_ms = preroll_ms
+            self._ring = None
+            if preroll_ms:
+                self._allocate_ring()
+                self._start_monitor()
+                print(
+                    f"⏪ Pre-roll enabled: {preroll_ms} ms, {self.preroll_bytes / 1024:.0f} KiB ring buffer",
+                    file=sys.stderr
+                )
+
+    def _allocate_ring(self):
+        frame_bytes = self.capture_channels * self.sample_width
+        capacity = int(self.capture_rate * self.preroll_ms / 1000) * frame_bytes
+        self._ring = PcmRingBuffer(capacity, frame_bytes)
+
+    # --- pre-roll monitor / callback -----------------------------------------
+
+    def _start_monitor(self):
+        if self._stream.is_stopped():
+            self._stream.start_stream()
+        self._monitor_running = True
+        if self.capture_mode == 'callback':
+            # _on_input fills the ring buffer, no reader thread needed
+            return
+        self._monitor_thread = threading.Thread(target=self._monitor_loop, name="audio-preroll", daemon=True)
+        self._monitor_thread.start()
+
+    def _stop_monitor(self):
+        if self._monitor_running or self._monitor_thread is not None:
+            self._monitor_running = False
+            if self._monitor_thread is not None:
+                self._monitor_thread.join(timeout=1)
+                self._monitor_thread = None
+            if self._stream is not None and not self._stream.is_stopped():
+                self._stream.stop_stream()
+
+    def _monitor_loop(self):
+        """Sole reader of the stream while pre-roll is on (blocking mode)"""
+        while self._monitor_running:
+            try:
+                data = self._stream.read(self.chunk, exception_on_overflow=False)
+            except Exception as e:
+                print(f"⚠️ Pre-roll read error: {str(e)}", file=sys.stderr)
+                break
+            self._deliver(data)
+        self._monitor_running = False
+
+    def _on_input(self, in_data, frame_count, time_info, status_flags):
+        """PortAudio stream callback: hand the chunk over and return immediately"""
+        if status_flags & pyaudio.paInputOverflow:
+            self._stats['input_overflows'] += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self._stats['input_underflows'] += 1
+        self._deliver(in_data)
+        return (None, pyaudio.paContinue)
+
+    def _deliver(self, data):
+        """Route a captured chunk to the recording or the pre-roll ring"""
+        with self._handover_lock:
+            if self._recording:
+                try:
+                    self._capture_queue.put_nowait(data)
+                except queue.Full:
+                    # The recording thread fell behind; count instead of blocking PortAudio
+                    self._stats['dropped_chunks'] += 1
+            elif self._ring is not None and self._monitor_running:
+                self._ring.write(data)
+
+    # --- capture API -------------------------------------------------------
+
+    def start_capture(self, profile):
+        """Resume the pre-opened input stream. Returns (rate, channels)"""
+        with self._lock:
+            rate, channels = self.open_input(profile)
+            with self._handover_lock:
+                self._stats = empty_capture_stats()
+                if self._monitor_running:
+                    # Audio from before F2 goes first, then the live chunks
+                    preroll = self._ring.snapshot()
+                    self._ring.clear()
+                    if preroll:
+                        self._capture_queue.put_nowait(preroll)
+                # Chunks arrive through the capture queue unless the recording thread reads the stream itself
+                self._recording = self._monitor_running or self.capture_mode == 'callback'
+            if self._stream.is_stopped():
+                self._stream.start_stream()
+            return rate, channels
+
+    def read(self):
+        """Read the next chunk of captured PCM (b'' if none arrived in time)"""
+        if self._recording:
+            try:
+                return self._capture_queue.get(timeout=READ_TIMEOUT_SECONDS)
+            except queue.Empty:
+                return b''
+        return self._stream.read(self.chunk, exception_on_overflow=False)
+
+    def stop_capture(self):
+        """Stop handing audio to the recording but keep the stream open for the next dictation"""
+        with self._lock:
+            if self._recording:
+                with self._handover_lock:
+                    self._recording = False
+                    # Drop chunks the recording did not consume
+                    while not self._capture_queue.empty():
+                        self._capture_queue.get_nowait()
+            if not self._monitor_running and self._stream is not None and not self._stream.is_stopped():
+                self._stream.stop_stream()
+            record_capture_stats(self.capture_stats)
+
+    def release_input(self):
+        """Close the input stream (e.g. when a capture subprocess owns the microphone)"""
+        with self._lock:
+            self._stop_monitor()
+            self._close_stream()
+            self.preroll_ms = 0
+            self._ring = None
+
+    def preload_sounds(self, sound_files):
+        """Decode sound cues into memory once so playing them never touches the disk"""
+        for sound_file in sound_files:
+            self.cues.preload(sound_file)
+
+    def play_sound(self, sound_file):
+        """Play a sound cue asynchronously on the shared output stream"""
+        self.cues.play(sound_file)
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                if not self._stream.is_stopped():
+                    self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                print(f"⚠️ Error closing input stream: {str(e)}", file=sys.stderr)
+            self._stream = None
+            self._stream_profile = None
+
+    def close(self):
+        """Close the input stream and terminate PortAudio"""
+        with self._lock:
+            self.cues.close()
+            self._stop_monitor()
+            self._close_stream()
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+
+
+class CuePlayer:
+    """Plays preloaded sound cues on a background thread.
+
+    Cue PCM is decoded once and kept in memory. A single output stream is
+    reused for all cues with the same format and is paused while idle, so
+    play() returns immediately and never blocks capture or transcription.
+    """
+
+    def __init__(self, engine):
+        self._engine = engine
+        self._cues = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stream = None
+        self._stream_format = None
+
+    def preload(self, sound_file):
+        """Decode a WAV file into memory. Returns the cached cue"""
+        cue = self._cues.get(sound_file)
+        if cue is None:
+            wf = wave.open(sound_file, 'rb')
+            try:
+                cue = (
+                    (wf.getsampwidth(), wf.getnchannels(), wf.getframerate()),
+                    wf.readframes(wf.getnframes())
+                )
+            finally:
+                wf.close()
+            self._cues[sound_file] = cue
+        return cue
+
+    def play(self, sound_file):
+        try:
+            cue = self.preload(sound_file)
+        except Exception as e:
+            print(f"Error playing sound: {str(e)}")
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audio-cues", daemon=True)
+            self._thread.start()
+        self._queue.put(cue)
+
+    def _output_stream(self, cue_format):
+        if self._stream is None or self._stream_format != cue_format:
+            self._close_stream()
+            sample_width, channels, rate = cue_format
+            pa = self._engine.pa
+            self._stream = pa.open(
+                format=pa.get_format_from_width(sample_width),
+                channels=channels,
+                rate=rate,
+                output=True,
+                start=False
+            )
+            self._stream_format = cue_format
+        return self._stream
+
+    def _run(self):
+        while True:
+            cue = self._queue.get()
+            if cue is None:
+                break
+            cue_format, pcm = cue
+            try:
+                stream = self._output_stream(cue_format)
+                if stream.is_stopped():
+                    stream.start_stream()
+                stream.write(pcm)
+                if self._queue.empty():
+                    # Pause while idle, the stream stays open for the next cue
+                    stream.stop_stream()
+            except Exception as e:
+                print(f"Error playing sound: {str(e)}")
+                self._close_stream()
+        self._close_stream()
+
+    def _close_stream(self):
+        if self._stream is not None:
+            try:
+                if not self._stream.is_stopped():
+                    self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+            self._stream_format = None
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=2)
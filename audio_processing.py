@@ -0,0 +1,170 @@
+"""
+Aufnahmeprofile sowie vektorisierte Kanal-/Samplerate-Konvertierung (NumPy).
+"""
+import sys
+from math import gcd
+
+import numpy as np
+
+
+# Capture profiles selectable in the settings dialog
+CAPTURE_PROFILES = {
+    'speech_16k_mono': {
+        'label': 'Speech (16 kHz mono, recommended)',
+        'rate': 16000,
+        'channels': 1,
+    },
+    'high_quality': {
+        'label': 'High quality (44.1 kHz stereo)',
+        'rate': 44100,
+        'channels': 2,
+    },
+}
+DEFAULT_CAPTURE_PROFILE = 'speech_16k_mono'
+
+
+def get_capture_profile(name):
+    """Return the profile dict for name, falling back to the default profile"""
+    return CAPTURE_PROFILES.get(name) or CAPTURE_PROFILES[DEFAULT_CAPTURE_PROFILE]
+
+
+def negotiate_capture_format(p, profile, sample_format):
+    """Find the (rate, channels) the input device should be opened with.
+
+    Prefers the profile's native format. If the device refuses it, falls back
+    to the device's default rate and up to two channels; PcmConverter then
+    turns that into the profile format.
+    """
+    try:
+        device = p.get_default_input_device_info()
+    except Exception as e:
+        print(f"⚠️ Could not query default input device: {str(e)}", file=sys.stderr)
+        return profile['rate'], profile['channels']
+
+    try:
+        if p.is_format_supported(
+            profile['rate'],
+            input_device=device['index'],
+            input_channels=profile['channels'],
+            input_format=sample_format
+        ):
+            return profile['rate'], profile['channels']
+    except ValueError:
+        # PyAudio signals "unsupported" by raising ValueError
+        pass
+
+    rate = int(device.get('defaultSampleRate') or 44100)
+    channels = max(1, min(int(device.get('maxInputChannels') or 1), 2))
+    print(
+        f"🎚️ Device does not support {profile['rate']} Hz/{profile['channels']} ch natively, "
+        f"capturing {rate} Hz/{channels} ch and converting",
+        file=sys.stderr
+    )
+    return rate, channels
+
+
+class StreamingResampler:
+    """Polyphase FIR resampler for int16/float frames, usable chunk by chunk.
+
+    The rate ratio is reduced to up/down integers. A Kaiser-windowed sinc
+    low-pass is split into `up` phases of `taps_per_phase` coefficients, and
+    every output sample is one dot product of an input window with the phase
+    filter. All output samples of a chunk are computed in one vectorized
+    step; the last taps_per_phase - 1 input frames are kept as history so
+    chunk boundaries are seamless.
+    """
+
+    def __init__(self, src_rate, dst_rate, channels, taps_per_phase=32, rolloff=0.9, beta=8.0):
+        divisor = gcd(int(src_rate), int(dst_rate))
+        self.up = int(dst_rate) // divisor
+        self.down = int(src_rate) // divisor
+        self.channels = channels
+        self.taps = taps_per_phase
+
+        # Prototype low-pass at the (virtual) upsampled rate
+        length = self.taps * self.up
+        cutoff = 0.5 / max(self.up, self.down) * rolloff
+        n = np.arange(length) - (length - 1) / 2.0
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta) * self.up
+
+        # bank[p, i] = h[p + i*up]; reversed so a forward input window can be dotted directly
+        bank = prototype.reshape(self.taps, self.up).T
+        self._bank = np.ascontiguousarray(bank[:, ::-1]).astype(np.float32)
+
+        self._history = np.zeros((self.taps - 1, channels), dtype=np.float32)
+        self._consumed = 0      # absolute index of the first sample after the history
+        self._next_output = 0   # absolute index of the next output sample
+
+    def process(self, samples):
+        """Resample a float32 array of shape (frames, channels)"""
+        buffer = np.concatenate((self._history, samples), axis=0)
+        buffer_start = self._consumed - (self.taps - 1)
+        available = self._consumed + len(samples)
+
+        # Output n needs input up to floor(n * down / up)
+        last_output = (available * self.up - 1) // self.down
+        outputs = np.arange(self._next_output, last_output + 1, dtype=np.int64)
+
+        if len(outputs):
+            positions = outputs * self.down
+            base = positions // self.up
+            phases = positions % self.up
+            windows = np.lib.stride_tricks.sliding_window_view(buffer, self.taps, axis=0)
+            selected = windows[base - (self.taps - 1) - buffer_start]
+            result = np.einsum('nct,nt->nc', selected, self._bank[phases])
+            self._next_output = int(outputs[-1]) + 1
+        else:
+            result = np.zeros((0, self.channels), dtype=np.float32)
+
+        self._history = buffer[-(self.taps - 1):]
+        self._consumed = available
+        return result
+
+    def flush(self):
+        """Push zeros through the filter so the tail of the signal comes out"""
+        return self.process(np.zeros((self.taps // 2, self.channels), dtype=np.float32))
+
+
+class PcmConverter:
+    """Converts captured int16 PCM chunks to the profile's rate and channel count"""
+
+    def __init__(self, src_rate, src_channels, dst_rate, dst_channels):
+        self.src_channels = src_channels
+        self.dst_channels = dst_channels
+        self.passthrough = src_rate == dst_rate and src_channels == dst_channels
+        self.resampler = None
+        if src_rate != dst_rate:
+            self.resampler = StreamingResampler(src_rate, dst_rate, min(src_channels, dst_channels))
+
+    def _mix(self, samples):
+        if self.src_channels == self.dst_channels:
+            return samples
+        if self.dst_channels == 1:
+            # Downmix: average all channels
+            return samples.mean(axis=1, keepdims=True)
+        # Upmix mono to the requested channel count
+        return np.repeat(samples[:, :1], self.dst_channels, axis=1)
+
+    def _to_bytes(self, samples):
+        if samples.shape[1] != self.dst_channels:
+            # Mono was resampled on its own; spread it to the output channels
+            samples = np.repeat(samples, self.dst_channels, axis=1)
+        return np.clip(np.rint(samples), -32768, 32767).astype(np.int16).tobytes()
+
+    def process(self, data):
+        """Convert one chunk of interleaved int16 PCM bytes"""
+        if self.passthrough:
+            return data
+        samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self.src_channels).astype(np.float32)
+        if self.dst_channels < self.src_channels:
+            # Downmix before resampling so the filter runs on fewer channels
+            samples = self._mix(samples)
+        if self.resampler is not None:
+            samples = self.resampler.process(samples)
+        return self._to_bytes(samples)
+
+    def flush(self):
+        """Return any samples still held back by the resampler"""
+        if self.resampler is None:
+            return b''
+        return self._to_bytes(self.resampler.flush())
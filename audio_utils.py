@@ -0,0 +1,157 @@
+"""
+Hilfsfunktionen für Audio-Daten im Speicher (PCM-Puffer, WAV-Container).
+"""
+import io
+import os
+import wave
+
+
+class AudioBuffer:
+    """Captured PCM audio plus the format needed to interpret it.
+
+    pcm may be bytes or a memoryview into a CaptureArena; in that case the
+    arena is kept alive until release() is called.
+    """
+
+    def __init__(self, pcm, channels, rate, sample_width=2, arena=None):
+        self.pcm = pcm
+        self.channels = channels
+        self.rate = rate
+        self.sample_width = sample_width
+        self._arena = arena
+
+    @property
+    def frame_count(self):
+        return len(self.pcm) // (self.channels * self.sample_width)
+
+    @property
+    def duration_seconds(self):
+        return self.frame_count / float(self.rate) if self.rate else 0.0
+
+    def to_wav_buffer(self):
+        """Wrap the PCM in a WAV container held entirely in memory"""
+        return build_wav_buffer(self.pcm, self.channels, self.rate, self.sample_width)
+
+    def save_wav(self, path):
+        """Write the recording to disk (only used for DEBUG_KEEP_AUDIO)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        wf = wave.open(path, 'wb')
+        try:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(self.sample_width)
+            wf.setframerate(self.rate)
+            wf.writeframes(self.pcm)
+        finally:
+            wf.close()
+        return path
+
+    def release(self):
+        """Free the capture memory once the recording is no longer needed"""
+        if self._arena is not None:
+            self.pcm = b''
+            self._arena.close()
+            self._arena = None
+
+
+def build_wav_buffer(pcm, channels, rate, sample_width=2):
+    """Return a BytesIO positioned at 0 that contains a complete WAV file"""
+    buffer = io.BytesIO()
+    wf = wave.open(buffer, 'wb')
+    try:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sample_width)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+    finally:
+        wf.close()
+    buffer.seek(0)
+    return buffer
+
+
+def as_bytes_like(audio_buffer):
+    """Return a bytes-like view of a BytesIO/bytes/memoryview without copying where possible"""
+    if hasattr(audio_buffer, 'getbuffer'):
+        return audio_buffer.getbuffer()
+    if isinstance(audio_buffer, (bytes, bytearray, memoryview)):
+        return audio_buffer
+    if hasattr(audio_buffer, 'read'):
+        return audio_buffer.read()
+    raise TypeError(f"Unsupported audio buffer type: {type(audio_buffer).__name__}")
+
+
+def as_file_object(audio_buffer):
+    """Return a readable file object positioned at 0 for the given buffer"""
+    if hasattr(audio_buffer, 'seek') and hasattr(audio_buffer, 'read'):
+        audio_buffer.seek(0)
+        return audio_buffer
+    return io.BytesIO(audio_buffer)
+
+
+# Dateiendungen für die Upload-Dateinamen (OpenAI erkennt das Format anhand der Endung)
+MIMETYPE_EXTENSIONS = {
+    'audio/wav': 'wav',
+    'audio/flac': 'flac',
+    'audio/ogg': 'ogg',
+}
+
+
+def upload_filename(mimetype):
+    return f"audio.{MIMETYPE_EXTENSIONS.get(mimetype, 'wav')}"
+
+
+def read_audio_file(path):
+    """Read an audio file into memory (blocking - run it on an executor)"""
+    with open(path, 'rb') as audio:
+        return audio.read()
+
+
+class PcmRingBuffer:
+    """Fixed-size ring buffer for PCM bytes.
+
+    The storage is allocated once; write() copies into it with slice
+    assignment, so keeping the buffer filled allocates nothing per chunk.
+    """
+
+    def __init__(self, capacity_bytes, frame_bytes=2):
+        capacity_bytes = max(frame_bytes, capacity_bytes - capacity_bytes % frame_bytes)
+        self._buffer = bytearray(capacity_bytes)
+        self._view = memoryview(self._buffer)
+        self._write_pos = 0
+        self._filled = 0
+
+    @property
+    def capacity(self):
+        return len(self._buffer)
+
+    def __len__(self):
+        return self._filled
+
+    def write(self, data):
+        """Append data, overwriting the oldest bytes when full"""
+        data = memoryview(data).cast('B')
+        capacity = len(self._buffer)
+        if len(data) >= capacity:
+            # Only the newest capacity bytes can survive
+            self._view[:] = data[len(data) - capacity:]
+            self._write_pos = 0
+            self._filled = capacity
+            return
+        first = min(len(data), capacity - self._write_pos)
+        self._view[self._write_pos:self._write_pos + first] = data[:first]
+        rest = len(data) - first
+        if rest:
+            self._view[:rest] = data[first:]
+        self._write_pos = (self._write_pos + len(data)) % capacity
+        self._filled = min(capacity, self._filled + len(data))
+
+    def snapshot(self):
+        """Return the buffered bytes, oldest first"""
+        if self._filled < len(self._buffer):
+            return bytes(self._view[self._write_pos - self._filled:self._write_pos])
+        return bytes(self._view[self._write_pos:]) + bytes(self._view[:self._write_pos])
+
+    def clear(self):
+        self._write_pos = 0
+        self._filled = 0
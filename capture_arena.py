@@ -0,0 +1,103 @@
+"""
+Vorab reservierte Capture-Arena für Aufnahmen: RAM bis zu einer Obergrenze, danach Auslagerung in eine
+Temp-Datei, die zum Lesen memory-mapped wird. Nachgelagerte Stufen erhalten einen zero-copy memoryview.
+"""
+import mmap
+import sys
+import tempfile
+
+from metrics import metrics
+
+DEFAULT_RAM_CAP_BYTES = 128 * 1024 * 1024  # audio kept in RAM before spilling to disk
+
+
+def _round_up(value, step):
+    return ((value + step - 1) // step) * step
+
+
+class CaptureArena:
+    """Contiguous, append-only buffer for captured PCM.
+
+    The RAM region is one anonymous mmap reserved at ram_cap bytes, so
+    appending never reallocates or copies earlier audio (unlike a list of
+    chunks plus b''.join). Physical pages are only allocated as they are
+    written, so a short dictation stays resident at its own size. On Linux
+    and macOS the untouched rest costs nothing; on Windows the whole
+    mapping is charged against the commit limit (pagefile) up front.
+
+    Once ram_cap is reached the RAM region is written to a temporary file
+    and freed; further audio is appended to that file. getbuffer() then
+    memory-maps the file, so a long dictation is paged in from disk only as
+    far as a consumer reads it.
+
+    The capture thread appends with write(). Readers call getbuffer() after
+    capture for a zero-copy memoryview of everything written.
+    """
+
+    def __init__(self, ram_cap_bytes=DEFAULT_RAM_CAP_BYTES):
+        self.ram_cap_bytes = _round_up(max(ram_cap_bytes, mmap.PAGESIZE), mmap.PAGESIZE)
+        self._map = mmap.mmap(-1, self.ram_cap_bytes)
+        self._size = 0
+        self._spill_file = None
+        self._exported = None
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def spilled(self):
+        return self._spill_file is not None
+
+    def _spill_to_disk(self):
+        """Move the RAM region into a temp file and free it (happens once per recording)"""
+        self._spill_file = tempfile.TemporaryFile(prefix="voicetyper-capture-")
+        with memoryview(self._map) as view:
+            self._spill_file.write(view[:self._size])
+        self._map.close()
+        self._map = None
+        metrics.increment("capture.arena_spills")
+        print(
+            f"💾 Capture exceeded {self.ram_cap_bytes // (1024 * 1024)} MiB RAM cap, spilling to a temp file",
+            file=sys.stderr
+        )
+
+    def write(self, data):
+        """Copy data to the end of the arena"""
+        nbytes = len(data)
+        if not nbytes:
+            return
+        if self._spill_file is None and self._size + nbytes > self.ram_cap_bytes:
+            self._spill_to_disk()
+        if self._spill_file is None:
+            self._map[self._size:self._size + nbytes] = data
+        else:
+            self._spill_file.write(data)
+        self._size += nbytes
+
+    def getbuffer(self):
+        """Zero-copy read-only view of everything written so far.
+
+        Call once capture is finished; the arena does not accept writes afterwards.
+        """
+        if self._exported is None:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+                self._map = mmap.mmap(self._spill_file.fileno(), self._size, access=mmap.ACCESS_READ) if self._size else None
+            self._exported = memoryview(self._map)[:self._size].toreadonly() if self._map is not None else memoryview(b'')
+        return self._exported
+
+    def close(self):
+        """Release the memory (and temp file). Views from getbuffer() become invalid"""
+        if self._exported is not None:
+            self._exported.release()
+            self._exported = None
+        if self._map is not None:
+            try:
+                self._map.close()
+                self._map = None
+            except BufferError:
+                # A consumer still holds a view; garbage collection unmaps it later
+                pass
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
@@ -0,0 +1,286 @@
+"""
+Optionale Audioaufnahme in einem eigenen Prozess: PCM läuft über einen Ringpuffer in Shared Memory,
+damit Tk-UI, Hotkeys und Nachbearbeitung im Hauptprozess die Aufnahme nicht ausbremsen (GIL).
+"""
+import multiprocessing
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import pyaudio
+
+from audio_engine import empty_capture_stats, record_capture_stats
+from audio_processing import negotiate_capture_format
+
+# Header slot 0: total bytes ever written (only the capture process writes it)
+HEADER_BYTES = 64
+# Sized for the highest device fallback rate we expect (96 kHz stereo), ~5 s at 48 kHz stereo
+DEFAULT_RING_BYTES = 96000 * 2 * 2 * 5 // 2
+# How long read() waits for new audio before returning an empty chunk
+READ_TIMEOUT_SECONDS = 0.5
+# Start-up of the child (PortAudio init, device enumeration) and replies to control messages
+STARTUP_TIMEOUT_SECONDS = 15
+REPLY_TIMEOUT_SECONDS = 5
+
+
+class SharedPcmRing:
+    """Single-producer/single-consumer PCM ring buffer in shared memory.
+
+    The producer copies each chunk into the data area and then publishes it
+    by advancing the write counter in the header. The consumer keeps its own
+    read position and gets memoryviews straight into the shared block, so
+    the audio is never copied on the way into the main process. If the
+    consumer falls more than capacity bytes behind, the overwritten bytes
+    are skipped and reported as lost.
+    """
+
+    def __init__(self, capacity_bytes=DEFAULT_RING_BYTES, name=None):
+        # A multiple of 4 keeps both mono and stereo int16 frames aligned across the wrap
+        self.capacity = capacity_bytes - capacity_bytes % 4
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + self.capacity)
+        else:
+            # The spawned child shares the parent's resource tracker, so attaching needs no cleanup
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._header = self._shm.buf[:HEADER_BYTES].cast('Q')
+        self._data = self._shm.buf[HEADER_BYTES:HEADER_BYTES + self.capacity]
+        if self._owner:
+            self._header[0] = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def written(self):
+        return self._header[0]
+
+    def write(self, data):
+        """Producer side: append a chunk and publish it"""
+        data = memoryview(data).cast('B')
+        written = self._header[0]
+        if len(data) > self.capacity:
+            written += len(data) - self.capacity
+            data = data[len(data) - self.capacity:]
+        start = written % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._data[start:start + first] = data[:first]
+        if first < len(data):
+            self._data[:len(data) - first] = data[first:]
+        self._header[0] = written + len(data)
+
+    def read(self, position, max_bytes):
+        """Consumer side: return (view, new_position, lost_bytes) for data after position.
+
+        The view is only valid until the producer wraps around to it again.
+        """
+        written = self._header[0]
+        lost = 0
+        if written - position > self.capacity:
+            lost = written - self.capacity - position
+            position = written - self.capacity
+        start = position % self.capacity
+        count = min(written - position, self.capacity - start, max_bytes)
+        return self._data[start:start + count], position + count, lost
+
+    def close(self):
+        self._header.release()
+        self._data.release()
+        try:
+            self._shm.close()
+        except BufferError:
+            # A consumer still holds a view; the mapping goes away with it
+            pass
+        if self._owner:
+            self._shm.unlink()
+
+
+def _capture_main(ring_name, ring_bytes, conn, chunk, data_ready):
+    """Entry point of the capture process: serve start/stop/quit messages.
+
+    data_ready is set after every chunk written to the ring, so the main
+    process can block on it instead of polling.
+    """
+    ring = SharedPcmRing(ring_bytes, name=ring_name)
+    pa = pyaudio.PyAudio()
+    stream = None
+    stream_key = None
+    conn.send(('ready',))
+    try:
+        while True:
+            message = conn.recv()
+            command = message[0]
+            if command == 'quit':
+                break
+            if command == 'stop':
+                if stream is not None and not stream.is_stopped():
+                    stream.stop_stream()
+                conn.send(('stopped', ring.written))
+                continue
+            if command != 'start':
+                continue
+
+            profile = message[1]
+            try:
+                if stream is None or stream_key != (profile['rate'], profile['channels']):
+                    if stream is not None:
+                        stream.close()
+                    rate, channels = negotiate_capture_format(pa, profile, pyaudio.paInt16)
+                    stream = pa.open(
+                        format=pyaudio.paInt16,
+                        channels=channels,
+                        rate=rate,
+                        frames_per_buffer=chunk,
+                        input=True,
+                        start=False
+                    )
+                    stream_key = (profile['rate'], profile['channels'])
+                stream.start_stream()
+            except Exception as e:
+                if stream is not None:
+                    try:
+                        stream.close()
+                    except Exception:
+                        pass
+                stream = None
+                stream_key = None
+                conn.send(('error', str(e)))
+                continue
+            conn.send(('started', rate, channels, ring.written))
+
+            # This process has its own GIL, so reads are never delayed by the UI
+            while not conn.poll():
+                ring.write(stream.read(chunk, exception_on_overflow=False))
+                data_ready.set()
+    finally:
+        if stream is not None:
+            stream.close()
+        pa.terminate()
+        ring.close()
+
+
+class CaptureProcess:
+    """Main-process handle of the capture subprocess.
+
+    Offers the same capture API as AudioEngine (start_capture/read/
+    stop_capture/capture_stats), so record_speech can use either. Recording
+    is driven by start/stop messages over a pipe; the PCM itself only moves
+    through the shared-memory ring, and an Event wakes read() when a new
+    chunk has been published.
+    """
+
+    sample_width = 2
+
+    def __init__(self, chunk=1024, ring_bytes=DEFAULT_RING_BYTES):
+        self.chunk = chunk
+        self.ring_bytes = ring_bytes
+        self._ring = None
+        self._process = None
+        self._conn = None
+        self._data_ready = None
+        self._position = 0
+        self._chunk_bytes = chunk * 2
+        self._stats = empty_capture_stats()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def capture_stats(self):
+        return dict(self._stats)
+
+    def start(self):
+        """Spawn the capture process (no-op if it is already running)"""
+        with self._lock:
+            if not self.is_running:
+                self._spawn()
+        return self
+
+    def _spawn(self):
+        self.close()
+        # spawn: forking a process that runs Tk and several threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self._ring = SharedPcmRing(self.ring_bytes)
+        self._conn, child_conn = context.Pipe()
+        self._data_ready = context.Event()
+        self._process = context.Process(
+            target=_capture_main,
+            args=(self._ring.name, self._ring.capacity, child_conn, self.chunk, self._data_ready),
+            name="voicetyper-capture",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._expect('ready', STARTUP_TIMEOUT_SECONDS)
+        print(f"🎙️ Capture process started (pid {self._process.pid}, {self._ring.capacity // 1024} KiB shared ring)", file=sys.stderr)
+
+    def _expect(self, reply, timeout):
+        deadline = time.perf_counter() + timeout
+        while not self._conn.poll(0.1):
+            if not self._process.is_alive():
+                raise Exception(f"Capture process exited with code {self._process.exitcode}")
+            if time.perf_counter() >= deadline:
+                raise Exception(f"Capture process did not answer ({reply})")
+        message = self._conn.recv()
+        if message[0] == 'error':
+            raise Exception(f"Capture process error: {message[1]}")
+        return message
+
+    def start_capture(self, profile):
+        """Send 'start' and return the (rate, channels) the device was opened with"""
+        self.start()
+        self._conn.send(('start', {'rate': profile['rate'], 'channels': profile['channels']}))
+        _, rate, channels, position = self._expect('started', REPLY_TIMEOUT_SECONDS)
+        self._position = position
+        self._chunk_bytes = self.chunk * channels * self.sample_width
+        self._stats = empty_capture_stats()
+        return rate, channels
+
+    def read(self):
+        """Next captured PCM as a memoryview into shared memory (b'' if none arrived in time)"""
+        deadline = time.perf_counter() + READ_TIMEOUT_SECONDS
+        while True:
+            # Cleared before looking, so a chunk published in between still wakes the wait below
+            self._data_ready.clear()
+            view, self._position, lost = self._ring.read(self._position, self._chunk_bytes)
+            if lost:
+                self._stats['dropped_chunks'] += -(-lost // self._chunk_bytes)
+            if len(view):
+                return view
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not self._data_ready.wait(remaining):
+                return b''
+
+    def stop_capture(self):
+        """Send 'stop' and wait until the capture process has paused the stream"""
+        if not self.is_running:
+            return
+        self._conn.send(('stop',))
+        try:
+            self._expect('stopped', REPLY_TIMEOUT_SECONDS)
+        except Exception as e:
+            print(f"⚠️ {str(e)}", file=sys.stderr)
+        record_capture_stats(self.capture_stats)
+
+    def close(self):
+        """Stop the capture process and free the shared memory"""
+        if self._process is not None:
+            if self._process.is_alive():
+                try:
+                    self._conn.send(('quit',))
+                except (BrokenPipeError, OSError):
+                    pass
+                self._process.join(timeout=2)
+                if self._process.is_alive():
+                    self._process.terminate()
+            self._process = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
@@ -1,21 +1,72 @@
 import os
 import sys
+import json
 import asyncio
+import urllib.parse
+import aiohttp
 from deepgram import Deepgram
 from deepgram.errors import DeepgramSetupError
+from audio_utils import as_bytes_like, read_audio_file
+from event_loop import RequestLimiter, stage_executor
+from http_pool import http_pool
+from metrics import metrics
+from word_replacements import dictionaries
+from vocabulary import vocabulary
+
+# API base URL when settings.json has no deepgram_api_url
+DEFAULT_API_URL = "https://api.deepgram.com/v1"
+
+# Upper bound for the final results after the live stream was closed
+LIVE_FINISH_TIMEOUT_SECONDS = 10
+
+# Prerecorded requests that may be in flight at once (parallel dictations)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Language mapping for Deepgram
+LANGUAGE_MAPPING = {
+    'en': 'en',
+    'de': 'de',
+    'fr': 'fr',
+    'es': 'es',
+    'it': 'it',
+    'ja': 'ja',
+    'ko': 'ko',
+    'pt': 'pt',
+    'ru': 'ru',
+    'nl': 'nl',
+    'auto': None  # auto will not set a language parameter
+}
+
+def query_string(options):
+    """Query string for Deepgram request options, encoded like the SDK does it.
+
+    Booleans become "true"/"false", lists repeat the parameter (keywords)
+    and None or "" values are left out.
+    """
+    params = []
+    for key, value in options.items():
+        for item in value if isinstance(value, list) else [value]:
+            if item is None or item == "":
+                continue
+            params.append((key, str(item).lower() if isinstance(item, bool) else str(item)))
+    return ('?' + urllib.parse.urlencode(params)) if params else ''
+
 
 class DeepgramService:
     """DeepGram implementation of speech-to-text service"""
     
-    def __init__(self, client):
+    def __init__(self, client, vocabulary_biasing=False):
         self.client = client
+        # Send the ranked vocabulary as keywords (see vocabulary.py)
+        self.vocabulary_biasing = vocabulary_biasing
+        self.requests = RequestLimiter("deepgram", MAX_CONCURRENT_REQUESTS)
     
     @classmethod
-    def initialize(cls, api_key):
-        """Initialize DeepGram client with API key"""
+    def initialize(cls, api_key, api_url=None, vocabulary_biasing=False):
+        """Initialize DeepGram client with API key (api_url points to a stand-in server for offline tests)"""
         try:
-            client = Deepgram(api_key)
-            return cls(client)
+            client = Deepgram({'api_key': api_key, 'api_url': api_url} if api_url else api_key)
+            return cls(client, vocabulary_biasing)
         except DeepgramSetupError:
             raise ValueError("Invalid Deepgram API Key")
         except Exception as e:
@@ -24,74 +75,125 @@ class DeepgramService:
     
     async def transcribe_audio(self, audio_file, language=None):
         """Transcribe audio file using DeepGram"""
+        data = await stage_executor('io').run(read_audio_file, audio_file)
+        return await self.transcribe_buffer(data, language)
+    
+    async def transcribe_buffer(self, audio_buffer, language=None, mimetype='audio/wav'):
+        """Transcribe an in-memory audio buffer using DeepGram"""
         try:
-            with open(audio_file, 'rb') as audio:
-                source = {'buffer': audio, 'mimetype': 'audio/wav'}
-                
-                # Modified options for better language support
-                options = {
-                    'punctuate': True,
-                    'model': 'nova-2',  # Using nova-2 for better language support
-                }
-                
-                # Language mapping for Deepgram
-                language_mapping = {
-                    'en': 'en',
-                    'de': 'de',
-                    'fr': 'fr',
-                    'es': 'es',
-                    'it': 'it',
-                    'ja': 'ja',
-                    'ko': 'ko',
-                    'pt': 'pt',
-                    'ru': 'ru',
-                    'nl': 'nl',
-                    'auto': None  # auto will not set a language parameter
-                }
-                
-                # Only set language if it's specified and not auto-detect
-                if language and language != "auto" and language in language_mapping:
-                    mapped_language = language_mapping.get(language)
-                    if mapped_language:
-                        options['language'] = mapped_language
-                
-                print(f"Calling Deepgram with options: {options}", file=sys.stderr)
-                    
-                response = await self.client.transcription.prerecorded(source, options)
-                
-                # Check if response has the expected structure
-                if not response:
-                    print(f"Empty response from Deepgram", file=sys.stderr)
-                    raise Exception("Empty response from Deepgram")
-                
-                if 'results' not in response:
-                    print(f"Invalid response structure: {response}", file=sys.stderr)
-                    raise Exception(f"Invalid response from Deepgram: missing 'results'")
-                
-                # Accessing the transcript safely
-                if 'channels' not in response['results'] or not response['results']['channels']:
-                    print(f"No channels in response: {response}", file=sys.stderr)
-                    raise Exception("No channels in Deepgram response")
-                
-                channel = response['results']['channels'][0]
-                if 'alternatives' not in channel or not channel['alternatives']:
-                    print(f"No alternatives in response: {response}", file=sys.stderr)
-                    raise Exception("No alternatives in Deepgram response")
-                
-                if 'transcript' not in channel['alternatives'][0]:
-                    print(f"No transcript in response: {response}", file=sys.stderr)
-                    raise Exception("No transcript in Deepgram response")
-                
-                transcript = channel['alternatives'][0]['transcript']
-                if not transcript:
-                    return "No speech detected"
-                
-                return transcript
+            options = self._build_options(language)
+            
+            print(f"Calling Deepgram with options: {options}", file=sys.stderr)
                 
+            async with self.requests.slot():
+                response = await self._post_prerecorded(as_bytes_like(audio_buffer), mimetype, options)
+            
+            # Check if response has the expected structure
+            if not response:
+                print(f"Empty response from Deepgram", file=sys.stderr)
+                raise Exception("Empty response from Deepgram")
+            
+            if 'results' not in response:
+                print(f"Invalid response structure: {response}", file=sys.stderr)
+                raise Exception(f"Invalid response from Deepgram: missing 'results'")
+            
+            # Accessing the transcript safely
+            if 'channels' not in response['results'] or not response['results']['channels']:
+                print(f"No channels in response: {response}", file=sys.stderr)
+                raise Exception("No channels in Deepgram response")
+            
+            channel = response['results']['channels'][0]
+            if 'alternatives' not in channel or not channel['alternatives']:
+                print(f"No alternatives in response: {response}", file=sys.stderr)
+                raise Exception("No alternatives in Deepgram response")
+            
+            if 'transcript' not in channel['alternatives'][0]:
+                print(f"No transcript in response: {response}", file=sys.stderr)
+                raise Exception("No transcript in Deepgram response")
+            
+            transcript = channel['alternatives'][0]['transcript']
+            # "" when nothing was said - the caller skips pasting
+            return transcript
+            
         except Exception as e:
             print(f"Deepgram transcription error: {str(e)}", file=sys.stderr)
             raise Exception(f"Deepgram transcription error: {str(e)}")
     
+    def apply_replacements(self, text, language=None):
+        """Word replacements from the language's correction dictionary (Deepgram has no LLM clean-up step)"""
+        corrected_text, replaced = dictionaries.apply(text, language)
+        for wrong, correct in dict.fromkeys(replaced):
+            print(f"✓ Replaced: '{wrong}' → '{correct}'", file=sys.stderr)
+        return corrected_text
+    
+    @property
+    def api_url(self):
+        return self.client.options.get('api_url') or DEFAULT_API_URL
+    
+    async def _post_prerecorded(self, body, mimetype, options):
+        """POST /listen on the shared keep-alive session.
+
+        The SDK's prerecorded() opens a new aiohttp session (and a new TCP/TLS
+        connection) per call, so the request is made here with the same URL,
+        query string and headers on the pooled session instead.
+        """
+        url = f"{self.api_url}/listen{query_string(options)}"
+        headers = {'Authorization': f"Token {self.client.options['api_key']}", 'Content-Type': mimetype}
+        for attempt in range(2):
+            try:
+                async with http_pool.aiohttp_session().post(url, data=body, headers=headers) as response:
+                    content = (await response.text()).strip()
+                    if response.status >= 400:
+                        raise Exception(f"Deepgram API error {response.status}: {content[:200]}")
+                    body_json = json.loads(content) if content else None
+                    if body_json and (body_json.get('error') or body_json.get('err_msg')):
+                        raise Exception(f"Deepgram API error: {body_json.get('err_msg') or body_json.get('error')}")
+                    return body_json
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError):
+                # The server closed an idle pooled connection - retry once on a fresh one
+                if attempt:
+                    raise
+    
+    async def keep_warm(self):
+        """Keep a pooled connection to the API open (runs until cancelled)"""
+        await http_pool.keep_warm("deepgram", self.api_url)
+    
+    def _build_options(self, language):
+        # Modified options for better language support
+        options = {
+            'punctuate': True,
+            'model': 'nova-2',  # Using nova-2 for better language support
+        }
+        
+        # Only set language if it's specified and not auto-detect
+        if language and language != "auto" and language in LANGUAGE_MAPPING:
+            mapped_language = LANGUAGE_MAPPING.get(language)
+            if mapped_language:
+                options['language'] = mapped_language
+        if self.vocabulary_biasing:
+            keywords = vocabulary.deepgram_keywords(language)
+            if keywords:
+                options['keywords'] = keywords
+        return options
+    
+    def open_live_stream(self, loop, language, rate, channels, on_interim=None):
+        """Start a live (websocket) transcription for raw int16 PCM captured at rate/channels.
+
+        Returns a DeepgramLiveSession right away; the connection is made on
+        loop (the app's asyncio thread) and audio sent before it is up is
+        buffered.
+        """
+        options = self._build_options(language)
+        options.update({
+            'encoding': 'linear16',
+            'sample_rate': rate,
+            'channels': channels,
+            'interim_results': True,
+        })
+        session = DeepgramLiveSession(loop, on_interim)
+        session.connect(self.client, options)
+        return session
+    
     @staticmethod
     def get_supported_languages():
         """Return a dictionary of supported languages for UI selection"""
@@ -107,4 +209,102 @@ class DeepgramService:
             "ko": "한국어",
             "pt": "Português",
             "ru": "Русский",
-        } 
\ No newline at end of file
+        }
+
+
+class DeepgramLiveSession:
+    """One live transcription that receives audio while the user is still speaking.
+
+    send() is called from the recording thread and only schedules work on the
+    asyncio loop, so the order of chunks is preserved and capture never waits
+    for the network. Final segments are collected as they arrive; finish()
+    closes the stream and returns the full transcript, which is ready a few
+    hundred ms after the last audio instead of after a complete upload.
+    """
+    
+    mode = "live"
+    
+    def __init__(self, loop, on_interim=None):
+        self.loop = loop
+        self.on_interim = on_interim
+        self.final_segments = []
+        self.error = None
+        self.bytes_sent = 0
+        self.finished = False
+        self._live = None
+        self._pending = []
+        self._connected = None
+    
+    def connect(self, client, options):
+        print(f"Opening Deepgram live stream with options: {options}", file=sys.stderr)
+        self._connected = self.loop.submit(self._connect(client, options))
+    
+    async def _connect(self, client, options):
+        try:
+            self._live = await client.transcription.live(options)
+        except Exception as e:
+            self.error = e
+            print(f"Deepgram live connection error: {str(e)}", file=sys.stderr)
+            return
+        self._live.register_handler(self._live.event.TRANSCRIPT_RECEIVED, self._on_transcript)
+        self._live.register_handler(self._live.event.ERROR, self._on_error)
+        # Audio captured while the websocket was being opened
+        for data in self._pending:
+            self._live.send(data)
+        self._pending = []
+    
+    def send(self, pcm, trailing_silence_ms=0):
+        """Queue a chunk of raw PCM (thread-safe). Deepgram endpoints on its own, so the silence is unused"""
+        if not pcm or self.error is not None:
+            return
+        data = bytes(pcm)
+        self.bytes_sent += len(data)
+        self.loop.call_soon(self._send_on_loop, data)
+    
+    def _send_on_loop(self, data):
+        if self._live is None:
+            self._pending.append(data)
+        else:
+            self._live.send(data)
+    
+    def _on_transcript(self, message):
+        if 'channel' not in message:
+            return  # metadata
+        alternatives = message['channel'].get('alternatives') or [{}]
+        text = alternatives[0].get('transcript', '')
+        if message.get('is_final'):
+            if text:
+                self.final_segments.append(text)
+            text = ''
+        if self.on_interim is not None:
+            self.on_interim(' '.join(self.final_segments + ([text] if text else [])))
+    
+    def _on_error(self, error):
+        print(f"Deepgram live error: {error}", file=sys.stderr)
+    
+    @property
+    def transcript(self):
+        return ' '.join(self.final_segments)
+    
+    async def finish(self):
+        """Close the stream and wait for the final transcript"""
+        try:
+            await asyncio.wrap_future(self._connected)
+            if self.error is not None:
+                raise Exception(f"Deepgram live transcription error: {str(self.error)}")
+            with metrics.timer("deepgram.live_finalize_ms"):
+                await asyncio.wait_for(self._live.finish(), LIVE_FINISH_TIMEOUT_SECONDS)
+        finally:
+            self.finished = True
+        return self.transcript
+    
+    def abort(self):
+        """Drop the stream without waiting for results (e.g. nothing was said)"""
+        self.finished = True
+        self.loop.submit(self._abort())
+    
+    async def _abort(self):
+        await asyncio.wrap_future(self._connected)
+        if self._live is not None and not self._live.done:
+            # Ask the server to close; nobody waits for the results
+            self._live.send('{"type": "CloseStream"}')
@@ -0,0 +1,182 @@
+"""
+Langlebiger asyncio-Event-Loop in einem eigenen Thread, an den alle Pipeline-Stufen Coroutinen übergeben.
+"""
+import asyncio
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from metrics import metrics
+
+# Worker threads of the named executors for blocking work that still runs outside the loop
+STAGE_EXECUTOR_WORKERS = {
+    'encode': 2,    # FLAC/Opus encoding of segments and split chunks (libsndfile releases the GIL)
+    'io': 1,        # reading audio files from disk
+}
+DEFAULT_STAGE_EXECUTOR_WORKERS = 2
+
+
+class AsyncLoopThread:
+    """Long-lived asyncio event loop running on a dedicated daemon thread.
+
+    The loop and its default executor are created once and survive across
+    dictations, so connection state and in-flight tasks are not torn down
+    after every recording the way asyncio.run() does.
+    """
+
+    def __init__(self, name="voicetyper-asyncio", executor_workers=4):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(
+            ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix=f"{name}-executor")
+        )
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        """Start the loop thread and wait until the loop is running"""
+        if not self._thread.is_alive():
+            self._thread.start()
+            self._started.wait()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            try:
+                # Cancel anything still pending so the loop can close cleanly
+                pending = asyncio.all_tasks(self.loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+                self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            except Exception as e:
+                print(f"Event loop shutdown error: {str(e)}", file=sys.stderr)
+            finally:
+                self.loop.close()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the loop. Returns a concurrent.futures.Future"""
+        if not self._thread.is_alive():
+            raise RuntimeError(f"Event loop thread '{self.name}' is not running")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and block the calling thread until it finishes"""
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Thread-safe scheduling of a plain callback on the loop"""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout=5):
+        """Stop the loop and wait for the thread to exit"""
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+
+    @property
+    def is_running(self):
+        return self._thread.is_alive()
+
+
+class StageExecutor:
+    """Named, bounded thread pool for the blocking work of one pipeline stage.
+
+    Each stage gets its own pool instead of sharing the loop's default
+    executor, so a burst of encodes cannot hold up file reads (or the other
+    way round) and the number of threads stays fixed. Queue depth, time
+    including the wait for a worker and pure run time are recorded as
+    executor.<name>.pending, executor.<name>.latency_ms and executor.<name>_ms.
+    """
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"voicetyper-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def run(self, func, *args):
+        """Run func(*args) on the pool and await the result"""
+        self._track(1)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_event_loop().run_in_executor(self._pool, self._timed, func, args)
+        finally:
+            self._track(-1)
+            metrics.observe(f"executor.{self.name}.latency_ms", (time.perf_counter() - start) * 1000)
+
+    def _timed(self, func, args):
+        with metrics.timer(f"executor.{self.name}_ms"):
+            return func(*args)
+
+    def _track(self, delta):
+        with self._lock:
+            self._pending += delta
+            metrics.set_gauge(f"executor.{self.name}.pending", self._pending)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False)
+
+
+_stage_executors = {}
+_stage_executors_lock = threading.Lock()
+
+
+def stage_executor(name):
+    """Return the shared StageExecutor for name, creating it on first use"""
+    with _stage_executors_lock:
+        executor = _stage_executors.get(name)
+        if executor is None:
+            workers = STAGE_EXECUTOR_WORKERS.get(name, DEFAULT_STAGE_EXECUTOR_WORKERS)
+            executor = _stage_executors[name] = StageExecutor(name, workers)
+        return executor
+
+
+def shutdown_stage_executors():
+    with _stage_executors_lock:
+        for executor in _stage_executors.values():
+            executor.shutdown()
+        _stage_executors.clear()
+
+
+class RequestLimiter:
+    """Caps the number of concurrent requests one service has in flight.
+
+    Requests beyond the limit wait on the loop instead of piling up in the
+    HTTP client. The semaphore is created lazily on the running loop (a
+    Python 3.9 asyncio.Semaphore binds to the loop current at creation).
+    Metrics: requests.<name>.in_flight and requests.<name>.wait_ms.
+    """
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = limit
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._in_flight = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        start = time.perf_counter()
+        async with semaphore:
+            metrics.observe(f"requests.{self.name}.wait_ms", (time.perf_counter() - start) * 1000)
+            self._in_flight += 1
+            metrics.set_gauge(f"requests.{self.name}.in_flight", self._in_flight)
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+                metrics.set_gauge(f"requests.{self.name}.in_flight", self._in_flight)
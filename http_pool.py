@@ -0,0 +1,188 @@
+"""
+Gemeinsamer HTTP-Verbindungspool für OpenAI (httpx) und Deepgram (aiohttp) mit Keep-Alive und Vorwärmen.
+"""
+import asyncio
+import sys
+import time
+import weakref
+
+import aiohttp
+import httpx
+
+from metrics import metrics
+
+try:
+    import h2  # noqa: F401 - only needed for HTTP/2 support in httpx
+except ImportError:
+    h2 = None
+
+# Idle connections are kept this long; the keep-warm loop refreshes them while recording
+KEEPALIVE_EXPIRY_SECONDS = 90
+KEEP_WARM_INTERVAL_SECONDS = 30
+MAX_CONNECTIONS = 16
+MAX_KEEPALIVE_CONNECTIONS = 8
+WARMUP_TIMEOUT_SECONDS = 5
+REQUEST_TIMEOUT_SECONDS = 120
+
+
+class HandshakeTracker:
+    """Connection setup metrics of one provider.
+
+    Every request is classified as new (it had to resolve, connect and do
+    the TLS handshake) or reused (it went out on a pooled connection).
+    New connections observe http.<provider>.handshake_ms; reused ones
+    observe http.<provider>.handshake_saved_ms with the most recent
+    handshake time, i.e. what the request would have paid without the pool.
+    """
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.last_handshake_ms = None
+
+    def connected(self, handshake_ms):
+        self.last_handshake_ms = handshake_ms
+        metrics.increment(f"http.{self.provider}.new_connections")
+        metrics.observe(f"http.{self.provider}.handshake_ms", handshake_ms)
+
+    def reused(self):
+        metrics.increment(f"http.{self.provider}.reused_connections")
+        if self.last_handshake_ms is not None:
+            metrics.observe(f"http.{self.provider}.handshake_saved_ms", self.last_handshake_ms)
+
+
+class HttpPool:
+    """Process-wide HTTP clients shared by all service instances.
+
+    create_service() runs on every settings change, but the clients here
+    are created once, so keep-alive connections survive new service
+    instances. OpenAI gets one httpx.AsyncClient (HTTP/2 when h2 is
+    installed); Deepgram's prerecorded requests use one aiohttp session per
+    event loop, because aiohttp sessions are bound to the loop they were
+    created on. warm()/keep_warm() open a connection ahead of the upload.
+    """
+
+    def __init__(self):
+        self._httpx_client = None
+        self._sessions = weakref.WeakKeyDictionary()
+        self._trackers = {}
+
+    def tracker(self, provider):
+        tracker = self._trackers.get(provider)
+        if tracker is None:
+            tracker = self._trackers[provider] = HandshakeTracker(provider)
+        return tracker
+
+    # --- httpx (OpenAI) ---
+
+    def httpx_client(self):
+        """Shared httpx.AsyncClient for the OpenAI SDK (http_client=...)"""
+        if self._httpx_client is None:
+            self._httpx_client = httpx.AsyncClient(
+                http2=h2 is not None,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=10.0),
+                follow_redirects=True,
+                event_hooks={'request': [self._trace_httpx_request], 'response': [self._trace_httpx_response]},
+            )
+        return self._httpx_client
+
+    async def _trace_httpx_request(self, request):
+        state = {'started': None, 'handshake_ms': 0.0, 'connected': False}
+
+        async def trace(event, info):
+            # connect_tcp includes DNS resolution; start_tls is the TLS handshake
+            if event in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                state['started'] = time.perf_counter()
+            elif event in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                state['handshake_ms'] += (time.perf_counter() - state['started']) * 1000
+                state['connected'] = True
+
+        request.extensions['trace'] = trace
+        request.extensions['voicetyper_handshake'] = state
+
+    async def _trace_httpx_response(self, response):
+        state = response.request.extensions.get('voicetyper_handshake')
+        if state is None:
+            return
+        tracker = self.tracker("openai")
+        if state['connected']:
+            tracker.connected(state['handshake_ms'])
+        else:
+            tracker.reused()
+
+    # --- aiohttp (Deepgram) ---
+
+    def aiohttp_session(self):
+        """Shared aiohttp.ClientSession of the running loop (call from a coroutine)"""
+        loop = asyncio.get_event_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            trace_config = aiohttp.TraceConfig()
+            trace_config.on_connection_create_start.append(self._on_aiohttp_connect_start)
+            trace_config.on_connection_create_end.append(self._on_aiohttp_connect_end)
+            trace_config.on_connection_reuseconn.append(self._on_aiohttp_reuse)
+            session = self._sessions[loop] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MAX_CONNECTIONS, keepalive_timeout=KEEPALIVE_EXPIRY_SECONDS, ttl_dns_cache=300
+                ),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+                trace_configs=[trace_config],
+            )
+        return session
+
+    async def _on_aiohttp_connect_start(self, session, context, params):
+        context.connect_started = time.perf_counter()
+
+    async def _on_aiohttp_connect_end(self, session, context, params):
+        # Connection creation covers DNS, TCP connect and the TLS handshake
+        self.tracker("deepgram").connected((time.perf_counter() - context.connect_started) * 1000)
+
+    async def _on_aiohttp_reuse(self, session, context, params):
+        self.tracker("deepgram").reused()
+
+    # --- pre-warming ---
+
+    async def warm(self, provider, url):
+        """Open (or refresh) a pooled connection to url's host with a HEAD request.
+
+        Any HTTP status will do: the point is the established, kept-alive
+        connection, not the response.
+        """
+        start = time.perf_counter()
+        try:
+            if provider == "openai":
+                await asyncio.wait_for(self.httpx_client().head(url), WARMUP_TIMEOUT_SECONDS)
+            else:
+                async with self.aiohttp_session().head(
+                    url, timeout=aiohttp.ClientTimeout(total=WARMUP_TIMEOUT_SECONDS)
+                ) as response:
+                    await response.read()
+        except Exception as e:
+            metrics.increment(f"http.{provider}.warmup_errors")
+            print(f"⚠️ Connection warm-up to {url} failed: {str(e)}", file=sys.stderr)
+            return
+        metrics.observe(f"http.{provider}.warmup_ms", (time.perf_counter() - start) * 1000)
+
+    async def keep_warm(self, provider, url, interval=KEEP_WARM_INTERVAL_SECONDS):
+        """Warm the connection now and refresh it every interval seconds until cancelled"""
+        while True:
+            # Shielded: cancelling at stop must not abort a handshake that is half done
+            await asyncio.shield(self.warm(provider, url))
+            await asyncio.sleep(interval)
+
+    async def close(self):
+        """Close all pooled connections (call on the app's event loop before it stops)"""
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
+            self._httpx_client = None
+        for session in list(self._sessions.values()):
+            await session.close()
+        self._sessions.clear()
+
+
+# Globaler Pool, den alle Service-Instanzen gemeinsam nutzen
+http_pool = HttpPool()
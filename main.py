@@ -3,20 +3,36 @@ import threading
 from pynput import keyboard
 import codecs
 import time
-import pyaudio
-import wave
 import os
 # from playsound import playsound
 from datetime import datetime
 from dotenv import load_dotenv
 from PIL import Image
-import asyncio
 import pystray
 import json
 import sys
 from speech_to_text import create_service, SpeechToTextService
 from deepgram_service import DeepgramService
+from openai_service import DEFAULT_PARALLEL_UPLOADS
 from openai_service import OpenAIService
+from pipeline import RecordingJob, StagedPipeline, TextStream
+from audio_engine import DEFAULT_CAPTURE_MODE, AudioEngine
+from capture_process import CaptureProcess
+from audio_utils import AudioBuffer
+from capture_arena import CaptureArena
+from vad import VAD_DEFAULTS, SilenceGate, vad_config_from_settings
+from audio_encoding import CODECS, DEFAULT_CODEC, StreamingEncoder
+from audio_processing import (
+    CAPTURE_PROFILES,
+    DEFAULT_CAPTURE_PROFILE,
+    get_capture_profile,
+    PcmConverter
+)
+from event_loop import AsyncLoopThread, shutdown_stage_executors
+from http_pool import http_pool
+from metrics import metrics
+from word_replacements import DEFAULT_DICTIONARY_FILE, DEFAULT_VOCABULARY_FILE, dictionaries
+from vocabulary import vocabulary
 
 # Set theme and color scheme - 2025 AI Gradient Dark Theme
 ctk.set_appearance_mode("dark")
@@ -35,6 +51,25 @@ TEXT_SECONDARY = "#B0B9D1"
 GRADIENT_START = "#8A63FF"
 GRADIENT_END = "#36D7B7"
 
+# Signaltöne für Start/Stopp der Aufnahme
+SOUND_ON = "assets/on.wav"
+SOUND_OFF = "assets/off.wav"
+
+# Standardlänge des Pre-Roll-Puffers (Audio vor dem Drücken von F2)
+DEFAULT_PREROLL_MS = 500
+
+# Obergrenze für Aufnahme-Audio im RAM, darüber wird in eine memory-mapped Temp-Datei ausgelagert
+DEFAULT_CAPTURE_RAM_CAP_MB = 128
+
+# Pipeline: Worker pro Stufe und Tiefe der (begrenzten) Warteschlangen zwischen den Stufen
+DEFAULT_STT_WORKERS = 3
+DEFAULT_POST_WORKERS = 2
+DEFAULT_PIPELINE_QUEUE_SIZE = 8
+
+# Gestreamte Nachbearbeitung: Wartezeiten rund um das Einfügen eines Satzes (statt ~2,5 s pro Text)
+STREAM_CLIPBOARD_SETTLE_SECONDS = 0.05
+STREAM_PASTE_SETTLE_SECONDS = 0.15
+
 # Debug-Flag zum Speichern der Audio-Dateien
 DEBUG_KEEP_AUDIO = False
 DEBUG_AUDIO_DIR = "tmp"
@@ -42,39 +77,10 @@ DEBUG_AUDIO_DIR = "tmp"
 # Additional imports for clipboard functionality
 import tkinter as tk
 
-# Simple alternative to playsound
-def play_sound(sound_file):
-    try:
-        # Open the sound file
-        wf = wave.open(sound_file, 'rb')
-        
-        # Create PyAudio object
-        p = pyaudio.PyAudio()
-        
-        # Open stream
-        stream = p.open(
-            format=p.get_format_from_width(wf.getsampwidth()),
-            channels=wf.getnchannels(),
-            rate=wf.getframerate(),
-            output=True
-        )
-        
-        # Read data in chunks and play
-        chunk_size = 1024
-        data = wf.readframes(chunk_size)
-        while data:
-            stream.write(data)
-            data = wf.readframes(chunk_size)
-            
-        # Close everything
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-    except Exception as e:
-        print(f"Error playing sound: {str(e)}")
-
 class SettingsDialog:
-    def __init__(self, parent):
+    def __init__(self, parent, audio_engine=None):
+        # Reports the format the device actually opened with (after fallback), for the pre-roll size
+        self.audio_engine = audio_engine
         self.dialog = ctk.CTkToplevel(parent)
         self.dialog.title("Settings")
         self.dialog.geometry("450x600")
@@ -193,6 +199,213 @@ class SettingsDialog:
         
         self.language_menu.configure(command=on_language_change)
         
+        # Audio capture profile frame
+        self.capture_frame = ctk.CTkFrame(self.container, fg_color=GRADIENT_BG_LIGHT, corner_radius=10)
+        self.capture_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.capture_label = ctk.CTkLabel(
+            self.capture_frame,
+            text="Audio Capture Profile:",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=TEXT_PRIMARY
+        )
+        self.capture_label.pack(anchor="w", pady=5, padx=10)
+        
+        self.capture_info = ctk.CTkLabel(
+            self.capture_frame,
+            text="16 kHz mono is what the speech services use internally.\nUploads are about 5.5x smaller than 44.1 kHz stereo.",
+            font=ctk.CTkFont(size=12),
+            wraplength=350,
+            justify="left",
+            text_color=TEXT_SECONDARY
+        )
+        self.capture_info.pack(anchor="w", pady=5, padx=10)
+        
+        self.capture_profile_var = ctk.StringVar(value=self.settings.get('capture_profile', DEFAULT_CAPTURE_PROFILE))
+        
+        self.capture_menu = ctk.CTkOptionMenu(
+            self.capture_frame,
+            values=[profile['label'] for profile in CAPTURE_PROFILES.values()],
+            variable=None,
+            width=250,
+            fg_color=GRADIENT_BG_MEDIUM,
+            button_color=ACCENT_PRIMARY,
+            button_hover_color=ACCENT_SECONDARY,
+            dropdown_fg_color=GRADIENT_BG_MEDIUM,
+            dropdown_hover_color=GRADIENT_BG_LIGHT,
+            dropdown_text_color=TEXT_PRIMARY,
+            text_color=TEXT_PRIMARY
+        )
+        self.capture_menu.pack(pady=5, padx=10)
+        self.capture_menu.set(get_capture_profile(self.capture_profile_var.get())['label'])
+        
+        # Convert display label back to profile key
+        def on_capture_profile_change(selection):
+            for key, profile in CAPTURE_PROFILES.items():
+                if profile['label'] == selection:
+                    self.capture_profile_var.set(key)
+                    self.update_preroll_label()
+                    return
+        
+        self.capture_menu.configure(command=on_capture_profile_change)
+        
+        # Callback capture: PortAudio delivers chunks on its own thread, lost frames are counted
+        self.callback_capture_var = ctk.BooleanVar(value=self.settings.get('capture_mode', DEFAULT_CAPTURE_MODE) == 'callback')
+        
+        self.callback_capture_checkbox = ctk.CTkCheckBox(
+            self.capture_frame,
+            text="Callback capture (robust under load, reports lost frames)",
+            variable=self.callback_capture_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.callback_capture_checkbox.pack(anchor="w", pady=5, padx=20)
+        
+        # Capture in a separate process so UI work in this process cannot cause audio glitches
+        self.capture_subprocess_var = ctk.BooleanVar(value=self.settings.get('capture_subprocess', False))
+        
+        self.capture_subprocess_checkbox = ctk.CTkCheckBox(
+            self.capture_frame,
+            text="Capture in a separate process (no pre-roll)",
+            variable=self.capture_subprocess_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.capture_subprocess_checkbox.pack(anchor="w", pady=5, padx=20)
+        
+        # Pre-roll: keep the last few hundred ms before F2 in a ring buffer
+        self.preroll_enabled_var = ctk.BooleanVar(value=self.settings.get('preroll_enabled', False))
+        
+        self.preroll_checkbox = ctk.CTkCheckBox(
+            self.capture_frame,
+            text="Pre-roll: keep audio from just before F2",
+            variable=self.preroll_enabled_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.preroll_checkbox.pack(anchor="w", pady=5, padx=20)
+        
+        self.preroll_ms_var = ctk.IntVar(value=self.settings.get('preroll_ms', DEFAULT_PREROLL_MS))
+        
+        self.preroll_label = ctk.CTkLabel(
+            self.capture_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=TEXT_SECONDARY
+        )
+        self.preroll_label.pack(anchor="w", pady=(5, 0), padx=20)
+        
+        self.preroll_slider = ctk.CTkSlider(
+            self.capture_frame,
+            from_=100,
+            to=2000,
+            number_of_steps=19,
+            variable=self.preroll_ms_var,
+            button_color=ACCENT_PRIMARY,
+            button_hover_color=ACCENT_SECONDARY,
+            command=lambda value: self.update_preroll_label()
+        )
+        self.preroll_slider.pack(fill="x", pady=5, padx=20)
+        self.update_preroll_label()
+        
+        # Voice activity detection frame
+        self.vad_frame = ctk.CTkFrame(self.container, fg_color=GRADIENT_BG_LIGHT, corner_radius=10)
+        self.vad_frame.pack(fill="x", padx=10, pady=5)
+        
+        self.vad_label = ctk.CTkLabel(
+            self.vad_frame,
+            text="Silence Trimming (VAD):",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=TEXT_PRIMARY
+        )
+        self.vad_label.pack(anchor="w", pady=5, padx=10)
+        
+        self.vad_info = ctk.CTkLabel(
+            self.vad_frame,
+            text="Trims silence at start and end, shortens long pauses\nand skips recordings without speech.",
+            font=ctk.CTkFont(size=12),
+            wraplength=350,
+            justify="left",
+            text_color=TEXT_SECONDARY
+        )
+        self.vad_info.pack(anchor="w", pady=5, padx=10)
+        
+        self.vad_enabled_var = ctk.BooleanVar(value=self.settings.get('vad_enabled', VAD_DEFAULTS['vad_enabled']))
+        
+        self.vad_checkbox = ctk.CTkCheckBox(
+            self.vad_frame,
+            text="Enable Silence Trimming",
+            variable=self.vad_enabled_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY,
+            command=self.update_endpointing_checkbox_state
+        )
+        self.vad_checkbox.pack(anchor="w", pady=5, padx=20)
+        
+        self.vad_threshold_var = ctk.DoubleVar(value=self.settings.get('vad_threshold_db', VAD_DEFAULTS['vad_threshold_db']))
+        
+        self.vad_threshold_label = ctk.CTkLabel(
+            self.vad_frame,
+            text=f"Speech threshold: {self.vad_threshold_var.get():.0f} dBFS",
+            font=ctk.CTkFont(size=12),
+            text_color=TEXT_SECONDARY
+        )
+        self.vad_threshold_label.pack(anchor="w", pady=(5, 0), padx=20)
+        
+        self.vad_threshold_slider = ctk.CTkSlider(
+            self.vad_frame,
+            from_=-70,
+            to=-20,
+            number_of_steps=50,
+            variable=self.vad_threshold_var,
+            button_color=ACCENT_PRIMARY,
+            button_hover_color=ACCENT_SECONDARY,
+            command=lambda value: self.vad_threshold_label.configure(text=f"Speech threshold: {value:.0f} dBFS")
+        )
+        self.vad_threshold_slider.pack(fill="x", pady=5, padx=20)
+        
+        # Hands-free endpointing (depends on silence trimming)
+        self.endpointing_var = ctk.BooleanVar(value=self.settings.get('vad_endpointing', VAD_DEFAULTS['vad_endpointing']))
+        
+        self.endpointing_checkbox = ctk.CTkCheckBox(
+            self.vad_frame,
+            text="Hands-free: stop recording automatically after silence",
+            variable=self.endpointing_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY,
+            command=self.update_vad_if_needed
+        )
+        self.endpointing_checkbox.pack(anchor="w", pady=5, padx=20)
+        
+        self.endpoint_silence_var = ctk.IntVar(value=self.settings.get('vad_endpoint_silence_ms', VAD_DEFAULTS['vad_endpoint_silence_ms']))
+        
+        self.endpoint_silence_label = ctk.CTkLabel(
+            self.vad_frame,
+            text=f"Stop after {self.endpoint_silence_var.get()} ms of silence",
+            font=ctk.CTkFont(size=12),
+            text_color=TEXT_SECONDARY
+        )
+        self.endpoint_silence_label.pack(anchor="w", pady=(5, 0), padx=20)
+        
+        self.endpoint_silence_slider = ctk.CTkSlider(
+            self.vad_frame,
+            from_=300,
+            to=3000,
+            number_of_steps=27,
+            variable=self.endpoint_silence_var,
+            button_color=ACCENT_PRIMARY,
+            button_hover_color=ACCENT_SECONDARY,
+            command=lambda value: self.endpoint_silence_label.configure(text=f"Stop after {int(value)} ms of silence")
+        )
+        self.endpoint_silence_slider.pack(fill="x", pady=5, padx=20)
+        
+        self.update_endpointing_checkbox_state()
+        
         # OpenAI Post-Processing Frame
         self.post_processing_frame = ctk.CTkFrame(self.container, fg_color=GRADIENT_BG_LIGHT, corner_radius=10)
         self.post_processing_frame.pack(fill="x", padx=10, pady=5)
@@ -252,6 +465,19 @@ class SettingsDialog:
         )
         self.llm_optimized_checkbox.pack(anchor="w", pady=5, padx=20)
         
+        # Streaming: paste the GPT-4 output sentence by sentence while it is generated
+        self.post_processing_streaming_var = ctk.BooleanVar(value=self.settings.get('post_processing_streaming', False))
+        
+        self.post_processing_streaming_checkbox = ctk.CTkCheckBox(
+            self.post_processing_frame,
+            text="Stream the result and paste it sentence by sentence",
+            variable=self.post_processing_streaming_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.post_processing_streaming_checkbox.pack(anchor="w", pady=5, padx=20)
+        
         # Initialize the state of the LLM checkbox based on post-processing state
         self.update_llm_checkbox_state()
         
@@ -278,6 +504,20 @@ class SettingsDialog:
         )
         self.deepgram_entry.pack(pady=5, padx=10)
         self.deepgram_entry.insert(0, self.settings.get('api_key', ''))
+        self.deepgram_codec_var = self.create_codec_menu(self.deepgram_frame, 'deepgram_codec')
+        
+        # Live streaming: send audio while recording and show interim results
+        self.deepgram_streaming_var = ctk.BooleanVar(value=self.settings.get('deepgram_streaming', False))
+        
+        self.deepgram_streaming_checkbox = ctk.CTkCheckBox(
+            self.deepgram_frame,
+            text="Live streaming (transcribe while speaking)",
+            variable=self.deepgram_streaming_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.deepgram_streaming_checkbox.pack(anchor="w", pady=5, padx=10)
         
         # OpenAI API Key input
         self.openai_frame = ctk.CTkFrame(self.container, fg_color=GRADIENT_BG_LIGHT, corner_radius=10)
@@ -302,6 +542,20 @@ class SettingsDialog:
         )
         self.openai_entry.pack(pady=5, padx=10)
         self.openai_entry.insert(0, self.settings.get('openai_api_key', ''))
+        self.openai_codec_var = self.create_codec_menu(self.openai_frame, 'openai_codec')
+        
+        # Segmented mode: send finished segments to Whisper while still recording
+        self.openai_segmented_var = ctk.BooleanVar(value=self.settings.get('openai_segmented', False))
+        
+        self.openai_segmented_checkbox = ctk.CTkCheckBox(
+            self.openai_frame,
+            text="Transcribe in segments while speaking",
+            variable=self.openai_segmented_var,
+            fg_color=ACCENT_PRIMARY,
+            text_color=TEXT_PRIMARY,
+            hover_color=ACCENT_SECONDARY
+        )
+        self.openai_segmented_checkbox.pack(anchor="w", pady=5, padx=10)
         
         # Status label for test results
         self.status_label = ctk.CTkLabel(
@@ -345,6 +599,44 @@ class SettingsDialog:
         # Set initial visibility based on selected service
         self.update_api_visibility()
     
+    def create_codec_menu(self, parent, setting_key):
+        """Add an upload encoding dropdown to a service frame and return its variable"""
+        codec_label = ctk.CTkLabel(
+            parent,
+            text="Upload Encoding:",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            text_color=TEXT_PRIMARY
+        )
+        codec_label.pack(anchor="w", pady=(5, 0), padx=10)
+        
+        codec_var = ctk.StringVar(value=self.settings.get(setting_key, DEFAULT_CODEC))
+        
+        codec_menu = ctk.CTkOptionMenu(
+            parent,
+            values=[codec['label'] for codec in CODECS.values()],
+            variable=None,
+            width=250,
+            fg_color=GRADIENT_BG_MEDIUM,
+            button_color=ACCENT_PRIMARY,
+            button_hover_color=ACCENT_SECONDARY,
+            dropdown_fg_color=GRADIENT_BG_MEDIUM,
+            dropdown_hover_color=GRADIENT_BG_LIGHT,
+            dropdown_text_color=TEXT_PRIMARY,
+            text_color=TEXT_PRIMARY
+        )
+        codec_menu.pack(pady=5, padx=10)
+        codec_menu.set(CODECS.get(codec_var.get(), CODECS[DEFAULT_CODEC])['label'])
+        
+        # Convert display label back to codec key
+        def on_codec_change(selection):
+            for key, codec in CODECS.items():
+                if codec['label'] == selection:
+                    codec_var.set(key)
+                    return
+        
+        codec_menu.configure(command=on_codec_change)
+        return codec_var
+    
     def test_service(self):
         """Test the selected service with current settings"""
         try:
@@ -425,6 +717,20 @@ class SettingsDialog:
         self.settings['language'] = self.language_var.get()
         self.settings['post_processing'] = self.post_processing_var.get()
         self.settings['llm_optimized'] = self.llm_optimized_var.get()
+        self.settings['post_processing_streaming'] = self.post_processing_streaming_var.get()
+        self.settings['capture_profile'] = self.capture_profile_var.get()
+        self.settings['capture_mode'] = 'callback' if self.callback_capture_var.get() else 'blocking'
+        self.settings['capture_subprocess'] = self.capture_subprocess_var.get()
+        self.settings['preroll_enabled'] = self.preroll_enabled_var.get()
+        self.settings['preroll_ms'] = int(self.preroll_ms_var.get())
+        self.settings['deepgram_codec'] = self.deepgram_codec_var.get()
+        self.settings['deepgram_streaming'] = self.deepgram_streaming_var.get()
+        self.settings['openai_segmented'] = self.openai_segmented_var.get()
+        self.settings['vad_enabled'] = self.vad_enabled_var.get()
+        self.settings['vad_threshold_db'] = round(self.vad_threshold_var.get())
+        self.settings['vad_endpointing'] = self.endpointing_var.get()
+        self.settings['vad_endpoint_silence_ms'] = int(self.endpoint_silence_var.get())
+        self.settings['openai_codec'] = self.openai_codec_var.get()
         with open('settings.json', 'w') as f:
             json.dump(self.settings, f)
         self.dialog.destroy()
@@ -449,6 +755,29 @@ class SettingsDialog:
         # If LLM optimization is enabled, make sure post-processing is also enabled
         if self.llm_optimized_var.get():
             self.post_processing_var.set(True)
+    
+    def update_preroll_label(self):
+        # Show pre-roll length and the memory its ring buffer needs for the selected profile
+        profile = get_capture_profile(self.capture_profile_var.get())
+        preroll_ms = int(self.preroll_ms_var.get())
+        # The ring is sized from the format the device opened with, which can differ after a fallback
+        capture_format = self.audio_engine.capture_format(profile) if self.audio_engine is not None else None
+        rate, channels = capture_format or (profile['rate'], profile['channels'])
+        footprint_kib = rate * channels * 2 * preroll_ms / 1000 / 1024
+        self.preroll_label.configure(text=f"Pre-roll length: {preroll_ms} ms (~{footprint_kib:.0f} KiB buffer)")
+    
+    def update_endpointing_checkbox_state(self):
+        # Hands-free endpointing needs the VAD, disable it when trimming is off
+        if not self.vad_enabled_var.get():
+            self.endpointing_var.set(False)
+            self.endpointing_checkbox.configure(state="disabled")
+        else:
+            self.endpointing_checkbox.configure(state="normal")
+    
+    def update_vad_if_needed(self):
+        # If hands-free endpointing is enabled, make sure silence trimming is also enabled
+        if self.endpointing_var.get():
+            self.vad_enabled_var.set(True)
             
 class VoiceTyperApp:
     def __init__(self):
@@ -460,13 +789,27 @@ class VoiceTyperApp:
         
         # Initialize variables
         self.is_recording = False
-        self.file_ready_counter = 0
+        self.recording_counter = 0
+        # Encode -> STT -> post-processing -> paste, started on the first recording
+        self.pipeline = None
+        # One long-lived asyncio loop shared by all dictations
+        self.event_loop = AsyncLoopThread().start()
+        # One PyAudio instance with a pre-opened input stream shared by all dictations
+        self.audio_engine = AudioEngine()
+        # Optional capture subprocess (own GIL), fed over a shared-memory ring buffer
+        self.capture_process = CaptureProcess()
+        # Decode the start/stop cues once so playing them never blocks capture
+        try:
+            self.audio_engine.preload_sounds([SOUND_ON, SOUND_OFF])
+        except Exception as e:
+            print(f"Error loading sound cues: {str(e)}", file=sys.stderr)
+        self.record_requested_at = None
+        # Length of the interim (live streaming) line shown at the top of the log
+        self.interim_chars = 0
         self.stop_recording = False
         self.pykeyboard = keyboard.Controller()
         self.recording_animation_active = False
         self.service = None
-        self.transcription_thread_started = False
-        self.transcription_thread_running = True  # Flag to control the transcription thread loop
         
         # Ensure tmp directory exists if debug mode is enabled
         if DEBUG_KEEP_AUDIO:
@@ -483,6 +826,12 @@ class VoiceTyperApp:
             self.setup_ui()
             self.show_error(f"Error: {str(e)}")
             
+        # Initialize PortAudio and open the input stream in the background
+        self.configure_audio_engine()
+        
+        # Correction dictionaries and vocabulary: loaded, watched and recompiled in the background
+        self.watch_dictionaries()
+        
         # Initialize system tray
         self.setup_system_tray()
         
@@ -756,12 +1105,48 @@ class VoiceTyperApp:
         llm_optimized = self.settings.get('llm_optimized', False)
         
         try:
-            self.service = create_service(service_type, api_key, post_processing, llm_optimized)
+            self.service = create_service(
+                service_type, api_key, post_processing, llm_optimized,
+                api_url=self.settings.get(f"{service_type}_api_url"),  # optional local stand-in server
+                compact_prompts=self.settings.get('compact_prompts', False),
+                vocabulary_biasing=self.settings.get('vocabulary_biasing', False)
+            )
         except ValueError as ve:
             raise ValueError(f"Invalid {service_type.capitalize()} API Key")
         except Exception as e:
             raise Exception(f"Failed to initialize {service_type.capitalize()}: {str(e)}")
         
+    def watch_dictionaries(self):
+        """(Re)start watching the dictionary and vocabulary files named in the settings"""
+        settings = getattr(self, 'settings', {})
+        dictionaries.watch(
+            settings.get('dictionary_file', DEFAULT_DICTIONARY_FILE),
+            settings.get('vocabulary_file', DEFAULT_VOCABULARY_FILE)
+        )
+        
+    def configure_audio_engine(self):
+        """(Re)open the input stream and pre-roll buffer for the current settings in the background"""
+        profile = get_capture_profile(self.settings.get('capture_profile', DEFAULT_CAPTURE_PROFILE))
+        preroll_ms = self.settings.get('preroll_ms', DEFAULT_PREROLL_MS) if self.settings.get('preroll_enabled', False) else 0
+        if self.settings.get('capture_subprocess', False):
+            # The capture process owns the microphone; the engine only plays the cues
+            threading.Thread(target=self.start_capture_process, daemon=True).start()
+            return
+        self.capture_process.close()
+        threading.Thread(
+            target=self.audio_engine.warm_up,
+            args=(profile, preroll_ms, self.settings.get('capture_mode', DEFAULT_CAPTURE_MODE)),
+            daemon=True
+        ).start()
+        
+    def start_capture_process(self):
+        self.audio_engine.release_input()
+        try:
+            self.capture_process.start()
+        except Exception as e:
+            print(f"⚠️ Capture process failed to start, capturing in-process: {str(e)}", file=sys.stderr)
+            self.capture_process.close()
+        
     def setup_system_tray(self):
         # Create system tray icon
         self.icon_image = Image.new('RGB', (64, 64), color='blue')
@@ -930,10 +1315,9 @@ class VoiceTyperApp:
             return
             
         if not self.is_recording:
-            # Start the transcription thread if it's not already started
-            if not self.transcription_thread_started:
-                self.start_transcription_thread()
-                self.transcription_thread_started = True
+            # Start the transcription pipeline if it's not already started
+            if self.pipeline is None:
+                self.start_pipeline()
                 
             self.start_recording()
             # Start animation with pulsing effect
@@ -945,13 +1329,31 @@ class VoiceTyperApp:
             self.animate_recording()
         else:
             self.stop_recording = True
-            # Stop animation
-            self.recording_animation_active = False
-            self.record_button.configure(
-                fg_color=ACCENT_PRIMARY,
-                text="● Start Recording (F2)"  # Circle record symbol
-            )
-            self.recording_indicator.set(0)
+            self.reset_recording_ui()
+    
+    def show_interim_transcript(self, session, text):
+        """Replace the interim line at the top of the transcription log (Tk thread only)"""
+        if session.finished:
+            return  # the final transcript is already being shown
+        self.clear_interim_transcript()
+        if text:
+            line = f"{datetime.now().strftime('%H:%M:%S')}: … {text}\n\n"
+            self.transcription_text.insert('1.0', line)
+            self.interim_chars = len(line)
+    
+    def clear_interim_transcript(self):
+        if self.interim_chars:
+            self.transcription_text.delete('1.0', f"1.0+{self.interim_chars}c")
+            self.interim_chars = 0
+    
+    def reset_recording_ui(self):
+        # Stop animation
+        self.recording_animation_active = False
+        self.record_button.configure(
+            fg_color=ACCENT_PRIMARY,
+            text="● Start Recording (F2)"  # Circle record symbol
+        )
+        self.recording_indicator.set(0)
     
     def on_key_press(self, key):
         try:
@@ -964,51 +1366,147 @@ class VoiceTyperApp:
         pass
             
     def start_recording(self):
+        self.record_requested_at = time.perf_counter()
         threading.Thread(target=self.record_speech, daemon=True).start()
         
     def record_speech(self):
         self.is_recording = True
-        chunk = 1024
-        sample_format = pyaudio.paInt16
-        channels = 2
-        fs = 44100
-        
-        p = pyaudio.PyAudio()
-        stream = p.open(
-            format=sample_format,
-            channels=channels,
-            rate=fs,
-            frames_per_buffer=chunk,
-            input=True
-        )
+        profile = get_capture_profile(self.settings.get('capture_profile', DEFAULT_CAPTURE_PROFILE))
+        channels = profile['channels']
+        fs = profile['rate']
         
-        frames = []
-        play_sound("assets/on.wav")
+        # Resume the pre-opened input stream (opened in the profile format if the device supports it)
+        capture = self.audio_engine
+        if self.settings.get('capture_subprocess', False):
+            try:
+                # 'start' message to the capture process, audio arrives through shared memory
+                capture_fs, capture_channels = self.capture_process.start_capture(profile)
+                capture = self.capture_process
+            except Exception as e:
+                print(f"⚠️ Capture process unavailable, capturing in-process: {str(e)}", file=sys.stderr)
+        if capture is self.audio_engine:
+            capture_fs, capture_channels = self.audio_engine.start_capture(profile)
+        converter = PcmConverter(capture_fs, capture_channels, fs, channels)
+        # Encode while capturing so stopping adds no encode latency
+        service_type = self.settings.get('service', 'deepgram')
+        encoder = StreamingEncoder(self.settings.get(f"{service_type}_codec", DEFAULT_CODEC), channels, fs)
+        # Trim silence before it reaches the encoder
+        vad_config = vad_config_from_settings(self.settings)
+        gate = SilenceGate(fs, channels, vad_config) if vad_config['vad_enabled'] else None
+        # Transcribe while the user is still speaking: Deepgram live stream or Whisper segments
+        live_session = None
+        show_interim = lambda text: self.root.after(0, self.show_interim_transcript, live_session, text)
+        if service_type == 'deepgram' and self.settings.get('deepgram_streaming', False):
+            live_session = self.service.open_live_stream(
+                self.event_loop, self.settings.get('language', 'en'), fs, channels, on_interim=show_interim
+            )
+        elif service_type == 'openai' and self.settings.get('openai_segmented', False):
+            live_session = self.service.open_segmented_stream(
+                self.event_loop, self.settings.get('language', 'en'), fs, channels,
+                self.settings.get('openai_codec', DEFAULT_CODEC), on_interim=show_interim
+            )
+        # Open the provider connection now so the upload at stop skips DNS, TCP and TLS set-up
+        # (the live stream has its own websocket)
+        keep_warm = None
+        if hasattr(self.service, 'keep_warm') and (live_session is None or live_session.mode != "live"):
+            keep_warm = self.event_loop.submit(self.service.keep_warm())
+        # Hands-free mode: finalize after this much trailing silence
+        endpoint_ms = vad_config['vad_endpoint_silence_ms'] if gate is not None and vad_config['vad_endpointing'] else None
+        auto_stopped = False
+        
+        # Preallocated arena instead of a list of chunks - spills to disk past the RAM cap
+        arena = CaptureArena(ram_cap_bytes=int(self.settings.get('capture_ram_cap_mb', DEFAULT_CAPTURE_RAM_CAP_MB)) * 1024 * 1024)
+        self.audio_engine.play_sound(SOUND_ON)  # non-blocking, capture starts right away
+        first_frame = True
         
-        while not self.stop_recording:
-            data = stream.read(chunk)
-            frames.append(data)
+        try:
+            while not self.stop_recording:
+                chunk = capture.read()
+                if not chunk:
+                    continue
+                data = converter.process(chunk)
+                if first_frame:
+                    first_frame = False
+                    if self.record_requested_at is not None:
+                        f2_to_first_frame_ms = (time.perf_counter() - self.record_requested_at) * 1000
+                        metrics.observe("capture.f2_to_first_frame_ms", f2_to_first_frame_ms)
+                        print(f"🎙️ F2 to first captured frame: {f2_to_first_frame_ms:.1f} ms", file=sys.stderr)
+                if gate is not None:
+                    data = gate.process(data)
+                arena.write(data)
+                encoder.write(data)
+                if live_session is not None:
+                    live_session.send(data, gate.trailing_silence_ms if gate is not None else 0)
+                if endpoint_ms and gate.trailing_silence_ms >= endpoint_ms:
+                    auto_stopped = True
+                    break
+        finally:
+            if keep_warm is not None:
+                keep_warm.cancel()
             
-        stream.stop_stream()
-        stream.close()
-        p.terminate()
-        play_sound("assets/off.wav")
-        
-        # Save recording
-        wf = wave.open(f"test{self.file_ready_counter+1}.wav", 'wb')
-        wf.setnchannels(channels)
-        wf.setsampwidth(p.get_sample_size(sample_format))
-        wf.setframerate(fs)
-        wf.writeframes(b''.join(frames))
-        wf.close()
+        stopped_at = time.perf_counter()
+        capture.stop_capture()
+        self.audio_engine.play_sound(SOUND_OFF)
+        capture_stats = capture.capture_stats
+        if any(capture_stats.values()):
+            # Make lost frames visible in the UI log, not only on stderr
+            self.transcription_text.insert(
+                '1.0',
+                f"{datetime.now().strftime('%H:%M:%S')}: ⚠️ Capture lost audio: "
+                f"{capture_stats['input_overflows']} overflows, {capture_stats['input_underflows']} underflows, "
+                f"{capture_stats['dropped_chunks']} dropped chunks\n\n"
+            )
+        tail = converter.flush()
+        if gate is not None:
+            # Time between the end of speech and finalizing the recording
+            endpoint_delay_ms = gate.trailing_silence_ms
+            tail = gate.process(tail) + gate.finish()
+        arena.write(tail)
+        encoder.write(tail)
+        if live_session is not None:
+            live_session.send(tail)
         
         self.stop_recording = False
         self.is_recording = False
-        self.file_ready_counter += 1
         
-        self.status_label.configure(text="Processing transcription...")
+        if auto_stopped:
+            self.root.after(0, self.reset_recording_ui)
+        
+        if gate is not None:
+            metrics.observe("endpoint.auto_delay_ms" if auto_stopped else "endpoint.manual_delay_ms", endpoint_delay_ms)
+            print(f"⏱️ Endpointing delay: {endpoint_delay_ms} ms of trailing silence ({'hands-free' if auto_stopped else 'manual stop'})", file=sys.stderr)
+            metrics.observe("vad.trimmed_ms", gate.trimmed_ms)
+            metrics.observe("vad.speech_ms", gate.speech_ms)
+            print(f"✂️ VAD: trimmed {gate.trimmed_ms} ms of silence, {gate.speech_ms} ms of speech", file=sys.stderr)
+            if not gate.has_speech:
+                # Nothing to transcribe - save the network round trip
+                metrics.increment("vad.skipped_requests")
+                print(f"🔇 VAD: no speech detected, request skipped ({metrics.get_counter('vad.skipped_requests')} so far)", file=sys.stderr)
+                self.status_label.configure(text="No speech detected - nothing sent")
+                encoder.close()
+                arena.close()
+                if live_session is not None:
+                    live_session.abort()
+                    self.root.after(0, self.clear_interim_transcript)
+                return
+        
+        # Keep the recording in memory - no WAV round trip through the working directory
+        self.recording_counter += 1
+        metrics.set_gauge("capture.arena_bytes", len(arena))
+        audio = AudioBuffer(arena.getbuffer(), channels, fs, capture.sample_width, arena=arena)
         
-    async def transcribe_audio(self, audio_file):
+        # Hand the finished recording to the pipeline; the encoder is flushed in its encode stage
+        self.pipeline.submit(RecordingJob(
+            self.recording_counter, audio, live_session=live_session, stopped_at=stopped_at, encoder=encoder
+        ))
+        
+        in_flight = self.pipeline.in_flight
+        self.status_label.configure(
+            text="Processing transcription..." if in_flight <= 1 else f"Processing transcriptions ({in_flight} in progress)..."
+        )
+        
+    async def transcribe_audio(self, job):
+        """STT stage: return (raw transcript, mode) - post-processing runs in its own stage"""
         try:
             # Get language from settings, default to English
             language = self.settings.get('language', 'en')
@@ -1034,176 +1532,359 @@ class VoiceTyperApp:
             if service_type.lower() == "openai" and hasattr(self.service, 'llm_optimized'):
                 print(f"DEBUG: Service Configuration: post_processing={self.service.use_post_processing}, llm_optimized={self.service.llm_optimized}", file=sys.stderr)
                 
-            transcript = await self.service.transcribe_audio(audio_file, language)
-            
-            # Log completion
-            if service_type == "Openai" and post_processing:
-                if llm_optimized:
-                    print(f"✓ Completed {service_type} transcription with GPT-4 post-processing and LLM optimization")
-                else:
-                    print(f"✓ Completed {service_type} transcription with GPT-4 post-processing")
-                
-            return transcript
+            transcript = None
+            mode = "prerecorded"
+            if job.live_session is not None:
+                # Audio was sent while recording - only the last part is outstanding
+                try:
+                    transcript = await job.live_session.finish()
+                    mode = job.live_session.mode
+                except Exception as e:
+                    print(f"⚠️ {job.live_session.mode.capitalize()} transcription failed, falling back to upload: {str(e)}", file=sys.stderr)
+            if transcript is None:
+                payload, mimetype = job.upload_payload()
+                payload_bytes = payload.getbuffer().nbytes
+                metrics.observe("upload.bytes", payload_bytes)
+                max_upload_bytes = getattr(self.service, 'max_upload_bytes', None)
+                with metrics.timer("transcription.service_ms"):
+                    if max_upload_bytes and payload_bytes > max_upload_bytes:
+                        # Too large for one request - split at silence and transcribe the chunks in parallel
+                        mode = "split"
+                        transcript = await self.service.transcribe_long(
+                            job.audio, language,
+                            codec=self.settings.get(f"{service_type.lower()}_codec", DEFAULT_CODEC),
+                            parallelism=int(self.settings.get('openai_parallel_uploads', DEFAULT_PARALLEL_UPLOADS)),
+                            compression=payload_bytes / float(max(1, len(job.audio.pcm)))
+                        )
+                    elif hasattr(self.service, 'transcribe_raw'):
+                        transcript = await self.service.transcribe_raw(payload, language, mimetype)
+                    else:
+                        transcript = await self.service.transcribe_buffer(payload, language, mimetype)
+            return transcript, mode
         except Exception as e:
             raise Exception(f"Transcription error: {str(e)}")
-            
-    def start_transcription_thread(self):
-        self.transcription_thread_running = True  # Ensure flag is set to True when starting
-        threading.Thread(target=self.transcribe_speech, daemon=True).start()
+    
+    async def post_process_transcript(self, job):
+        """Post-processing stage: GPT-4 clean-up (OpenAI) and the correction dictionaries"""
+        language = self.settings.get('language', 'en')
+        transcript = job.transcript
+        if hasattr(self.service, 'finalize_transcript'):
+            try:
+                transcript = await self.service.finalize_transcript(transcript, language)
+            except Exception as e:
+                raise Exception(f"Post-processing error: {str(e)}")
+            if self.service.use_post_processing:
+                if self.service.llm_optimized:
+                    print(f"✓ Completed Openai transcription with GPT-4 post-processing and LLM optimization")
+                else:
+                    print(f"✓ Completed Openai transcription with GPT-4 post-processing")
+        elif transcript:
+            transcript = self.service.apply_replacements(transcript, language)
+        stop_to_text_ms = (time.perf_counter() - job.stopped_at) * 1000
+        metrics.observe(f"stop_to_text.{job.mode}_ms", stop_to_text_ms)
+        print(f"⏱️ Stop-to-text ({job.mode}): {stop_to_text_ms:.0f} ms", file=sys.stderr)
+        return transcript
+    
+    def start_post_process_stream(self, job):
+        """Post-processing stage, streaming variant: start the completion and return its TextStream"""
+        language = self.settings.get('language', 'en')
+        # Word replacements need whole words, so they run on complete sentences
+        stream = TextStream(transform=lambda text: self.service.apply_replacements(text, language))
         
-    def transcribe_speech(self):
-        i = 1
+        async def produce():
+            try:
+                async for delta in self.service.finalize_transcript_stream(job.transcript, language):
+                    stream.feed(delta)
+            except Exception as e:
+                stream.close(Exception(f"Post-processing error: {str(e)}"))
+            else:
+                stream.close()
         
-        while self.transcription_thread_running:  # Use the flag to control the loop
-            while self.file_ready_counter < i and self.transcription_thread_running:
-                time.sleep(0.01)
-                
-            if not self.transcription_thread_running:  # Check if we should exit
-                break
-                
-            audio_file = f"test{i}.wav"
+        self.event_loop.submit(produce())
+        return stream
+    
+    def start_pipeline(self):
+        """Start the staged pipeline: encode -> STT -> post-processing -> ordered delivery.
+
+        STT and post-processing of a later recording overlap with earlier
+        ones; the clipboard/paste sequence runs on one thread in recording
+        order. Worker counts and queue size come from settings.json.
+        """
+        def encode(job):
+            job.finish_encoding()
+        
+        def transcribe(job):
+            job.transcript, job.mode = self.event_loop.run(self.transcribe_audio(job))
+            job.first_pass = job.transcript
+        
+        def post_process(job):
+            if job.transcript and self.settings.get('post_processing_streaming', False) \
+                    and hasattr(self.service, 'finalize_transcript_stream'):
+                # Hand the job on right away; delivery pastes the text while it streams in
+                job.stream = self.start_post_process_stream(job)
+            else:
+                job.transcript = self.event_loop.run(self.post_process_transcript(job))
+        
+        settings = getattr(self, 'settings', {})
+        self.pipeline = StagedPipeline(
+            self.deliver_transcript, maxsize=int(settings.get('pipeline_queue_size', DEFAULT_PIPELINE_QUEUE_SIZE))
+        )
+        self.pipeline.add_stage("encode", encode)
+        self.pipeline.add_stage("stt", transcribe, int(settings.get('pipeline_stt_workers', DEFAULT_STT_WORKERS)))
+        self.pipeline.add_stage("post", post_process, int(settings.get('pipeline_post_workers', DEFAULT_POST_WORKERS)))
+        self.pipeline.start()
+        
+    def paste_transcript(self, transcript, stopped_at=None):
+        """Paste the whole transcript into the focused application via the clipboard"""
+        # IMPROVED CLIPBOARD METHOD: Save previous clipboard content, then restore after pasting
+        try:
+            print(f"📋 DEBUG: Starting clipboard operation for text: '{transcript[:50]}{'...' if len(transcript) > 50 else ''}'", file=sys.stderr)
             
-            # Check if the file exists before trying to transcribe it
-            if not os.path.exists(audio_file):
-                i += 1
-                continue
-                
+            # Save current clipboard content
             try:
-                transcript = asyncio.run(self.transcribe_audio(audio_file))
+                previous_clipboard = self.root.clipboard_get()
+                print(f"📋 DEBUG: Saved previous clipboard content: '{previous_clipboard[:50]}{'...' if len(previous_clipboard) > 50 else ''}'", file=sys.stderr)
+            except Exception as clip_error:
+                previous_clipboard = ""  # Empty if no content or error
+                print(f"📋 DEBUG: No previous clipboard content or error: {str(clip_error)}", file=sys.stderr)
+            
+            # Copy transcribed text to clipboard with multiple attempts if needed
+            max_attempts = 3
+            for attempt in range(1, max_attempts + 1):
+                print(f"📋 DEBUG: Setting clipboard content (attempt {attempt}/{max_attempts})", file=sys.stderr)
+                self.root.clipboard_clear()
+                self.root.clipboard_append(transcript)
+                self.root.update()  # Force tkinter to update clipboard
                 
-                # Update GUI
-                self.transcription_text.insert('1.0', f"{datetime.now().strftime('%H:%M:%S')}: {transcript}\n\n")
-                self.status_label.configure(text="Ready to record...")
+                # Increased pause to ensure clipboard is set
+                time.sleep(0.3)
                 
-                # Log transcription
-                with codecs.open('transcribe.log', 'a', encoding='utf-8') as f:
-                    f.write(f"{datetime.now()}: {transcript}\n")
-                    
-                # IMPROVED CLIPBOARD METHOD: Save previous clipboard content, then restore after pasting
+                # Verify clipboard content
                 try:
-                    print(f"📋 DEBUG: Starting clipboard operation for text: '{transcript[:50]}{'...' if len(transcript) > 50 else ''}'", file=sys.stderr)
-                    
-                    # Save current clipboard content
-                    try:
-                        previous_clipboard = self.root.clipboard_get()
-                        print(f"📋 DEBUG: Saved previous clipboard content: '{previous_clipboard[:50]}{'...' if len(previous_clipboard) > 50 else ''}'", file=sys.stderr)
-                    except Exception as clip_error:
-                        previous_clipboard = ""  # Empty if no content or error
-                        print(f"📋 DEBUG: No previous clipboard content or error: {str(clip_error)}", file=sys.stderr)
+                    current_clipboard = self.root.clipboard_get()
+                    if current_clipboard == transcript:
+                        print(f"✅ DEBUG: Clipboard content verified successfully (attempt {attempt})", file=sys.stderr)
+                        break
+                    else:
+                        print(f"⚠️ WARNING: Clipboard content doesn't match transcript (attempt {attempt})", file=sys.stderr)
+                        if attempt == max_attempts:
+                            print(f"❌ ERROR: Failed to set clipboard content after {max_attempts} attempts", file=sys.stderr)
+                        # Try again with longer wait time
+                        time.sleep(0.3 * attempt)
+                except Exception as verify_error:
+                    print(f"⚠️ ERROR: Failed to verify clipboard content: {str(verify_error)}", file=sys.stderr)
+                    time.sleep(0.3 * attempt)
+            
+            # Simulate Ctrl+V to paste with more time for applications to respond
+            print(f"📋 DEBUG: Simulating Ctrl+V keystroke", file=sys.stderr)
+            time.sleep(0.5)  # Extra delay before keystroke
+            
+            # Multiple attempts for key press if needed
+            key_press_attempts = 2
+            for key_attempt in range(1, key_press_attempts + 1):
+                try:
+                    print(f"🔤 DEBUG: Sending Ctrl+V keystroke (attempt {key_attempt}/{key_press_attempts})", file=sys.stderr)
+                    with self.pykeyboard.pressed(keyboard.Key.ctrl):
+                        time.sleep(0.1)  # Small pause with Ctrl held down
+                        self.pykeyboard.press('v')
+                        time.sleep(0.1)  # Small pause before releasing
+                        self.pykeyboard.release('v')
                     
-                    # Copy transcribed text to clipboard with multiple attempts if needed
-                    max_attempts = 3
-                    for attempt in range(1, max_attempts + 1):
-                        print(f"📋 DEBUG: Setting clipboard content (attempt {attempt}/{max_attempts})", file=sys.stderr)
-                        self.root.clipboard_clear()
-                        self.root.clipboard_append(transcript)
-                        self.root.update()  # Force tkinter to update clipboard
-                        
-                        # Increased pause to ensure clipboard is set
+                    # If we're on the last attempt, add extra delay
+                    if key_attempt == key_press_attempts:
+                        time.sleep(0.5)
+                    else:
                         time.sleep(0.3)
                         
-                        # Verify clipboard content
-                        try:
-                            current_clipboard = self.root.clipboard_get()
-                            if current_clipboard == transcript:
-                                print(f"✅ DEBUG: Clipboard content verified successfully (attempt {attempt})", file=sys.stderr)
-                                break
-                            else:
-                                print(f"⚠️ WARNING: Clipboard content doesn't match transcript (attempt {attempt})", file=sys.stderr)
-                                if attempt == max_attempts:
-                                    print(f"❌ ERROR: Failed to set clipboard content after {max_attempts} attempts", file=sys.stderr)
-                                # Try again with longer wait time
-                                time.sleep(0.3 * attempt)
-                        except Exception as verify_error:
-                            print(f"⚠️ ERROR: Failed to verify clipboard content: {str(verify_error)}", file=sys.stderr)
-                            time.sleep(0.3 * attempt)
-                    
-                    # Simulate Ctrl+V to paste with more time for applications to respond
-                    print(f"📋 DEBUG: Simulating Ctrl+V keystroke", file=sys.stderr)
-                    time.sleep(0.5)  # Extra delay before keystroke
-                    
-                    # Multiple attempts for key press if needed
-                    key_press_attempts = 2
-                    for key_attempt in range(1, key_press_attempts + 1):
-                        try:
-                            print(f"🔤 DEBUG: Sending Ctrl+V keystroke (attempt {key_attempt}/{key_press_attempts})", file=sys.stderr)
-                            with self.pykeyboard.pressed(keyboard.Key.ctrl):
-                                time.sleep(0.1)  # Small pause with Ctrl held down
-                                self.pykeyboard.press('v')
-                                time.sleep(0.1)  # Small pause before releasing
-                                self.pykeyboard.release('v')
-                            
-                            # If we're on the last attempt, add extra delay
-                            if key_attempt == key_press_attempts:
-                                time.sleep(0.5)
-                            else:
-                                time.sleep(0.3)
-                                
-                            break  # If no exception, we're done
-                        except Exception as key_error:
-                            print(f"⚠️ ERROR: Key press failed: {str(key_error)}", file=sys.stderr)
-                            if key_attempt < key_press_attempts:
-                                time.sleep(0.5)  # Wait before trying again
-                    
-                    # Increased pause before restoring clipboard to ensure paste completes
-                    print(f"📋 DEBUG: Waiting after paste operation (0.5s)", file=sys.stderr)
-                    time.sleep(0.5)
-                    
-                    # Restore previous clipboard content
-                    print(f"📋 DEBUG: Restoring previous clipboard content", file=sys.stderr)
-                    self.root.clipboard_clear()
-                    self.root.clipboard_append(previous_clipboard)
-                    self.root.update()  # Force tkinter to update clipboard
-                    print(f"✅ DEBUG: Clipboard operation completed successfully", file=sys.stderr)
-                    
-                except Exception as e:
-                    print(f"❌ ERROR: Clipboard operation failed: {str(e)}", file=sys.stderr)
-                    print(f"❌ ERROR occurred at line: {sys.exc_info()[2].tb_lineno}", file=sys.stderr)
-                
-                # Entweder Datei löschen oder in tmp-Ordner verschieben
-                if DEBUG_KEEP_AUDIO:
-                    # Verschiebe die Audiodatei in den tmp-Ordner mit Zeitstempel
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    new_filename = f"{DEBUG_AUDIO_DIR}/audio_{timestamp}_{i}.wav"
-                    os.rename(audio_file, new_filename)
-                    print(f"Saved audio file to {new_filename}")
-                else:
-                    # Datei löschen (Standardverhalten)
-                    os.remove(audio_file)
-                
-                i += 1
-                
-            except Exception as e:
-                error_msg = str(e)
-                print(f"Transcription error: {error_msg}", file=sys.stderr)
-                
-                # Make sure the error message is visible in the UI
+                    break  # If no exception, we're done
+                except Exception as key_error:
+                    print(f"⚠️ ERROR: Key press failed: {str(key_error)}", file=sys.stderr)
+                    if key_attempt < key_press_attempts:
+                        time.sleep(0.5)  # Wait before trying again
+            
+            if stopped_at is not None:
+                metrics.observe("paste.full_first_char_ms", (time.perf_counter() - stopped_at) * 1000)
+            
+            # Increased pause before restoring clipboard to ensure paste completes
+            print(f"📋 DEBUG: Waiting after paste operation (0.5s)", file=sys.stderr)
+            time.sleep(0.5)
+            
+            # Restore previous clipboard content
+            print(f"📋 DEBUG: Restoring previous clipboard content", file=sys.stderr)
+            self.root.clipboard_clear()
+            self.root.clipboard_append(previous_clipboard)
+            self.root.update()  # Force tkinter to update clipboard
+            print(f"✅ DEBUG: Clipboard operation completed successfully", file=sys.stderr)
+            
+        except Exception as e:
+            print(f"❌ ERROR: Clipboard operation failed: {str(e)}", file=sys.stderr)
+            print(f"❌ ERROR occurred at line: {sys.exc_info()[2].tb_lineno}", file=sys.stderr)
+    
+    def deliver_stream(self, job):
+        """Show a streamed transcript as it arrives and paste it in sentence-sized increments.
+
+        Returns the full pasted text. Time to the first pasted character
+        (from stop) and the completion time of the stream are recorded
+        separately.
+        """
+        stream = job.stream
+        start_mark, end_mark = f"stream{job.index}_start", f"stream{job.index}_end"
+        self.clear_interim_transcript()
+        prefix = f"{datetime.now().strftime('%H:%M:%S')}: "
+        self.transcription_text.insert('1.0', f"{prefix}\n\n")
+        # Marks move with the text, so lines inserted above later do not matter
+        self.transcription_text.mark_set(start_mark, f"1.{len(prefix)}")
+        self.transcription_text.mark_gravity(start_mark, "left")
+        self.transcription_text.mark_set(end_mark, f"1.{len(prefix)}")
+        
+        try:
+            previous_clipboard = self.root.clipboard_get()
+        except Exception:
+            previous_clipboard = ""
+        pasted = []
+        try:
+            for new_text, ready in stream.chunks():
+                if new_text:
+                    self.transcription_text.insert(end_mark, new_text)
+                if ready:
+                    self.paste_increment(ready)
+                    if not pasted:
+                        first_paste_ms = (time.perf_counter() - job.stopped_at) * 1000
+                        metrics.observe("paste.streamed_first_char_ms", first_paste_ms)
+                        print(f"⏱️ Stop to first pasted character (streamed): {first_paste_ms:.0f} ms", file=sys.stderr)
+                    pasted.append(ready)
+        except Exception:
+            # Keep only what was pasted before the failure; the caller reports the error
+            self.replace_stream_preview(start_mark, end_mark, ''.join(pasted))
+            raise
+        finally:
+            # Give the target application time to read the last increment before restoring
+            time.sleep(STREAM_PASTE_SETTLE_SECONDS)
+            self.root.clipboard_clear()
+            self.root.clipboard_append(previous_clipboard)
+            self.root.update()
+        
+        transcript = ''.join(pasted)
+        self.replace_stream_preview(start_mark, end_mark, transcript)
+        
+        if stream.first_token_at is not None:
+            metrics.observe("stream.first_token_ms", (stream.first_token_at - stream.started_at) * 1000)
+        completion_ms = (stream.finished_at - stream.started_at) * 1000
+        metrics.observe("stream.completion_ms", completion_ms)
+        stop_to_text_ms = (stream.finished_at - job.stopped_at) * 1000
+        metrics.observe(f"stop_to_text.{job.mode}_streamed_ms", stop_to_text_ms)
+        print(f"⏱️ Streamed post-processing: {completion_ms:.0f} ms, stop-to-text ({job.mode}) {stop_to_text_ms:.0f} ms", file=sys.stderr)
+        return transcript
+    
+    def replace_stream_preview(self, start_mark, end_mark, text):
+        """Show the pasted text (with word replacements) instead of the raw tokens and drop the marks"""
+        if text:
+            self.transcription_text.delete(start_mark, end_mark)
+            self.transcription_text.insert(start_mark, text)
+        else:
+            # Nothing was pasted: remove the whole entry, timestamp included
+            self.transcription_text.delete(f"{start_mark} linestart", f"{end_mark} lineend +1c +1c")
+        self.transcription_text.mark_unset(start_mark, end_mark)
+    
+    def paste_increment(self, text):
+        """Paste one increment of streamed text (the caller saves and restores the clipboard)"""
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+        self.root.update()  # Force tkinter to update clipboard
+        time.sleep(STREAM_CLIPBOARD_SETTLE_SECONDS)
+        try:
+            with self.pykeyboard.pressed(keyboard.Key.ctrl):
+                self.pykeyboard.press('v')
+                self.pykeyboard.release('v')
+        except Exception as key_error:
+            print(f"⚠️ ERROR: Key press failed: {str(key_error)}", file=sys.stderr)
+        # The target reads the clipboard asynchronously - keep it until the paste is done
+        time.sleep(STREAM_PASTE_SETTLE_SECONDS)
+    
+    def deliver_transcript(self, job):
+        """Last pipeline stage (single thread, recording order): show, log and paste the text"""
+        i = job.index
+        
+        try:
+            if job.error is not None:
+                raise job.error
+            remaining = self.pipeline.in_flight - 1
+            if job.stream is None and not (job.transcript or '').strip():
+                # Nothing was said: no clipboard/paste cycle and no log entry, only the status
+                self.clear_interim_transcript()
                 self.status_label.configure(
-                    text=f"Error: {error_msg[:50]}..." if len(error_msg) > 50 else f"Error: {error_msg}",
-                    text_color="red"
+                    text="No speech detected" if remaining <= 0 else f"No speech detected ({remaining} in progress)..."
                 )
+                print("🔇 No speech detected, nothing pasted", file=sys.stderr)
+                return
+            if job.stream is not None:
+                # Streamed post-processing: show tokens live and paste sentence by sentence
+                transcript = self.deliver_stream(job)
+            else:
+                transcript = job.transcript
                 
-                # Also log the error to the transcription text area
-                self.transcription_text.insert('1.0', f"{datetime.now().strftime('%H:%M:%S')}: ❌ Error: {error_msg}\n\n")
+                # Update GUI
+                self.clear_interim_transcript()
+                self.transcription_text.insert('1.0', f"{datetime.now().strftime('%H:%M:%S')}: {transcript}\n\n")
+            self.status_label.configure(
+                text="Ready to record..." if remaining <= 0 else f"Processing transcriptions ({remaining} in progress)..."
+            )
+            
+            # Log transcription
+            with codecs.open('transcribe.log', 'a', encoding='utf-8') as f:
+                f.write(f"{datetime.now()}: {transcript}\n")
+            
+            self.record_first_pass(job, transcript)
                 
-                # Try to remove the audio file if not in debug mode
-                try:
-                    if not DEBUG_KEEP_AUDIO:
-                        os.remove(audio_file)
-                    else:
-                        # Move to tmp with error indicator
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        new_filename = f"{DEBUG_AUDIO_DIR}/error_{timestamp}_{i}.wav"
-                        os.rename(audio_file, new_filename)
-                        print(f"Saved error audio file to {new_filename}")
-                except:
-                    pass
-                    
-                i += 1
+            if job.stream is None:
+                self.paste_transcript(transcript, job.stopped_at)
+            
+            # Audio nur im Debug-Modus auf die Platte schreiben
+            if DEBUG_KEEP_AUDIO:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                new_filename = job.audio.save_wav(f"{DEBUG_AUDIO_DIR}/audio_{timestamp}_{i}.wav")
+                print(f"Saved audio file to {new_filename}")
+            
+            metrics.log_summary()
+            
+        except Exception as e:
+            error_msg = str(e)
+            print(f"Transcription error: {error_msg}", file=sys.stderr)
+            
+            # Make sure the error message is visible in the UI
+            self.status_label.configure(
+                text=f"Error: {error_msg[:50]}..." if len(error_msg) > 50 else f"Error: {error_msg}",
+                text_color="red"
+            )
+            
+            # Also log the error to the transcription text area
+            self.transcription_text.insert('1.0', f"{datetime.now().strftime('%H:%M:%S')}: ❌ Error: {error_msg}\n\n")
+            
+            # Keep the failed recording for inspection in debug mode
+            try:
+                if DEBUG_KEEP_AUDIO:
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    new_filename = job.audio.save_wav(f"{DEBUG_AUDIO_DIR}/error_{timestamp}_{i}.wav")
+                    print(f"Saved error audio file to {new_filename}")
+            except:
+                pass
+        finally:
+            job.audio.release()
 
+    def record_first_pass(self, job, transcript):
+        """Feed the delivered text into the vocabulary ranking; in measurement mode compare it with the first pass"""
+        language = self.settings.get('language', 'en')
+        vocabulary.note_transcript(transcript, language)
+        if (self.settings.get('bias_measurement', False) and getattr(self.service, 'use_post_processing', False)
+                and job.first_pass and transcript):
+            # The dictionary replacements are no LLM round trip: compare what would be pasted without GPT-4o
+            first_pass = dictionaries.apply(job.first_pass, language)[0]
+            vocabulary.compare_first_pass(first_pass, transcript)
+    
     def __del__(self):
-        # Stop the transcription thread
-        self.transcription_thread_running = False
+        # Stop the pipeline workers
+        if getattr(self, 'pipeline', None) is not None:
+            self.pipeline.close()
         
         # Clean up keyboard listener
         if hasattr(self, 'keyboard_listener'):
@@ -1310,8 +1991,18 @@ class VoiceTyperApp:
         self.root.after(0, self.root.deiconify)
         
     def quit_app(self):
-        # Stop the transcription thread
-        self.transcription_thread_running = False
+        # Stop the pipeline workers
+        if self.pipeline is not None:
+            self.pipeline.close()
+        try:
+            self.event_loop.run(http_pool.close(), timeout=2)
+        except Exception as e:
+            print(f"HTTP pool shutdown error: {str(e)}", file=sys.stderr)
+        self.event_loop.stop()
+        shutdown_stage_executors()
+        dictionaries.stop()
+        self.audio_engine.close()
+        self.capture_process.close()
         
         self.tray_icon.stop()
         self.root.quit()
@@ -1319,7 +2010,7 @@ class VoiceTyperApp:
     def open_settings(self):
         """Open the settings dialog"""
         # Create settings dialog
-        settings_dialog = SettingsDialog(self.root)
+        settings_dialog = SettingsDialog(self.root, self.audio_engine)
         
         # Monitor when dialog is closed
         def on_dialog_close():
@@ -1336,9 +2027,16 @@ class VoiceTyperApp:
                     with open('settings.json', 'r') as f:
                         self.settings = json.load(f)
                     
+                    # Aufnahmeprofil/Pre-Roll ohne Neustart übernehmen
+                    if any(old_settings.get(key) != self.settings.get(key) for key in ['capture_profile', 'capture_mode', 'capture_subprocess', 'preroll_enabled', 'preroll_ms']):
+                        self.configure_audio_engine()
+                    
+                    if any(old_settings.get(key) != self.settings.get(key) for key in ['dictionary_file', 'vocabulary_file']):
+                        self.watch_dictionaries()
+                    
                     # Prüfe, ob sich relevante Einstellungen geändert haben
                     settings_changed = False
-                    for key in ['service', 'language', 'post_processing', 'llm_optimized', 'api_key', 'openai_api_key']:
+                    for key in ['service', 'language', 'post_processing', 'llm_optimized', 'api_key', 'openai_api_key', 'compact_prompts', 'vocabulary_biasing']:
                         if old_settings.get(key) != self.settings.get(key):
                             settings_changed = True
                             break
@@ -0,0 +1,120 @@
+"""
+Leichtgewichtige Laufzeit-Metriken für die Diktier-Pipeline (Counter, Gauges, Timings).
+"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MetricsRegistry:
+    """Thread-safe registry for counters, gauges and timing observations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._gauge_peaks = {}
+        self._timings = {}
+
+    def increment(self, name, value=1):
+        """Increase a counter by value"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """Set the current value of a gauge and remember its peak"""
+        with self._lock:
+            self._gauges[name] = value
+            if value > self._gauge_peaks.get(name, value - 1):
+                self._gauge_peaks[name] = value
+
+    def observe(self, name, value):
+        """Record a single timing/size observation (count, total, max, last)"""
+        with self._lock:
+            stats = self._timings.get(name)
+            if stats is None:
+                self._timings[name] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                stats[2] = max(stats[2], value)
+                stats[3] = value
+
+    @contextmanager
+    def timer(self, name):
+        """Context manager that observes the elapsed wall time in milliseconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (time.perf_counter() - start) * 1000)
+
+    def get_counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def get_gauge(self, name):
+        with self._lock:
+            return self._gauges.get(name, 0)
+
+    def get_last(self, name):
+        """Return the most recent observation for name (or None)"""
+        with self._lock:
+            stats = self._timings.get(name)
+            return stats[3] if stats else None
+
+    def snapshot(self):
+        """Return a plain-dict copy of all metrics"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': {
+                    name: {'value': value, 'peak': self._gauge_peaks.get(name, value)}
+                    for name, value in self._gauges.items()
+                },
+                'timings': {
+                    name: {
+                        'count': count,
+                        'avg': total / count,
+                        'max': peak,
+                        'last': last,
+                    }
+                    for name, (count, total, peak, last) in self._timings.items()
+                },
+            }
+
+    def format_summary(self, prefix=None):
+        """Human readable one-line-per-metric summary, optionally filtered by name prefix"""
+        snap = self.snapshot()
+        lines = []
+        for name, value in sorted(snap['counters'].items()):
+            if prefix is None or name.startswith(prefix):
+                lines.append(f"{name}={value}")
+        for name, gauge in sorted(snap['gauges'].items()):
+            if prefix is None or name.startswith(prefix):
+                lines.append(f"{name}={gauge['value']} (peak {gauge['peak']})")
+        for name, timing in sorted(snap['timings'].items()):
+            if prefix is None or name.startswith(prefix):
+                lines.append(
+                    f"{name}: last={timing['last']:.3f} avg={timing['avg']:.3f} "
+                    f"max={timing['max']:.3f} n={timing['count']}"
+                )
+        return "\n".join(lines)
+
+    def log_summary(self, prefix=None):
+        """Print the summary to stderr"""
+        summary = self.format_summary(prefix)
+        if summary:
+            print(f"📊 Metrics:\n{summary}", file=sys.stderr)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._gauge_peaks.clear()
+            self._timings.clear()
+
+
+# Globale Registry, die von allen Modulen gemeinsam genutzt wird
+metrics = MetricsRegistry()
@@ -2,29 +2,65 @@ import os
 import sys
 import asyncio
 import re # Import re for regex substitutions
-from openai import OpenAI
-from llm_prompts import (
-    STANDARD_BASE_PROMPT, 
-    LLM_OPTIMIZED_BASE_PROMPT,
-    EN_STANDARD_ADDITIONS,
-    EN_LLM_OPTIMIZED_ADDITIONS,
-    DE_STANDARD_ADDITIONS,
-    DE_LLM_OPTIMIZED_ADDITIONS,
-    FR_STANDARD_ADDITIONS,
-    FR_LLM_OPTIMIZED_ADDITIONS,
-    ES_STANDARD_ADDITIONS,
-    ES_LLM_OPTIMIZED_ADDITIONS,
-    GENERIC_STANDARD_ADDITIONS,
-    GENERIC_LLM_OPTIMIZED_ADDITIONS
-)
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from openai import AsyncOpenAI
+from audio_encoding import encode_pcm
+from audio_utils import as_file_object, read_audio_file, upload_filename
+from event_loop import RequestLimiter, stage_executor
+from http_pool import http_pool
+from metrics import metrics
+from vad import VAD_DEFAULTS, frame_energies_db, split_at_silence
+from word_replacements import dictionaries
+from vocabulary import vocabulary
+import llm_prompts
+import llm_prompts_compact
+from prompt_compiler import compose_base_prompt
+
+# Segmented (chunked) Whisper transcription while recording
+SEGMENT_PAUSE_MS = 500          # a pause this long after speech ends the current segment...
+MIN_SEGMENT_MS = 3000           # ...once it holds at least this much audio
+MAX_SEGMENT_MS = 30000          # hard cut for long stretches without a pause
+SEGMENT_OVERLAP_MS = 300        # audio repeated at the start of the next segment
+MIN_FINAL_SEGMENT_MS = 200      # shorter leftovers after the last cut are only padding
+STITCH_MAX_OVERLAP_WORDS = 4    # words that can be duplicated by the overlap (responses without timestamps)
+PAUSE_FRAME_MS = 20             # frame length of the session's own pause detection...
+PAUSE_THRESHOLD_DB = VAD_DEFAULTS['vad_threshold_db']  # ...and the level below which a frame is a pause
+
+# Whisper rejects uploads over 25 MB; stay a little below it
+MAX_UPLOAD_BYTES = 24 * 1024 * 1024
+DEFAULT_PARALLEL_UPLOADS = 4
+
+# Whisper and GPT-4o requests that may be in flight at once (split chunks, segments, parallel dictations)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Dictionary entries listed in the system prompt; the explicit replacements afterwards use all of them
+MAX_PROMPT_CORRECTIONS = 200
+
+# Built system prompts kept for (language, mode) combinations, like MAX_CACHED_ENGINES
+MAX_CACHED_SYSTEM_PROMPTS = 32
+
+# Built system prompts by (language, llm_optimized, compact, dictionary version), shared by all
+# service instances (create_service runs on every settings change); least recently used first
+_system_prompt_cache = OrderedDict()
+_system_prompt_lock = threading.Lock()
 
 class OpenAIService:
     """OpenAI implementation of speech-to-text service"""
     
-    def __init__(self, client, use_post_processing=False, llm_optimized=False):
+    max_upload_bytes = MAX_UPLOAD_BYTES
+    
+    def __init__(self, client, use_post_processing=False, llm_optimized=False, compact_prompts=False, vocabulary_biasing=False):
         self.client = client
         self.use_post_processing = use_post_processing
         self.llm_optimized = llm_optimized
+        # Use the compacted prompts from llm_prompts_compact.py (see prompt_compiler.py)
+        self.compact_prompts = compact_prompts
+        # Pass the ranked vocabulary to Whisper's prompt (see vocabulary.py)
+        self.vocabulary_biasing = vocabulary_biasing
+        self.requests = RequestLimiter("openai", MAX_CONCURRENT_REQUESTS)
         
         # Neuer Debug-Log: Zeige deutlich die Initialisierungsparameter an
         print(f"🔧🔧🔧 OpenAIService initialisiert mit: use_post_processing={self.use_post_processing}, llm_optimized={self.llm_optimized}", file=sys.stderr)
@@ -33,89 +69,151 @@ class OpenAIService:
         if self.llm_optimized and not self.use_post_processing:
             self.use_post_processing = True
             print("⚠️ Note: LLM optimization requires post-processing. Enabling post-processing automatically.", file=sys.stderr)
-        
-        # Define German word replacements as a class attribute
-        self.german_word_replacements = {
-            "v-test": "Vitest",
-            "v-tests": "Vitest",
-            "package jason": "package.json",
-            "achse": ".exe",
-            "echse": ".exe",
-            "gyra": "Jira",
-            "effektor": "Refactor",
-            "pulverquest": "Pull Request",
-            "konsole locks": "console.log",
-            "juju-id": "UUID",
-            "loks": "Logs",
-            "locken": "loggen",
-            "commentline": "Command Line"
-        }
     
     @classmethod
-    def initialize(cls, api_key, use_post_processing=False, llm_optimized=False):
-        """Initialize OpenAI client with API key"""
+    def initialize(cls, api_key, use_post_processing=False, llm_optimized=False, base_url=None, compact_prompts=False,
+                   vocabulary_biasing=False):
+        """Initialize OpenAI client with API key (base_url points to a stand-in server for offline tests)"""
         try:
-            client = OpenAI(api_key=api_key)
-            return cls(client, use_post_processing, llm_optimized)
+            # Async client on the shared keep-alive pool: requests run on the event loop, and
+            # connections survive new service instances (create_service runs on every settings change)
+            options = {'api_key': api_key, 'http_client': http_pool.httpx_client()}
+            if base_url:
+                options['base_url'] = base_url
+            client = AsyncOpenAI(**options)
+            return cls(client, use_post_processing, llm_optimized, compact_prompts, vocabulary_biasing)
         except Exception as e:
             print(f"OpenAI init error: {str(e)}", file=sys.stderr)
             raise Exception(f"Failed to initialize OpenAI: {str(e)}")
     
+    async def keep_warm(self):
+        """Keep a pooled connection to the API open (runs until cancelled)"""
+        await http_pool.keep_warm("openai", str(self.client.base_url))
+    
     async def transcribe_audio(self, audio_file, language=None):
         """Transcribe audio file using OpenAI"""
+        data = await stage_executor('io').run(read_audio_file, audio_file)
+        return await self.transcribe_buffer(data, language)
+    
+    async def transcribe_buffer(self, audio_buffer, language=None, mimetype='audio/wav'):
+        """Transcribe an in-memory audio buffer using OpenAI"""
         try:
             # Debug-Log für aktuelle Werte der Parameter
-            print(f"🎯 transcribe_audio Start mit: use_post_processing={self.use_post_processing}, llm_optimized={self.llm_optimized}", file=sys.stderr)
+            print(f"🎯 transcribe_buffer Start mit: use_post_processing={self.use_post_processing}, llm_optimized={self.llm_optimized}", file=sys.stderr)
             
-            with open(audio_file, 'rb') as audio:
-                # Use asyncio to run the synchronous API call in a thread pool
-                loop = asyncio.get_event_loop()
-                
-                # Prepare parameters for the API call
-                params = {
-                    "model": "whisper-1",
-                    "file": audio,
-                }
-                
-                # OpenAI doesn't support 'auto' - we just omit the language parameter
-                # for auto-detection. For other languages, ensure we're sending valid codes
-                if language and language != "auto":
-                    # Make sure we're using a valid ISO-639-1 code
-                    params["language"] = language
-                
-                print(f"🎤 Calling OpenAI Whisper with params: {params}", file=sys.stderr)
-                
-                transcription = await loop.run_in_executor(
-                    None,
-                    lambda: self.client.audio.transcriptions.create(**params)
-                )
-                
-                transcript = transcription.text
-                # Log the full initial transcript
-                print(f"📝 Initial transcription: '{transcript}'", file=sys.stderr)
-                
-                # Apply post-processing if enabled
-                if self.use_post_processing and transcript:
-                    print(f"⏳ Applying GPT-4 post-processing to improve quality... (language={language})", file=sys.stderr)
-                    print(f"📊 DEBUG: Post-processing is enabled = {self.use_post_processing}", file=sys.stderr)
-                    if self.llm_optimized:
-                        print(f"🚀 LLM optimization is enabled. Text will be optimized for LLM consumption.", file=sys.stderr)
-                    processed_transcript = await self.post_process_with_gpt4(transcript, language)
-                    print(f"🏁 FINAL RESULT: '{processed_transcript}'", file=sys.stderr)
-                    return processed_transcript
-                else:
-                    print(f"⚠️ No post-processing applied! use_post_processing={self.use_post_processing}", file=sys.stderr)
-                
-                return transcript
+            transcript = await self.transcribe_raw(audio_buffer, language, mimetype)
+            return await self.finalize_transcript(transcript, language)
         except Exception as e:
             print(f"❌ OpenAI transcription error: {str(e)}", file=sys.stderr)
             raise Exception(f"OpenAI transcription error: {str(e)}")
     
+    async def transcribe_raw(self, audio_buffer, language=None, mimetype='audio/wav'):
+        """Whisper transcription only, without GPT-4 post-processing"""
+        transcription = await self._create_transcription(audio_buffer, language, mimetype)
+        transcript = transcription.text
+        # Log the full initial transcript
+        print(f"📝 Initial transcription: '{transcript}'", file=sys.stderr)
+        return transcript
+    
+    async def transcribe_words(self, audio_buffer, language=None, mimetype='audio/wav'):
+        """Whisper transcription with word timestamps.
+
+        Returns (text, [(word, start_s, end_s), ...]); the word list is None
+        if the response has no timestamps.
+        """
+        transcription = await self._create_transcription(
+            audio_buffer, language, mimetype, response_format="verbose_json", timestamp_granularities=["word"]
+        )
+        words = getattr(transcription, 'words', None)
+        if words is not None:
+            words = [(word.word, word.start, word.end) for word in words]
+        print(f"📝 Initial transcription: '{transcription.text}'", file=sys.stderr)
+        return transcription.text, words
+    
+    async def _create_transcription(self, audio_buffer, language, mimetype, **options):
+        # Prepare parameters for the API call
+        params = {
+            "model": "whisper-1",
+            "file": (upload_filename(mimetype), as_file_object(audio_buffer), mimetype),
+            **options,
+        }
+        
+        # OpenAI doesn't support 'auto' - we just omit the language parameter
+        # for auto-detection. For other languages, ensure we're sending valid codes
+        if language and language != "auto":
+            # Make sure we're using a valid ISO-639-1 code
+            params["language"] = language
+        
+        if self.vocabulary_biasing:
+            prompt = vocabulary.whisper_prompt(language)
+            if prompt:
+                params["prompt"] = prompt
+        
+        print(f"🎤 Calling OpenAI Whisper with params: {params}", file=sys.stderr)
+        
+        async with self.requests.slot():
+            return await self.client.audio.transcriptions.create(**params)
+    
+    async def finalize_transcript(self, transcript, language=None):
+        """Apply GPT-4 post-processing to a Whisper transcript if enabled"""
+        if not transcript:
+            # No speech: nothing to post-process or paste
+            return ""
+        if self.use_post_processing:
+            print(f"⏳ Applying GPT-4 post-processing to improve quality... (language={language})", file=sys.stderr)
+            print(f"📊 DEBUG: Post-processing is enabled = {self.use_post_processing}", file=sys.stderr)
+            if self.llm_optimized:
+                print(f"🚀 LLM optimization is enabled. Text will be optimized for LLM consumption.", file=sys.stderr)
+            processed_transcript = await self.post_process_with_gpt4(transcript, language)
+            print(f"🏁 FINAL RESULT: '{processed_transcript}'", file=sys.stderr)
+            return processed_transcript
+        else:
+            print(f"⚠️ No post-processing applied! use_post_processing={self.use_post_processing}", file=sys.stderr)
+        
+        # Without GPT-4 the correction dictionary is the only clean-up
+        return self.apply_replacements(transcript, language)
+    
+    async def transcribe_long(self, audio, language=None, codec='flac', parallelism=DEFAULT_PARALLEL_UPLOADS, compression=1.0):
+        """Transcribe a recording whose upload would exceed max_upload_bytes.
+
+        The PCM is cut at silence into chunks that fit the limit after encoding
+        (compression = encoded size / PCM size of the full recording), the
+        chunks are transcribed with at most parallelism requests in flight,
+        and the texts are joined in order. Returns the raw transcript; GPT-4
+        post-processing is left to finalize_transcript().
+        """
+        # 80% of the limit leaves room for chunks that compress worse than average
+        chunk_bytes = int(self.max_upload_bytes * 0.8 / max(compression, 0.01))
+        chunks = split_at_silence(audio.pcm, audio.rate, audio.channels, chunk_bytes, audio.sample_width)
+        print(f"✂️ Upload over {self.max_upload_bytes // (1024 * 1024)} MB: {len(chunks)} chunks, {parallelism} in parallel", file=sys.stderr)
+        metrics.observe("split.chunks", len(chunks))
+        semaphore = asyncio.Semaphore(max(1, parallelism))
+        
+        async def transcribe_chunk(pcm):
+            payload, mimetype = await stage_executor('encode').run(encode_pcm, pcm, codec, audio.channels, audio.rate)
+            if payload.getbuffer().nbytes > self.max_upload_bytes and len(pcm) > audio.rate * audio.channels * audio.sample_width:
+                # Compressed worse than estimated - halve this chunk
+                halves = split_at_silence(pcm, audio.rate, audio.channels, len(pcm) // 2 + 1, audio.sample_width)
+                texts = await asyncio.gather(*(transcribe_chunk(half) for half in halves))
+                return ' '.join(text for text in texts if text)
+            async with semaphore:
+                return await self.transcribe_raw(payload, language, mimetype)
+        
+        with metrics.timer("split.transcribe_ms"):
+            texts = await asyncio.gather(*(transcribe_chunk(chunk) for chunk in chunks))
+        return ' '.join(text for text in texts if text)
+    
+    def open_segmented_stream(self, loop, language, rate, channels, codec, on_interim=None):
+        """Start a segmented transcription that sends completed segments while recording.
+
+        Returns a WhisperSegmentSession; segments are transcribed on loop (the
+        app's asyncio thread) as soon as they are cut.
+        """
+        return WhisperSegmentSession(self, loop, language, rate, channels, codec, on_interim)
+    
     async def post_process_with_gpt4(self, transcript, language=None):
         """Post-process transcript with GPT-4 to improve quality"""
         try:
-            loop = asyncio.get_event_loop()
-            
             # Log language parameter
             print(f"🚩 DEBUG: post_process_with_gpt4 called with language='{language}'", file=sys.stderr)
             print(f"🔧 Settings: post_processing={self.use_post_processing}, llm_optimized={self.llm_optimized}", file=sys.stderr)
@@ -134,23 +232,13 @@ class OpenAIService:
             if self.llm_optimized and re.search(r"(hey|hallo|hi)\s+llm", transcript, re.IGNORECASE):
                 print(f"👋 Direkte LLM-Anfrage erkannt: Wird speziell verarbeitet", file=sys.stderr)
             
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.client.chat.completions.create(
+            async with self.requests.slot():
+                response = await self.client.chat.completions.create(
                     model="gpt-4o",
                     temperature=0,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": system_prompt
-                        },
-                        {
-                            "role": "user",
-                            "content": transcript
-                        }
-                    ]
+                    messages=self._build_messages(system_prompt, transcript)
                 )
-            )
+            self._record_prompt_usage(response.usage)
             
             processed_text = response.choices[0].message.content
             print(f"✅ GPT-4 post-processing complete", file=sys.stderr)
@@ -166,20 +254,12 @@ class OpenAIService:
             else:
                 print(f"❌❌❌ DEBUG: 'V-Test' pattern NOT found in GPT-4 processed text!", file=sys.stderr)
             
-            # Apply explicit German word replacements if language is German
-            final_text = processed_text
+            # Apply the explicit word replacements of the language's correction dictionary
+            print(f"⚙️ Applying explicit word replacements... (language='{language}')", file=sys.stderr)
+            final_text = self.apply_replacements(processed_text, language)
+            print(f"🔧 Text after explicit replacements: '{final_text}'", file=sys.stderr)
+            
             if language == "de":
-                print(f"⚙️ Applying explicit German word replacements... (language confirmed as 'de')", file=sys.stderr)
-                final_text = self._apply_german_word_replacements(processed_text)
-                
-                # Check if there was any difference
-                if final_text != processed_text:
-                    print(f"✓ Replacements applied successfully", file=sys.stderr)
-                else:
-                    print(f"ℹ️ No word replacements needed", file=sys.stderr)
-                    
-                print(f"🔧 Text after explicit replacements: '{final_text}'", file=sys.stderr)
-                
                 # Final check for V-Test (debug)
                 if re.search(r"v[-\s]tests?", final_text, re.IGNORECASE):
                     print(f"❌❌❌ ERROR: 'V-Test' pattern STILL in final text!", file=sys.stderr)
@@ -206,108 +286,150 @@ class OpenAIService:
             print("⚠️ Returning original transcript instead", file=sys.stderr)
             return transcript
     
-    def _get_system_prompt_for_language(self, language):
-        """Get appropriate system prompt based on language and optimization mode"""
-        # Select the base prompt based on optimization mode
-        selected_base_prompt = LLM_OPTIMIZED_BASE_PROMPT if self.llm_optimized else STANDARD_BASE_PROMPT
-        
-        # Language-specific additions
-        if language == "de":
-            # Construct the specific correction instructions for German
-            correction_instructions = "\nAdditionally, try to correct the following common misrecognitions in German technical context (case-insensitive matching):\n"
-            # Use the class attribute here
-            for wrong, correct in self.german_word_replacements.items(): 
-                # Make case-insensitivity explicit in the instruction to GPT-4
-                correction_instructions += f"- If you see '{wrong}' (case-insensitive), try to correct it to '{correct}'.\n"
-
-            # Wähle die passenden sprachspezifischen Anweisungen für Deutsch
-            german_specific = DE_LLM_OPTIMIZED_ADDITIONS if self.llm_optimized else DE_STANDARD_ADDITIONS
-            
-            return selected_base_prompt + german_specific + correction_instructions
-            
-        elif language == "en":
-            # Wähle die passenden sprachspezifischen Anweisungen für Englisch
-            english_specific = EN_LLM_OPTIMIZED_ADDITIONS if self.llm_optimized else EN_STANDARD_ADDITIONS
-            
-            return selected_base_prompt + english_specific
-            
-        elif language == "fr":
-            # Wähle die passenden sprachspezifischen Anweisungen für Französisch
-            french_specific = FR_LLM_OPTIMIZED_ADDITIONS if self.llm_optimized else FR_STANDARD_ADDITIONS
-            
-            return selected_base_prompt + french_specific
-            
-        elif language == "es":
-            # Wähle die passenden sprachspezifischen Anweisungen für Spanisch
-            spanish_specific = ES_LLM_OPTIMIZED_ADDITIONS if self.llm_optimized else ES_STANDARD_ADDITIONS
-            
-            return selected_base_prompt + spanish_specific
-            
+    async def finalize_transcript_stream(self, transcript, language=None):
+        """Streaming variant of finalize_transcript: async generator of text deltas"""
+        if not transcript:
+            return
+        if self.use_post_processing:
+            async for delta in self.post_process_stream(transcript, language):
+                yield delta
         else:
-            # Für alle anderen Sprachen verwenden wir generische Anweisungen
-            generic_specific = GENERIC_LLM_OPTIMIZED_ADDITIONS if self.llm_optimized else GENERIC_STANDARD_ADDITIONS
-            
-            return selected_base_prompt + generic_specific
+            # The caller applies apply_replacements() to the streamed sentences
+            yield transcript
+    
+    async def post_process_stream(self, transcript, language=None):
+        """GPT-4 post-processing with stream=True: yields the completion's text deltas as they arrive.
+
+        Dictionary word replacements are not applied here - they need whole
+        words, so the caller applies apply_replacements() to complete
+        sentences. If the request fails before the first token the original
+        transcript is yielded instead (like post_process_with_gpt4); a failure
+        after that is raised, since part of the text is already delivered.
+        """
+        system_prompt = self._get_system_prompt_for_language(language)
+        print(f"🧠 Starting streamed GPT-4 post-processing for transcript...", file=sys.stderr)
+        received = 0
+        try:
+            async with self.requests.slot():
+                stream = await self.client.chat.completions.create(
+                    model="gpt-4o",
+                    temperature=0,
+                    messages=self._build_messages(system_prompt, transcript),
+                    stream=True,
+                    # The last chunk carries the usage (no choices) for the cached-token metrics
+                    stream_options={"include_usage": True}
+                )
+                async for chunk in stream:
+                    if chunk.usage is not None:
+                        self._record_prompt_usage(chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received += len(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            print(f"✅ Streamed GPT-4 post-processing complete ({received} characters)", file=sys.stderr)
+        except Exception as e:
+            print(f"❌ Streamed post-processing error: {str(e)}", file=sys.stderr)
+            if received:
+                raise
+            print("⚠️ Returning original transcript instead", file=sys.stderr)
+            yield transcript
     
-    def _apply_german_word_replacements(self, text):
-        """Apply explicit, case-insensitive word replacements for German text."""
+    def apply_replacements(self, text, language=None):
+        """Explicit, case-insensitive word replacements from the language's correction dictionary"""
         if not text:
             return text
         
         print(f"🔍 DEBUG: Starting word replacements on text: '{text}'", file=sys.stderr)
-        corrected_text = text
-        replacement_occurred = False
+        corrected_text, replaced = dictionaries.apply(text, language)
         
-        # Use the class attribute for general replacements
-        for wrong, correct in self.german_word_replacements.items():
-            # Escape any regex special characters in the 'wrong' string
-            escaped_wrong = re.escape(wrong)
-            
-            # Create patterns with flexibility
-            patterns_to_try = []
-            
-            # Standard pattern with word boundaries
-            patterns_to_try.append(r'\b' + escaped_wrong + r'\b')
-            
-            # Add plural form if not already ending with 's'
-            if not wrong.endswith('s'):
-                patterns_to_try.append(r'\b' + escaped_wrong + r's\b')
-            
-            # Add flexibility for hyphens if present
-            if '-' in wrong:
-                # Replace hyphen with optional hyphen or space pattern
-                flexible_pattern = escaped_wrong.replace('\\-', '[-\\s]')
-                patterns_to_try.append(r'\b' + flexible_pattern + r'\b')
-                # And plural version if needed
-                if not wrong.endswith('s'):
-                    patterns_to_try.append(r'\b' + flexible_pattern + r's\b')
-            
-            # Try each pattern
-            for pattern in patterns_to_try:
-                try:
-                    # Check if this pattern has any matches
-                    if re.search(pattern, corrected_text, flags=re.IGNORECASE):
-                        # Store before replacement for comparison
-                        before_replacement = corrected_text
-                        
-                        # Apply the replacement
-                        corrected_text = re.sub(pattern, correct, corrected_text, flags=re.IGNORECASE)
-                        
-                        # Debug: show exactly what changed, but only if something actually changed
-                        if before_replacement != corrected_text:
-                            print(f"✓ Replaced: '{wrong}' → '{correct}'", file=sys.stderr)
-                            replacement_occurred = True
-                except re.error as e:
-                    print(f"⚠️ Regex error for pattern '{wrong}': {e}", file=sys.stderr)
+        for wrong, correct in dict.fromkeys(replaced):
+            print(f"✓ Replaced: '{wrong}' → '{correct}'", file=sys.stderr)
         
         # Log summary of replacements
-        if replacement_occurred:
+        if replaced:
             print(f"✅ Completed word replacements", file=sys.stderr)
         else:
             print(f"ℹ️ No word replacements needed", file=sys.stderr)
             
         return corrected_text
     
+    @staticmethod
+    def _build_messages(system_prompt, transcript):
+        # Static system prompt first, the per-dictation transcript last: keeps the cached prefix intact
+        return [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": transcript
+            }
+        ]
+    
+    def _get_system_prompt_for_language(self, language):
+        """Get appropriate system prompt based on language and optimization mode.
+
+        Prompts are built once per (language, optimization mode, dictionary
+        version) and then returned as the very same string, so every request
+        starts with a byte-identical prefix and the provider's prompt caching
+        can hit. The large static part (base prompt + language additions)
+        comes first; the dictionary-dependent corrections are last.
+        """
+        start = time.perf_counter()
+        key = (language, self.llm_optimized, self.compact_prompts, dictionaries.version_for(language))
+        with _system_prompt_lock:
+            system_prompt = _system_prompt_cache.get(key)
+            if system_prompt is not None:
+                _system_prompt_cache.move_to_end(key)
+        if system_prompt is None:
+            metrics.increment("prompt.cache_misses")
+            system_prompt = self._build_system_prompt(language)
+            with _system_prompt_lock:
+                # A reloaded dictionary makes the prompts of its older versions unreachable
+                for stale in [cached for cached in _system_prompt_cache if cached[:3] == key[:3]]:
+                    del _system_prompt_cache[stale]
+                _system_prompt_cache[key] = system_prompt
+                while len(_system_prompt_cache) > MAX_CACHED_SYSTEM_PROMPTS:
+                    _system_prompt_cache.popitem(last=False)
+        else:
+            metrics.increment("prompt.cache_hits")
+        metrics.observe("prompt.build_ms", (time.perf_counter() - start) * 1000)
+        return system_prompt
+    
+    def _build_system_prompt(self, language):
+        # Base prompt of the optimization mode + language-specific additions (generic for all other languages)
+        prompts = llm_prompts_compact if self.compact_prompts else llm_prompts
+        system_prompt = compose_base_prompt(prompts, language, self.llm_optimized)
+        
+        replacements = dictionaries.replacements_for(language)
+        if replacements:
+            # Construct the specific correction instructions from the language's dictionary
+            context = "German technical context" if language == "de" else "technical context"
+            correction_instructions = f"\nAdditionally, try to correct the following common misrecognitions in {context} (case-insensitive matching):\n"
+            for wrong, correct in list(replacements.items())[:MAX_PROMPT_CORRECTIONS]: 
+                # Make case-insensitivity explicit in the instruction to GPT-4
+                correction_instructions += f"- If you see '{wrong}' (case-insensitive), try to correct it to '{correct}'.\n"
+            system_prompt += correction_instructions
+        
+        return system_prompt
+    
+    @staticmethod
+    def _record_prompt_usage(usage):
+        """Report prompt tokens and how many of them the provider served from its prompt cache"""
+        if usage is None or not usage.prompt_tokens:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', None) or 0) if details is not None else 0
+        ratio = cached_tokens / usage.prompt_tokens
+        metrics.observe("llm.prompt_tokens", usage.prompt_tokens)
+        metrics.observe("llm.cached_tokens", cached_tokens)
+        metrics.observe("llm.cached_ratio", ratio)
+        print(
+            f"🧮 Prompt: {usage.prompt_tokens} tokens, {cached_tokens} cached ({ratio:.0%}), "
+            f"build {metrics.get_last('prompt.build_ms'):.2f} ms",
+            file=sys.stderr
+        )
+    
     @staticmethod
     def get_supported_languages():
         """Return a dictionary of supported languages for UI selection"""
@@ -327,4 +449,161 @@ class OpenAIService:
             "nl": "Nederlands",
             "sv": "Svenska",
             "pl": "Polski"
-        } 
\ No newline at end of file
+        }
+
+
+def _normalize_word(word):
+    return re.sub(r"[^\w']", '', word.lower())
+
+
+def stitch_segments(texts, overlap_words=None):
+    """Join segment transcripts in order, dropping words repeated by the audio overlap.
+
+    overlap_words[i] is the number of leading words of texts[i] that lie in
+    audio repeated from the previous segment (0 for a segment without
+    overlap); only those can be dropped, and only where they match the end
+    of the previous text. Without overlap_words nothing is dropped, so words
+    the speaker really repeated at a pause are kept.
+    """
+    words = []
+    for index, text in enumerate(texts):
+        new_words = (text or '').split()
+        max_overlap = overlap_words[index] if overlap_words else 0
+        overlap = 0
+        for size in range(min(max_overlap, len(words), len(new_words)), 0, -1):
+            if [_normalize_word(w) for w in words[-size:]] == [_normalize_word(w) for w in new_words[:size]]:
+                overlap = size
+                break
+        words.extend(new_words[overlap:])
+    return ' '.join(words)
+
+
+class WhisperSegmentSession:
+    """Cuts an in-progress recording at pauses and transcribes each segment right away.
+
+    send() is called from the recording thread with the captured PCM. The
+    session measures the trailing silence itself from the frame energies,
+    so it also cuts at pauses when silence trimming (the VAD) is off; with
+    the VAD on, the larger of both pauses counts. After a pause of
+    SEGMENT_PAUSE_MS (or MAX_SEGMENT_MS without one) the collected audio is encoded and sent
+    to Whisper in the background while the user keeps talking. A cut at a
+    pause falls into silence, so the next segment starts fresh. After a
+    hard cut at MAX_SEGMENT_MS the next segment starts with the last
+    SEGMENT_OVERLAP_MS of the previous one, so a word spanning the cut is
+    not lost; it is transcribed with word timestamps and stitch_segments()
+    drops only the repeated words that fall inside that window. At stop
+    only the last segment is still outstanding.
+    """
+    
+    mode = "segmented"
+    
+    def __init__(self, service, loop, language, rate, channels, codec, on_interim=None):
+        self.service = service
+        self.loop = loop
+        self.language = language
+        self.rate = rate
+        self.channels = channels
+        self.codec = codec
+        self.on_interim = on_interim
+        self.finished = False
+        self._bytes_per_ms = rate * channels * 2 / 1000.0
+        frame_bytes = channels * 2
+        self._overlap_bytes = int(SEGMENT_OVERLAP_MS * self._bytes_per_ms) // frame_bytes * frame_bytes
+        self._current = bytearray()
+        self._overlap = b''
+        self._pause_frame_bytes = max(1, rate * PAUSE_FRAME_MS // 1000) * frame_bytes
+        self._pause_carry = b''
+        self.silence_ms = 0
+        self._futures = []
+        # index -> (text, leading words inside the overlap window)
+        self._texts = {}
+    
+    @property
+    def pending_ms(self):
+        return len(self._current) / self._bytes_per_ms
+    
+    def send(self, pcm, trailing_silence_ms=0):
+        """Add captured PCM; cuts a segment at a long enough pause"""
+        if pcm:
+            self._current += pcm
+            self._measure_silence(pcm)
+        trailing_silence_ms = max(trailing_silence_ms, self.silence_ms)
+        if trailing_silence_ms >= SEGMENT_PAUSE_MS and self.pending_ms >= MIN_SEGMENT_MS:
+            self.cut()
+        elif self.pending_ms >= MAX_SEGMENT_MS:
+            self.cut(hard=True)
+    
+    def _measure_silence(self, pcm):
+        """Update silence_ms, the length of the pause at the end of the audio so far"""
+        data = self._pause_carry + bytes(pcm)
+        usable = len(data) - len(data) % self._pause_frame_bytes
+        self._pause_carry = data[usable:]
+        if not usable:
+            return
+        energies = frame_energies_db(np.frombuffer(data[:usable], dtype=np.int16), self._pause_frame_bytes // 2)
+        loud = np.flatnonzero(energies >= PAUSE_THRESHOLD_DB)
+        if len(loud):
+            self.silence_ms = (len(energies) - 1 - loud[-1]) * PAUSE_FRAME_MS
+        else:
+            self.silence_ms += len(energies) * PAUSE_FRAME_MS
+    
+    def cut(self, final=False, hard=False):
+        """Close the current segment and start transcribing it.
+
+        hard marks a cut without a pause: only then does the next segment
+        repeat the end of this one.
+        """
+        if not self._current:
+            return
+        if final and self._futures and self.pending_ms < MIN_FINAL_SEGMENT_MS:
+            self._current = bytearray()
+            return
+        overlap_ms = len(self._overlap) / self._bytes_per_ms
+        segment = self._overlap + bytes(self._current)
+        self._overlap = bytes(self._current[-self._overlap_bytes:]) if hard and self._overlap_bytes else b''
+        self._current = bytearray()
+        index = len(self._futures)
+        print(f"✂️ Whisper segment {index + 1}: {len(segment) / self._bytes_per_ms:.0f} ms", file=sys.stderr)
+        self._futures.append(self.loop.submit(self._transcribe_segment(index, segment, overlap_ms)))
+    
+    async def _transcribe_segment(self, index, pcm, overlap_ms=0):
+        payload, mimetype = await stage_executor('encode').run(encode_pcm, pcm, self.codec, self.channels, self.rate)
+        with metrics.timer("whisper.segment_ms"):
+            if overlap_ms:
+                text, words = await self.service.transcribe_words(payload, self.language, mimetype)
+            else:
+                text, words = await self.service.transcribe_raw(payload, self.language, mimetype), []
+        if words is None:
+            # No timestamps in the response: any of the first few words may be a repeat
+            overlap_words = STITCH_MAX_OVERLAP_WORDS
+        else:
+            overlap_words = sum(1 for _, start, _ in words if start * 1000 < overlap_ms)
+        self._texts[index] = (text, overlap_words)
+        self._report_progress()
+        return self._texts[index]
+    
+    def _report_progress(self):
+        if self.on_interim is None or self.finished:
+            return
+        # Only show the segments that are complete without a gap
+        done = []
+        while len(done) in self._texts:
+            done.append(self._texts[len(done)])
+        if done:
+            self.on_interim(stitch_segments(*zip(*done)))
+    
+    async def finish(self):
+        """Send the last segment, wait for all of them and return the stitched raw transcript"""
+        try:
+            self.cut(final=True)
+            segments = [await asyncio.wrap_future(future) for future in self._futures]
+        finally:
+            self.finished = True
+        metrics.observe("whisper.segments", len(segments))
+        return stitch_segments(*zip(*segments)) if segments else ""
+    
+    def abort(self):
+        """Drop all segments (e.g. nothing was said)"""
+        self.finished = True
+        for future in self._futures:
+            future.cancel()
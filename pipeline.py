@@ -0,0 +1,280 @@
+"""
+Job-Übergabe zwischen Aufnahme und Transkription.
+"""
+import queue
+import re
+import sys
+import threading
+import time
+from metrics import metrics
+
+
+class RecordingJob:
+    """A finished recording (in-memory AudioBuffer) that is waiting to be transcribed.
+
+    payload/mimetype hold the upload container produced while recording; if
+    payload is None the PCM is wrapped in a WAV container on demand.
+    live_session is set when the audio was already streamed to the service
+    during recording. stopped_at marks when recording stopped, the start of
+    the stop-to-text latency. encoder is a StreamingEncoder that still has
+    to be finished (finish_encoding()) before the payload can be uploaded.
+    transcript/error are filled in by the pipeline stages; first_pass keeps
+    the STT output before post-processing. stream is a TextStream when
+    post-processing streams its output to the delivery stage.
+    """
+
+    def __init__(self, index, audio, payload=None, mimetype='audio/wav', live_session=None, stopped_at=None, encoder=None):
+        self.index = index
+        self.audio = audio
+        self.payload = payload
+        self.mimetype = mimetype
+        self.live_session = live_session
+        self.encoder = encoder
+        self.created_at = time.perf_counter()
+        self.stopped_at = stopped_at if stopped_at is not None else self.created_at
+        self.sequence = None
+        self.stream = None
+        self.transcript = None
+        self.first_pass = None
+        self.mode = None
+        self.error = None
+
+    def finish_encoding(self):
+        """Flush the streaming encoder into the upload payload"""
+        if self.encoder is not None:
+            self.payload = self.encoder.finish()
+            self.mimetype = self.encoder.mimetype
+            self.encoder = None
+
+    def upload_payload(self):
+        """Return (buffer, mimetype) ready for SpeechToTextService.transcribe_buffer"""
+        if self.payload is None:
+            return self.audio.to_wav_buffer(), 'audio/wav'
+        self.payload.seek(0)
+        return self.payload, self.mimetype
+
+
+class TextStream:
+    """Streamed text handed from the event loop to the delivery thread.
+
+    The producer calls feed() for every delta (token) and close() at the
+    end. The delivery thread iterates chunks(): each step returns the raw
+    text received since the previous step (for a live preview) and the
+    complete sentences that are ready to paste. Sentences that pile up
+    while a paste is running are merged into one increment.
+    """
+
+    # A sentence ends at . ! ? ; : followed by whitespace, or at a line break
+    SENTENCE_END = re.compile(r'[.!?;:]\s+|\n+')
+
+    def __init__(self, transform=None):
+        self._queue = queue.Queue()
+        self._transform = transform
+        self._pending = ''
+        self.error = None
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+
+    def feed(self, delta):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self._queue.put(delta)
+
+    def close(self, error=None):
+        self.error = error
+        self.finished_at = time.perf_counter()
+        self._queue.put(None)
+
+    def chunks(self):
+        """Yield (new_text, ready_text) until the stream is closed; raises the producer's error"""
+        while True:
+            items = [self._queue.get()]
+            while items[-1] is not None:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            finished = items[-1] is None
+            new_text = ''.join(item for item in items if item is not None)
+            self._pending += new_text
+            if finished:
+                ready, self._pending = self._pending, ''
+            else:
+                cut = 0
+                for match in self.SENTENCE_END.finditer(self._pending):
+                    cut = match.end()
+                ready, self._pending = self._pending[:cut], self._pending[cut:]
+            if ready and self._transform is not None:
+                ready = self._transform(ready)
+            if new_text or ready:
+                yield new_text, ready
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class JobQueue:
+    """Blocking FIFO hand-off between producer and consumer threads.
+
+    Consumers block in get() until a job arrives, so an idle worker does not
+    wake up at all. close() wakes a blocked consumer with a None sentinel.
+    """
+
+    def __init__(self, name, maxsize=0):
+        self.name = name
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, job):
+        """Enqueue a job and update the depth gauge"""
+        self._queue.put((time.perf_counter(), job))
+        metrics.increment(f"{self.name}.enqueued")
+        metrics.set_gauge(f"{self.name}.depth", self._queue.qsize())
+
+    def get(self):
+        """Block until a job is available. Returns None after close()"""
+        enqueued_at, job = self._queue.get()
+        metrics.set_gauge(f"{self.name}.depth", self._queue.qsize())
+        if job is None:
+            return None
+        metrics.observe(f"{self.name}.wait_ms", (time.perf_counter() - enqueued_at) * 1000)
+        return job
+
+    def close(self):
+        """Wake up a blocked consumer so it can shut down"""
+        self._queue.put((time.perf_counter(), None))
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class PipelineStage:
+    """One stage of a StagedPipeline: a bounded input queue and its worker threads"""
+
+    def __init__(self, name, handler, workers=1, maxsize=0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue = JobQueue(f"pipeline.{name}", maxsize)
+        self.threads = []
+
+
+class StagedPipeline:
+    """Staged job processing with bounded queues, per-stage worker counts and ordered delivery.
+
+    Every stage has its own queue and workers, so a later recording can be in
+    the STT stage while an earlier one is still being post-processed. A
+    handler that raises marks the job (job.error) and the remaining stages
+    skip it. deliver is called on a single thread in submission order: a job
+    that finishes early waits in a reorder buffer until all earlier jobs have
+    been delivered, so text is pasted in the order it was recorded.
+
+    Metrics: pipeline.<stage>.depth (queue depth), pipeline.<stage>_ms (time
+    in the handler), pipeline.in_flight, pipeline.delivered and
+    pipeline.throughput_per_min (over the last THROUGHPUT_WINDOW deliveries).
+    """
+
+    THROUGHPUT_WINDOW = 10
+
+    def __init__(self, deliver, maxsize=0):
+        self.deliver = deliver
+        self._stages = []
+        self._delivery = JobQueue("pipeline.deliver", maxsize)
+        self._delivery_thread = None
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._next_submit = 0
+        self._in_flight = 0
+        self._delivered_at = []
+
+    def add_stage(self, name, handler, workers=1):
+        """Append a stage; handler(job) runs on one of workers threads"""
+        self._stages.append(PipelineStage(name, handler, workers, self._maxsize))
+        return self
+
+    def start(self):
+        for index, stage in enumerate(self._stages):
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_stage, args=(index,), name=f"pipeline-{stage.name}-{worker}", daemon=True
+                )
+                thread.start()
+                stage.threads.append(thread)
+        self._delivery_thread = threading.Thread(target=self._run_delivery, name="pipeline-deliver", daemon=True)
+        self._delivery_thread.start()
+        return self
+
+    def submit(self, job):
+        """Number the job and hand it to the first stage (blocks while that queue is full)"""
+        with self._lock:
+            job.sequence = self._next_submit
+            self._next_submit += 1
+            self._in_flight += 1
+            metrics.set_gauge("pipeline.in_flight", self._in_flight)
+        self._forward(-1, job)
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return self._in_flight
+
+    def _forward(self, index, job):
+        if index + 1 < len(self._stages):
+            self._stages[index + 1].queue.put(job)
+        else:
+            self._delivery.put(job)
+
+    def _run_stage(self, index):
+        stage = self._stages[index]
+        while True:
+            job = stage.queue.get()
+            if job is None:
+                break
+            if job.error is None:
+                try:
+                    with metrics.timer(f"pipeline.{stage.name}_ms"):
+                        stage.handler(job)
+                except Exception as e:
+                    job.error = e
+                    metrics.increment(f"pipeline.{stage.name}.errors")
+            self._forward(index, job)
+
+    def _run_delivery(self):
+        waiting = {}
+        next_sequence = 0
+        while True:
+            job = self._delivery.get()
+            if job is None:
+                break
+            job.ready_at = time.perf_counter()
+            waiting[job.sequence] = job
+            while next_sequence in waiting:
+                job = waiting.pop(next_sequence)
+                next_sequence += 1
+                metrics.observe("pipeline.reorder_wait_ms", (time.perf_counter() - job.ready_at) * 1000)
+                try:
+                    with metrics.timer("pipeline.deliver_ms"):
+                        self.deliver(job)
+                except Exception as e:
+                    print(f"Delivery error: {str(e)}", file=sys.stderr)
+                self._record_delivery()
+
+    def _record_delivery(self):
+        now = time.perf_counter()
+        with self._lock:
+            self._in_flight -= 1
+            metrics.set_gauge("pipeline.in_flight", self._in_flight)
+            self._delivered_at = (self._delivered_at + [now])[-self.THROUGHPUT_WINDOW:]
+            if len(self._delivered_at) > 1:
+                span = self._delivered_at[-1] - self._delivered_at[0]
+                if span > 0:
+                    metrics.set_gauge("pipeline.throughput_per_min", round((len(self._delivered_at) - 1) * 60 / span, 1))
+        metrics.increment("pipeline.delivered")
+
+    def close(self):
+        """Wake up all workers so they can shut down"""
+        for stage in self._stages:
+            for _ in stage.threads:
+                stage.queue.close()
+        self._delivery.close()
@@ -0,0 +1,157 @@
+"""
+Prompt-Compiler: zählt Tokens je Prompt-Variante und erzeugt aus llm_prompts.py die kompakte Variante llm_prompts_compact.py.
+"""
+import argparse
+import importlib
+import math
+import os
+import re
+import sys
+
+import llm_prompts
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokenizer of gpt-4o; without tiktoken tokens are estimated from the UTF-8 size
+TOKENIZER_ENCODING = "o200k_base"
+BYTES_PER_TOKEN_ESTIMATE = 4
+
+COMPACT_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_prompts_compact.py")
+
+# Language-specific additions to the base prompt; other languages get the generic ones
+# (standard, LLM-optimized)
+LANGUAGE_ADDITIONS = {
+    'de': ('DE_STANDARD_ADDITIONS', 'DE_LLM_OPTIMIZED_ADDITIONS'),
+    'en': ('EN_STANDARD_ADDITIONS', 'EN_LLM_OPTIMIZED_ADDITIONS'),
+    'fr': ('FR_STANDARD_ADDITIONS', 'FR_LLM_OPTIMIZED_ADDITIONS'),
+    'es': ('ES_STANDARD_ADDITIONS', 'ES_LLM_OPTIMIZED_ADDITIONS'),
+}
+GENERIC_ADDITIONS = ('GENERIC_STANDARD_ADDITIONS', 'GENERIC_LLM_OPTIMIZED_ADDITIONS')
+
+# Code blocks and inline code are copied verbatim: they hold literals the model has to reproduce
+PROTECTED_SPAN = re.compile(r'(^[ \t]*```.*?```|`[^`\n]*`)', re.DOTALL | re.MULTILINE)
+# "(CoT: `...` - INTERN)": instructions to log internally, never visible in the output
+COT_ANNOTATION = re.compile(r'[ \t]*\(CoT: `[^`]*`[^)\n]*\)')
+BOLD_MARKER = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*')
+LIST_MARKER = re.compile(r'^(\s*)\*\s{2,}', re.MULTILINE)
+INDENT = re.compile(r'^((?:    )+)', re.MULTILINE)
+
+
+def prompt_names(module=llm_prompts):
+    """Names of the prompt constants of a prompt module, in definition order"""
+    return [name for name, value in vars(module).items() if name.isupper() and isinstance(value, str)]
+
+
+def compose_base_prompt(module, language, llm_optimized):
+    """Base prompt + language additions of module (llm_prompts or llm_prompts_compact)"""
+    base = module.LLM_OPTIMIZED_BASE_PROMPT if llm_optimized else module.STANDARD_BASE_PROMPT
+    additions = LANGUAGE_ADDITIONS.get(language, GENERIC_ADDITIONS)[1 if llm_optimized else 0]
+    return base + getattr(module, additions)
+
+
+def count_tokens(text):
+    """Number of gpt-4o tokens of text (estimated when tiktoken is not installed)"""
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding(TOKENIZER_ENCODING).encode(text))
+    return math.ceil(len(text.encode('utf-8')) / BYTES_PER_TOKEN_ESTIMATE)
+
+
+def _compact_prose(text):
+    text = BOLD_MARKER.sub(r'\1', text)
+    text = LIST_MARKER.sub(r'\1* ', text)
+    text = INDENT.sub(lambda match: '  ' * (len(match.group(1)) // 4), text)
+    return re.sub(r'(?<=\S)[ \t]{2,}', ' ', text)
+
+
+def compact_prompt(text):
+    """Compacted prompt with the same instructions.
+
+    Mechanical rewrites only: internal CoT logging annotations are dropped,
+    bold emphasis markers are removed, list markers and indentation are
+    shortened and runs of blank lines collapsed. Code blocks and inline code
+    (output formats, example logs) are kept byte for byte.
+    """
+    text = COT_ANNOTATION.sub('', text)
+    parts = PROTECTED_SPAN.split(text)
+    text = ''.join(part if index % 2 else _compact_prose(part) for index, part in enumerate(parts))
+    text = re.sub(r'[ \t]+\n', '\n', text)
+    return re.sub(r'\n{3,}', '\n\n', text)
+
+
+def render_compact_module():
+    """Source of llm_prompts_compact.py"""
+    lines = [
+        '"""',
+        'Kompakte Varianten der Prompts aus llm_prompts.py (erzeugt von prompt_compiler.py - nicht von Hand bearbeiten).',
+        '"""',
+    ]
+    for name in prompt_names():
+        lines += ['', f'{name} = {compact_prompt(getattr(llm_prompts, name))!r}']
+    return '\n'.join(lines) + '\n'
+
+
+def token_budget(compact_module):
+    """Rows (variant, original tokens, compact tokens) for every prompt constant and system prompt"""
+    rows = [(name, count_tokens(getattr(llm_prompts, name)), count_tokens(getattr(compact_module, name)))
+            for name in prompt_names()]
+    for llm_optimized in (False, True):
+        for language in list(LANGUAGE_ADDITIONS) + [None]:
+            variant = f"system[{language or 'generic'}, {'llm-optimized' if llm_optimized else 'standard'}]"
+            rows.append((
+                variant,
+                count_tokens(compose_base_prompt(llm_prompts, language, llm_optimized)),
+                count_tokens(compose_base_prompt(compact_module, language, llm_optimized)),
+            ))
+    return rows
+
+
+def format_budget(rows):
+    unit = "tokens" if tiktoken is not None else f"tokens (estimated, {BYTES_PER_TOKEN_ESTIMATE} bytes/token)"
+    width = max(len(row[0]) for row in rows)
+    lines = [f"{'prompt':<{width}}  {'original':>8}  {'compact':>8}  {'saved':>6}   {unit}"]
+    for name, original, compact in rows:
+        saved = 1 - compact / original if original else 0
+        lines.append(f"{name:<{width}}  {original:8d}  {compact:8d}  {saved:6.0%}")
+    return '\n'.join(lines)
+
+
+def build_compact_module(check=False):
+    """Write llm_prompts_compact.py (or with check=True: verify it is current) and print the token budget.
+
+    Returns False if check=True and the file is out of date or tiktoken is
+    missing (the check reports exact token counts only).
+    """
+    if check and tiktoken is None:
+        print("❌ tiktoken is not installed - pip install -r requirements.txt", file=sys.stderr)
+        return False
+    source = render_compact_module()
+    try:
+        with open(COMPACT_MODULE_PATH, encoding='utf-8') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current != source:
+        if check:
+            print("❌ llm_prompts_compact.py is out of date - run python prompt_compiler.py", file=sys.stderr)
+            return False
+        with open(COMPACT_MODULE_PATH, 'w', encoding='utf-8') as f:
+            f.write(source)
+        print(f"✓ Wrote {os.path.basename(COMPACT_MODULE_PATH)}")
+
+    import llm_prompts_compact
+    print(format_budget(token_budget(importlib.reload(llm_prompts_compact))))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build llm_prompts_compact.py and print the token budget per prompt variant")
+    parser.add_argument("--check", action="store_true", help="fail if llm_prompts_compact.py is out of date (or tiktoken is missing) instead of writing it")
+    args = parser.parse_args()
+    return 0 if build_compact_module(args.check) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
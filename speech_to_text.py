@@ -12,6 +12,11 @@ class SpeechToTextService(ABC):
         """Transcribe audio file to text"""
         pass
     
+    @abstractmethod
+    async def transcribe_buffer(self, audio_buffer, language=None, mimetype='audio/wav'):
+        """Transcribe an in-memory audio container (BytesIO, bytes or memoryview) to text"""
+        pass
+    
     @classmethod
     @abstractmethod
     def initialize(cls, api_key):
@@ -40,11 +45,15 @@ class SpeechToTextService(ABC):
         }
 
 
-def create_service(service_type, api_key, post_processing=False, llm_optimized=False):
+def create_service(service_type, api_key, post_processing=False, llm_optimized=False, api_url=None, compact_prompts=False,
+                   vocabulary_biasing=False):
     """Factory function to create the appropriate speech-to-text service"""
     if service_type == "deepgram":
-        return DeepgramService.initialize(api_key)
+        return DeepgramService.initialize(api_key, api_url, vocabulary_biasing)
     elif service_type == "openai":
-        return OpenAIService.initialize(api_key, post_processing, llm_optimized)
+        return OpenAIService.initialize(
+            api_key, post_processing, llm_optimized, base_url=api_url, compact_prompts=compact_prompts,
+            vocabulary_biasing=vocabulary_biasing
+        )
     else:
         raise ValueError(f"Unsupported service type: {service_type}") 
\ No newline at end of file
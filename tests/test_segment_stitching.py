@@ -0,0 +1,106 @@
+"""
+Zusammenfügen segmentierter Whisper-Transkripte: Wortwiederholungen an Pausen bleiben erhalten.
+"""
+import asyncio
+
+import numpy as np
+
+from openai_service import (
+    SEGMENT_OVERLAP_MS, SEGMENT_PAUSE_MS, MAX_SEGMENT_MS, WhisperSegmentSession, stitch_segments
+)
+
+RATE = 16000
+
+
+class FakeLoop:
+    """Collects the submitted segment coroutines instead of running them"""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, coroutine):
+        self.submitted.append(coroutine)
+        return coroutine
+
+
+class FakeService:
+    def __init__(self, text, words):
+        self.text = text
+        self.words = words
+        self.calls = []
+
+    async def transcribe_raw(self, payload, language, mimetype):
+        self.calls.append('raw')
+        return self.text
+
+    async def transcribe_words(self, payload, language, mimetype):
+        self.calls.append('words')
+        return self.text, self.words
+
+
+def pcm(ms):
+    return b'\x00\x00' * int(RATE * ms / 1000)
+
+
+def tone(ms, amplitude=8000):
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def test_repeated_words_at_a_pause_are_kept():
+    assert stitch_segments(["I said no.", "No, really"]) == "I said no. No, really"
+    assert stitch_segments(["it is what it is", "it is fine"]) == "it is what it is it is fine"
+    assert stitch_segments(["it is what it is", "it is fine"], [0, 0]) == "it is what it is it is fine"
+
+
+def test_only_words_inside_the_overlap_are_dropped():
+    assert stitch_segments(["it is what it", "it is fine"], [0, 1]) == "it is what it is fine"
+    # "is" starts after the overlap window: a real repetition
+    assert stitch_segments(["it is", "is fine"], [0, 0]) == "it is is fine"
+    # A word inside the window that the previous segment did not get is kept
+    assert stitch_segments(["it is what", "it is fine"], [0, 1]) == "it is what it is fine"
+
+
+def test_pause_cut_has_no_overlap():
+    loop = FakeLoop()
+    session = WhisperSegmentSession(FakeService("", []), loop, 'en', RATE, 1, 'wav')
+    session.send(pcm(4000), trailing_silence_ms=600)
+    session.send(pcm(4000), trailing_silence_ms=600)
+    assert len(loop.submitted) == 2
+    assert session._overlap == b''
+    for coroutine in loop.submitted:
+        coroutine.close()
+
+
+def test_pause_in_the_audio_cuts_without_the_vad():
+    loop = FakeLoop()
+    session = WhisperSegmentSession(FakeService("", []), loop, 'en', RATE, 1, 'wav')
+    audio = tone(4000) + pcm(800) + tone(2000)
+    chunk = 1024 * 2
+    cut_at = []
+    for offset in range(0, len(audio), chunk):
+        session.send(audio[offset:offset + chunk])
+        if loop.submitted and not cut_at:
+            cut_at.append((offset + chunk) / 2 / RATE * 1000)
+    # One cut, inside the pause and once it is long enough; no overlap after a pause
+    assert len(loop.submitted) == 1
+    assert 4000 + SEGMENT_PAUSE_MS <= cut_at[0] < 4800
+    assert session._overlap == b''
+    assert session.silence_ms == 0
+    loop.submitted[0].close()
+
+
+def test_hard_cut_repeats_the_overlap_and_uses_word_timestamps():
+    loop = FakeLoop()
+    words = [("it", 0.05, 0.2), ("is", 0.35, 0.5), ("fine", 0.6, 0.9)]
+    service = FakeService("it is fine", words)
+    session = WhisperSegmentSession(service, loop, 'en', RATE, 1, 'wav')
+    session.send(tone(MAX_SEGMENT_MS))
+    session.send(pcm(3000))
+    first, second = loop.submitted
+    first.close()
+    text, overlap_words = asyncio.run(second)
+    assert service.calls == ['words']
+    # Only "it" starts inside the overlap window
+    assert overlap_words == sum(1 for _, start, _ in words if start * 1000 < SEGMENT_OVERLAP_MS) == 1
+    assert stitch_segments(["that is what it", text], [0, overlap_words]) == "that is what it is fine"
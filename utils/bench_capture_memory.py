@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Peak RSS per minute of captured audio: list of chunks + b''.join versus CaptureArena.
+
+Every strategy runs in its own subprocess (ru_maxrss never goes down), which
+simulates a dictation of --minutes at the given profile by appending
+1024-frame chunks and then producing the buffer handed downstream.
+
+Usage:
+    python utils/bench_capture_memory.py [--minutes 10] [--rate 44100] [--channels 2] [--ram-cap-mb 32]
+
+Unix only (uses the resource module).
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+CHUNK_FRAMES = 1024
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def simulate(strategy, minutes, rate, channels, ram_cap_mb):
+    source = bytearray(os.urandom(CHUNK_FRAMES * channels * 2))
+    chunk_count = int(minutes * 60 * rate / CHUNK_FRAMES)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+
+    if strategy == "list-join":
+        frames = []
+        for _ in range(chunk_count):
+            # PyAudio returns a new bytes object for every read
+            frames.append(bytes(source))
+        pcm = b''.join(frames)
+        size = len(pcm)
+    else:
+        from capture_arena import CaptureArena
+        arena = CaptureArena(ram_cap_bytes=ram_cap_mb * 1024 * 1024)
+        for _ in range(chunk_count):
+            arena.write(bytes(source))
+        pcm = arena.getbuffer()
+        size = len(pcm)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return peak_rss_mb() - baseline, size, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=44100)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--ram-cap-mb", type=int, default=32, help="RAM cap for the spilling arena run")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        strategy, ram_cap_mb = args.run.split(":")
+        delta_mb, size, elapsed_ms = simulate(strategy, args.minutes, args.rate, args.channels, int(ram_cap_mb))
+        print(f"{delta_mb} {size} {elapsed_ms}")
+        return
+
+    runs = [
+        ("list + b''.join (before)", "list-join", 0),
+        ("CaptureArena, in RAM", "arena", 4096),
+        (f"CaptureArena, {args.ram_cap_mb} MiB cap", "arena", args.ram_cap_mb),
+    ]
+    print(f"{args.minutes:g} min at {args.rate} Hz, {args.channels} ch")
+    for label, strategy, ram_cap_mb in runs:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run", f"{strategy}:{ram_cap_mb}",
+             "--minutes", str(args.minutes), "--rate", str(args.rate), "--channels", str(args.channels)],
+            check=True, capture_output=True, text=True
+        ).stdout.split()
+        delta_mb, size, elapsed_ms = float(output[0]), int(output[1]), float(output[2])
+        print(
+            f"  {label:<30} audio={size / (1024 * 1024):7.1f} MiB  peak RSS +{delta_mb:7.1f} MiB  "
+            f"({delta_mb / args.minutes:6.1f} MiB per minute)  {elapsed_ms:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare upload codecs (WAV / FLAC / Opus) on a corpus of WAV recordings.
+
+For every file and codec this reports the payload size, the time spent in
+encoder.finish() after "stop" (the only encode work left on the latency
+path, since chunks are encoded while recording) and the estimated upload
+time for a given uplink. With --service the payload is also sent to the
+configured STT service (keys from settings.json) to measure the real
+end-to-end stop-to-text latency.
+
+Usage:
+    python utils/bench_codecs.py [corpus_dir] [--uplink-kbps 1000] [--service]
+
+The corpus defaults to tmp/ (where DEBUG_KEEP_AUDIO stores recordings). If
+it holds no WAV files a synthetic 30 s speech-like fixture is used.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import wave
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from audio_encoding import CODECS, StreamingEncoder
+
+
+def load_corpus(corpus_dir):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.wav"))):
+        wf = wave.open(path, 'rb')
+        try:
+            if wf.getsampwidth() != 2:
+                continue
+            corpus.append((os.path.basename(path), wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getframerate()))
+        finally:
+            wf.close()
+    return corpus
+
+
+def synthetic_fixture(seconds=30, rate=16000):
+    """Noise bursts shaped by a syllable-rate envelope with pauses in between"""
+    rng = np.random.default_rng(42)
+    t = np.arange(seconds * rate) / rate
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.2 * t) > -0.3)
+    voiced = np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 280 * t)
+    signal = (voiced + 0.3 * rng.standard_normal(len(t))) * envelope * 6000
+    return [("synthetic_speech.wav", signal.astype(np.int16).tobytes(), 1, rate)]
+
+
+def encode_chunked(pcm, codec, channels, rate, chunk_frames=1024):
+    """Feed the encoder chunk by chunk like record_speech does"""
+    encoder = StreamingEncoder(codec, channels, rate)
+    step = chunk_frames * channels * 2
+    for offset in range(0, len(pcm), step):
+        encoder.write(pcm[offset:offset + step])
+    start = time.perf_counter()
+    payload = encoder.finish()
+    finish_ms = (time.perf_counter() - start) * 1000
+    return encoder, payload, finish_ms
+
+
+def transcribe_live(service, payload, mimetype, language):
+    start = time.perf_counter()
+    asyncio.run(service.transcribe_buffer(payload, language, mimetype))
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", default=os.path.join(ROOT, "tmp"))
+    parser.add_argument("--uplink-kbps", type=float, default=1000.0)
+    parser.add_argument("--service", action="store_true", help="also send every payload to the configured STT service")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if os.path.isdir(args.corpus) else []
+    if not corpus:
+        print(f"No WAV fixtures in {args.corpus}, using a synthetic fixture")
+        corpus = synthetic_fixture()
+
+    service = None
+    language = None
+    if args.service:
+        from speech_to_text import create_service
+        with open(os.path.join(ROOT, "settings.json"), "r") as f:
+            settings = json.load(f)
+        service_type = settings.get('service', 'deepgram')
+        api_key = settings.get('api_key' if service_type == 'deepgram' else 'openai_api_key', '')
+        service = create_service(service_type, api_key)
+        language = settings.get('language', 'auto')
+
+    results = {codec: {'bytes': [], 'finish_ms': [], 'upload_ms': [], 'e2e_ms': []} for codec in CODECS}
+    for name, pcm, channels, rate in corpus:
+        duration = len(pcm) / float(channels * 2 * rate)
+        print(f"\n{name}: {duration:.1f} s, {channels} ch, {rate} Hz")
+        for codec in CODECS:
+            encoder, payload, finish_ms = encode_chunked(pcm, codec, channels, rate)
+            size = payload.getbuffer().nbytes
+            upload_ms = size * 8 / (args.uplink_kbps * 1000) * 1000
+            line = (
+                f"  {codec:<5} -> {encoder.codec:<5} {size / 1024:9.1f} KiB "
+                f"finish={finish_ms:7.2f} ms  upload@{args.uplink_kbps:.0f}kbps={upload_ms:8.1f} ms"
+            )
+            stats = results[codec]
+            stats['bytes'].append(size)
+            stats['finish_ms'].append(finish_ms)
+            stats['upload_ms'].append(upload_ms)
+            if service is not None:
+                e2e_ms = finish_ms + transcribe_live(service, payload, encoder.mimetype, language)
+                stats['e2e_ms'].append(e2e_ms)
+                line += f"  stop-to-text={e2e_ms:8.1f} ms"
+            print(line)
+
+    print("\nSummary (median over corpus):")
+    baseline = statistics.median(results['wav']['bytes'])
+    for codec, stats in results.items():
+        line = (
+            f"  {codec:<5} size={statistics.median(stats['bytes']) / 1024:9.1f} KiB "
+            f"({baseline / statistics.median(stats['bytes']):4.1f}x smaller than WAV) "
+            f"finish={statistics.median(stats['finish_ms']):6.2f} ms "
+            f"upload={statistics.median(stats['upload_ms']):8.1f} ms"
+        )
+        if stats['e2e_ms']:
+            line += f" stop-to-text={statistics.median(stats['e2e_ms']):8.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Stop-to-text latency: Deepgram live streaming versus the prerecorded upload.
+
+Both paths replay the same recording in real time, chunk by chunk like
+record_speech does. The prerecorded path encodes while "recording" and
+uploads after stop; the live path sends every chunk over the websocket as
+it is captured. The clock starts when recording stops and ends when the
+transcript is available.
+
+By default a local stand-in server (utils/mock_deepgram_server.py) is
+started, so the benchmark runs offline; --api-url/--api-key target another
+server or the real API.
+
+Usage:
+    python utils/bench_deepgram_live.py [fixture.wav] [--runs 3] [--codec flac] [--uplink-kbps 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import wave
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_encoding import StreamingEncoder
+from bench_codecs import synthetic_fixture
+from deepgram_service import DeepgramService
+from event_loop import AsyncLoopThread
+from mock_deepgram_server import start_server
+
+CHUNK_FRAMES = 1024
+
+
+def load_fixture(path):
+    if path:
+        wf = wave.open(path, 'rb')
+        try:
+            return wf.readframes(wf.getnframes()), wf.getnchannels(), wf.getframerate()
+        finally:
+            wf.close()
+    _, pcm, channels, rate = synthetic_fixture(seconds=10)[0]
+    return pcm, channels, rate
+
+
+def replay(pcm, channels, rate, consumer):
+    """Hand chunks to consumer at the pace a microphone would deliver them"""
+    step = CHUNK_FRAMES * channels * 2
+    chunk_seconds = CHUNK_FRAMES / float(rate)
+    start = time.perf_counter()
+    for index, offset in enumerate(range(0, len(pcm), step)):
+        consumer(pcm[offset:offset + step])
+        delay = start + (index + 1) * chunk_seconds - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_prerecorded(service, loop, pcm, channels, rate, codec, language):
+    encoder = StreamingEncoder(codec, channels, rate)
+    replay(pcm, channels, rate, encoder.write)
+    stopped_at = time.perf_counter()
+    payload = encoder.finish()
+    transcript = loop.run(service.transcribe_buffer(payload, language, encoder.mimetype))
+    return (time.perf_counter() - stopped_at) * 1000, transcript
+
+
+def run_live(service, loop, pcm, channels, rate, language):
+    session = service.open_live_stream(loop, language, rate, channels)
+    replay(pcm, channels, rate, session.send)
+    stopped_at = time.perf_counter()
+    transcript = loop.run(session.finish())
+    return (time.perf_counter() - stopped_at) * 1000, transcript
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixture", nargs="?", help="16-bit WAV file (default: 10 s synthetic speech)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--codec", default="flac", help="upload codec of the prerecorded path")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--api-url", help="use this server instead of the local stand-in")
+    parser.add_argument("--api-key", default="0" * 40)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="stand-in: fixed overhead per request")
+    parser.add_argument("--rtf", type=float, default=0.05, help="stand-in: processing time per second of audio")
+    parser.add_argument("--uplink-kbps", type=float, default=1000.0, help="stand-in: uplink for prerecorded uploads")
+    args = parser.parse_args()
+
+    pcm, channels, rate = load_fixture(args.fixture)
+    loop = AsyncLoopThread(name="bench-deepgram").start()
+    runner = None
+    api_url = args.api_url
+    if api_url is None:
+        runner = loop.run(start_server(
+            port=args.port, latency_ms=args.latency_ms, rtf=args.rtf, uplink_kbps=args.uplink_kbps
+        ))
+        api_url = f"http://127.0.0.1:{args.port}/v1"
+    service = DeepgramService.initialize(args.api_key, api_url)
+
+    print(f"{len(pcm) / float(channels * 2 * rate):.1f} s at {rate} Hz, {channels} ch against {api_url}")
+    results = {'prerecorded': [], 'live': []}
+    try:
+        for run in range(args.runs):
+            latency_ms, transcript = run_prerecorded(service, loop, pcm, channels, rate, args.codec, args.language)
+            results['prerecorded'].append(latency_ms)
+            print(f"  run {run + 1} prerecorded: {latency_ms:7.1f} ms  ({len(transcript.split())} words)")
+            latency_ms, transcript = run_live(service, loop, pcm, channels, rate, args.language)
+            results['live'].append(latency_ms)
+            print(f"  run {run + 1} live:        {latency_ms:7.1f} ms  ({len(transcript.split())} words)")
+    finally:
+        if runner is not None:
+            loop.run(runner.cleanup())
+        loop.stop()
+
+    prerecorded = statistics.median(results['prerecorded'])
+    live = statistics.median(results['live'])
+    print(f"\nMedian stop-to-text: prerecorded {prerecorded:.1f} ms, live {live:.1f} ms ({prerecorded / live:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
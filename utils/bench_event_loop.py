@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Before/after benchmark for the per-dictation event loop overhead.
+
+"before": asyncio.run() per dictation (new loop + new default executor each time)
+"after":  one AsyncLoopThread that every dictation submits its coroutine to
+
+The simulated dictation does what OpenAIService does: two run_in_executor
+calls (transcription + post-processing) with no real network work, so the
+numbers isolate loop/executor setup cost.
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from event_loop import AsyncLoopThread
+
+
+async def simulated_dictation():
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, lambda: None)
+    await loop.run_in_executor(None, lambda: None)
+
+
+def bench_asyncio_run(iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        asyncio.run(simulated_dictation())
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def bench_loop_thread(iterations):
+    loop_thread = AsyncLoopThread(name="bench-asyncio").start()
+    samples = []
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter()
+            loop_thread.run(simulated_dictation())
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        loop_thread.stop()
+    return samples
+
+
+def report(label, samples):
+    print(
+        f"{label:<22} median={statistics.median(samples):.3f} ms  "
+        f"mean={statistics.mean(samples):.3f} ms  max={max(samples):.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"Per-dictation loop overhead over {iterations} iterations:")
+    report("asyncio.run (before)", bench_asyncio_run(iterations))
+    report("AsyncLoopThread (after)", bench_loop_thread(iterations))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Stop-to-text with a fresh connection per upload versus the shared keep-alive
+pool warmed at recording start.
+
+Requests go through a local proxy that holds back the first bytes of every
+new connection by --setup-ms, standing in for DNS + TCP + TLS round trips
+to a remote API (on loopback the real handshakes cost next to nothing). The
+"cold" path creates a new client per dictation, as before: a new AsyncOpenAI
+client for OpenAI and the SDK's prerecorded() for Deepgram, which opens an
+aiohttp session per call. The "warm" path uses the services as the app
+does: keep_warm() starts when recording starts, and the upload at stop
+reuses that connection.
+
+Usage:
+    python utils/bench_http_pool.py [--provider openai|deepgram] [--runs 5] [--setup-ms 150] [--record-ms 1500]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openai import AsyncOpenAI
+
+import mock_deepgram_server
+import mock_whisper_server
+from audio_encoding import encode_pcm
+from deepgram_service import DeepgramService
+from event_loop import AsyncLoopThread
+from http_pool import http_pool
+from metrics import metrics
+from openai_service import OpenAIService
+
+RATE = 16000
+
+
+async def start_setup_delay_proxy(listen_port, target_port, setup_ms):
+    """TCP proxy that delays the first response bytes of each new connection"""
+    async def pipe(reader, writer, delay):
+        try:
+            first = True
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if first and delay:
+                    await asyncio.sleep(delay)
+                first = False
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection('127.0.0.1', target_port)
+        try:
+            await asyncio.gather(
+                pipe(client_reader, server_writer, 0),
+                pipe(server_reader, client_writer, setup_ms / 1000.0),
+            )
+        except asyncio.CancelledError:
+            pass
+
+    return await asyncio.start_server(handle, '127.0.0.1', listen_port)
+
+
+def run_openai(loop, base_url, payload, mimetype, warm, record_ms):
+    if warm:
+        service = OpenAIService.initialize("sk-local", base_url=base_url)
+        keep_warm = loop.submit(service.keep_warm())
+    time.sleep(record_ms / 1000.0)
+    stopped_at = time.perf_counter()
+    if warm:
+        keep_warm.cancel()
+        loop.run(service.transcribe_raw(payload, 'en', mimetype))
+    else:
+        async def cold():
+            client = AsyncOpenAI(api_key="sk-local", base_url=base_url)
+            try:
+                await client.audio.transcriptions.create(model="whisper-1", file=("audio.flac", payload, mimetype))
+            finally:
+                await client.close()
+        loop.run(cold())
+    return (time.perf_counter() - stopped_at) * 1000
+
+
+def run_deepgram(loop, api_url, payload, mimetype, warm, record_ms):
+    service = DeepgramService.initialize("0" * 40, api_url)
+    if warm:
+        keep_warm = loop.submit(service.keep_warm())
+    time.sleep(record_ms / 1000.0)
+    stopped_at = time.perf_counter()
+    if warm:
+        keep_warm.cancel()
+        loop.run(service.transcribe_buffer(payload, 'en', mimetype))
+    else:
+        source = {'buffer': payload, 'mimetype': mimetype}
+        loop.run(service.client.transcription.prerecorded(source, service._build_options('en')))
+    return (time.perf_counter() - stopped_at) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--provider", choices=("openai", "deepgram"), default="openai")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--setup-ms", type=float, default=150.0, help="simulated DNS/TCP/TLS set-up per new connection")
+    parser.add_argument("--record-ms", type=float, default=1500.0, help="time between recording start and stop")
+    parser.add_argument("--port", type=int, default=8768)
+    args = parser.parse_args()
+
+    pcm = mock_whisper_server.synthesize_speech(mock_whisper_server.random_sentences(1), RATE)
+    payload, mimetype = encode_pcm(pcm, 'flac', 1, RATE)
+    payload = payload.getvalue()
+
+    loop = AsyncLoopThread(name="bench-http").start()
+    if args.provider == "openai":
+        runner, _ = loop.run(mock_whisper_server.start_server(port=args.port, latency_ms=50, rtf=0.0))
+        run = run_openai
+    else:
+        runner = loop.run(mock_deepgram_server.start_server(port=args.port, latency_ms=50, rtf=0.0))
+        run = run_deepgram
+
+    async def start_proxy():
+        return await start_setup_delay_proxy(args.port + 1, args.port, args.setup_ms)
+    proxy = loop.run(start_proxy())
+    url = f"http://127.0.0.1:{args.port + 1}/v1"
+    print(f"{args.provider}: {len(payload) // 1024} KiB upload, {args.setup_ms:.0f} ms connection set-up via proxy")
+
+    results = {'cold': [], 'warm': []}
+    try:
+        for index in range(args.runs):
+            for mode in ('cold', 'warm'):
+                results[mode].append(run(loop, url, payload, mimetype, mode == 'warm', args.record_ms))
+            print(f"  run {index + 1}: cold {results['cold'][-1]:7.1f} ms   warm {results['warm'][-1]:7.1f} ms")
+    finally:
+        proxy.close()
+        loop.run(http_pool.close())
+        loop.run(runner.cleanup())
+        loop.stop()
+
+    cold = statistics.median(results['cold'])
+    warm = statistics.median(results['warm'])
+    print(f"\nMedian stop-to-text: cold {cold:.1f} ms, warm pooled {warm:.1f} ms (saved {cold - warm:.1f} ms)")
+    metrics.log_summary(f"http.{args.provider}")
+
+
+if __name__ == "__main__":
+    main()
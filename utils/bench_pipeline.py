@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Throughput of the staged dictation pipeline versus the old one-at-a-time worker.
+
+Simulates a burst of quick dictations with fixed stage costs (encode, STT,
+post-processing and the ~2.5 s clipboard/paste sequence) and reports when
+each text is delivered, the total time and the delivery order. The old
+worker ran all stages of a recording before starting the next one; the
+pipeline overlaps STT and post-processing of later recordings with the
+paste of earlier ones and still delivers in recording order.
+
+Usage:
+    python utils/bench_pipeline.py [--recordings 3] [--gap-ms 1500] [--stt-ms 1200] [--post-ms 900] [--paste-ms 2500]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from metrics import metrics
+from pipeline import RecordingJob, StagedPipeline
+
+
+def sleep_ms(ms, jitter):
+    time.sleep(ms * random.uniform(1 - jitter, 1 + jitter) / 1000.0)
+
+
+def run_serial(args, started):
+    delivered = []
+    for index in range(args.recordings):
+        # A recording cannot be processed before it exists
+        time.sleep(max(0.0, started + index * args.gap_ms / 1000.0 - time.perf_counter()))
+        for ms in (args.encode_ms, args.stt_ms, args.post_ms, args.paste_ms):
+            sleep_ms(ms, args.jitter)
+        delivered.append((index, time.perf_counter() - started))
+    return delivered
+
+
+def run_pipeline(args, started):
+    delivered = []
+    done = threading.Event()
+
+    def deliver(job):
+        sleep_ms(args.paste_ms, args.jitter)
+        delivered.append((job.index, time.perf_counter() - started))
+        if len(delivered) == args.recordings:
+            done.set()
+
+    pipeline = StagedPipeline(deliver, maxsize=args.queue_size)
+    pipeline.add_stage("encode", lambda job: sleep_ms(args.encode_ms, args.jitter))
+    pipeline.add_stage("stt", lambda job: sleep_ms(args.stt_ms, args.jitter), args.stt_workers)
+    pipeline.add_stage("post", lambda job: sleep_ms(args.post_ms, args.jitter), args.post_workers)
+    pipeline.start()
+    for index in range(args.recordings):
+        time.sleep(max(0.0, started + index * args.gap_ms / 1000.0 - time.perf_counter()))
+        pipeline.submit(RecordingJob(index, audio=None))
+    done.wait()
+    pipeline.close()
+    return delivered
+
+
+def report(name, delivered):
+    times = ', '.join(f"#{index + 1} {seconds:.1f}s" for index, seconds in delivered)
+    in_order = [index for index, _ in delivered] == sorted(index for index, _ in delivered)
+    print(f"  {name:9} total {delivered[-1][1]:5.1f} s  ({times})  in order: {in_order}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recordings", type=int, default=3)
+    parser.add_argument("--gap-ms", type=float, default=1500.0, help="time between the ends of two recordings")
+    parser.add_argument("--encode-ms", type=float, default=50.0)
+    parser.add_argument("--stt-ms", type=float, default=1200.0)
+    parser.add_argument("--post-ms", type=float, default=900.0)
+    parser.add_argument("--paste-ms", type=float, default=2500.0)
+    parser.add_argument("--jitter", type=float, default=0.3, help="random +- fraction of every stage cost")
+    parser.add_argument("--stt-workers", type=int, default=3)
+    parser.add_argument("--post-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(f"{args.recordings} recordings, one every {args.gap_ms:.0f} ms")
+    report("serial", run_serial(args, time.perf_counter()))
+    report("pipeline", run_pipeline(args, time.perf_counter()))
+    metrics.log_summary("pipeline.")
+
+
+if __name__ == "__main__":
+    main()
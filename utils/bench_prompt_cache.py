@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+System prompt assembly and provider prompt caching for GPT-4o post-processing.
+
+Measures the per-request prompt build time with the old path (concatenate the
+prompt parts and format the German correction list on every call) against
+the memoized prompt, then sends --requests post-processing requests to the
+local stand-in (see utils/mock_whisper_server.py, which reports cached
+prompt tokens like OpenAI's prefix caching) and prints the cached-token
+ratio per request.
+
+Usage:
+    python utils/bench_prompt_cache.py [--language de] [--standard] [--requests 5] [--builds 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from event_loop import AsyncLoopThread
+from http_pool import http_pool
+from metrics import metrics
+from mock_whisper_server import random_sentences, start_server, whisper_style
+from openai_service import OpenAIService
+
+
+def time_builds(build, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        build()
+    return (time.perf_counter() - start) * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--language", default="de")
+    parser.add_argument("--standard", action="store_true", help="standard instead of LLM-optimized prompts")
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--builds", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=8770)
+    args = parser.parse_args()
+
+    loop = AsyncLoopThread(name="bench-prompt").start()
+    runner, _ = loop.run(start_server(port=args.port, latency_ms=20, tokens_per_second=2000))
+    service = OpenAIService.initialize(
+        "sk-local", use_post_processing=True, llm_optimized=not args.standard,
+        base_url=f"http://127.0.0.1:{args.port}/v1"
+    )
+
+    prompt = service._get_system_prompt_for_language(args.language)
+    built_ms = time_builds(lambda: service._build_system_prompt(args.language), args.builds)
+    memoized_ms = time_builds(lambda: service._get_system_prompt_for_language(args.language), args.builds)
+    print(f"{args.language}, {'standard' if args.standard else 'LLM-optimized'}: system prompt {len(prompt.encode())} bytes")
+    print(f"  build per request: {built_ms * 1000:.1f} µs rebuilt, {memoized_ms * 1000:.1f} µs memoized")
+
+    try:
+        for index in range(args.requests):
+            transcript = ' '.join(whisper_style(sentence) for sentence in random_sentences(3, seed=index))
+            loop.run(service.post_process_with_gpt4(transcript, args.language))
+            usage_tokens = metrics.get_last("llm.prompt_tokens")
+            cached_tokens = metrics.get_last("llm.cached_tokens")
+            print(
+                f"  request {index + 1}: {usage_tokens:.0f} prompt tokens, {cached_tokens:.0f} cached "
+                f"({metrics.get_last('llm.cached_ratio'):.0%})"
+            )
+    finally:
+        loop.run(http_pool.close())
+        loop.run(runner.cleanup())
+        loop.stop()
+
+    metrics.log_summary("prompt")
+    metrics.log_summary("llm")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Word replacements: the former per-entry regex loop versus the compiled
+single-pass engine (word_replacements.py), for growing dictionaries.
+
+Each size starts with the app's German dictionary and adds synthetic
+entries (single words, hyphenated and two-word entries). The text mixes
+ordinary words with misrecognitions from the dictionary, including plurals
+and hyphen/space variants. The legacy loop is only timed up to
+--legacy-max entries (it takes seconds per text at 10k).
+
+The outputs are compared with the legacy loop running its entries longest
+first. In dictionary order, the legacy loop lets a short entry replace the
+first part of a longer hyphenated or two-word entry ("defom" inside
+"defom-belonular"), which the engine resolves to the longest entry.
+
+With --reload-entries N it instead measures a hot reload: a dictionary
+file with N entries is written while another thread keeps applying
+replacements (like dictations in flight), and the slowest apply() during
+the background recompile is reported.
+
+Usage:
+    python utils/bench_replacements.py [--sizes 13,100,1000,10000] [--words 200] [--runs 20]
+    python utils/bench_replacements.py --reload-entries 5000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from metrics import metrics
+from word_replacements import DEFAULT_REPLACEMENTS, DictionaryStore, ReplacementEngine
+
+GERMAN_REPLACEMENTS = DEFAULT_REPLACEMENTS['de']
+
+FILLER = "wir haben heute den build geprüft und danach die änderungen im team besprochen".split()
+
+
+def legacy_apply(replacements, text):
+    """The per-entry loop that OpenAIService used before (without its logging)"""
+    corrected_text = text
+    for wrong, correct in replacements.items():
+        escaped_wrong = re.escape(wrong)
+        patterns_to_try = [r'\b' + escaped_wrong + r'\b']
+        if not wrong.endswith('s'):
+            patterns_to_try.append(r'\b' + escaped_wrong + r's\b')
+        if '-' in wrong:
+            flexible_pattern = escaped_wrong.replace('\\-', '[-\\s]')
+            patterns_to_try.append(r'\b' + flexible_pattern + r'\b')
+            if not wrong.endswith('s'):
+                patterns_to_try.append(r'\b' + flexible_pattern + r's\b')
+        for pattern in patterns_to_try:
+            if re.search(pattern, corrected_text, flags=re.IGNORECASE):
+                corrected_text = re.sub(pattern, correct, corrected_text, flags=re.IGNORECASE)
+    return corrected_text
+
+
+def synthetic_dictionary(size, rng):
+    replacements = dict(GERMAN_REPLACEMENTS)
+    letters = "bcdfghklmnprtvz"
+    vowels = "aeiou"
+
+    def word():
+        return ''.join(rng.choice(letters) + rng.choice(vowels) for _ in range(rng.randint(2, 4))) + rng.choice("kmnrt")
+
+    while len(replacements) < size:
+        kind = rng.random()
+        wrong = word() if kind < 0.6 else (f"{word()}-{word()}" if kind < 0.8 else f"{word()} {word()}")
+        replacements.setdefault(wrong, wrong.replace('-', '').replace(' ', '').capitalize() + "X")
+    return replacements
+
+
+def sample_text(replacements, words, rng):
+    entries = list(replacements)
+    tokens = []
+    while len(tokens) < words:
+        if rng.random() < 0.1:
+            wrong = rng.choice(entries)
+            if '-' in wrong and rng.random() < 0.5:
+                wrong = wrong.replace('-', ' ')
+            if not wrong.endswith('s') and rng.random() < 0.2:
+                wrong += 's'
+            tokens.append(wrong.upper() if rng.random() < 0.1 else wrong)
+        else:
+            tokens.append(rng.choice(FILLER))
+    return ' '.join(tokens) + '.'
+
+
+def time_per_call(func, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def bench_hot_reload(entries, words):
+    rng = random.Random(entries)
+    replacements = synthetic_dictionary(entries, rng)
+    text = sample_text(replacements, words, rng)
+    store = DictionaryStore()
+    latencies = []
+    gaps = []
+    done = threading.Event()
+
+    def dictate():
+        previous = time.perf_counter()
+        while not done.is_set():
+            start = time.perf_counter()
+            store.apply(text, 'de')
+            latencies.append((time.perf_counter() - start) * 1000)
+            # Includes waiting for the GIL while the watcher thread compiles
+            gaps.append((start - previous) * 1000)
+            previous = start
+            time.sleep(0.001)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dictionaries.json")
+        store.watch(path, interval=0.1)
+        time.sleep(0.3)
+        worker = threading.Thread(target=dictate)
+        worker.start()
+        time.sleep(0.2)
+        idle_max, idle_gap = max(latencies), max(gaps)
+        latencies.clear()
+        gaps.clear()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'de': replacements}, f)
+        while len(store.replacements_for('de')) < len(replacements):
+            time.sleep(0.01)
+        done.set()
+        worker.join()
+        store.stop()
+
+    print(f"hot reload of {entries} entries: recompiled in {metrics.get_last('dictionaries.reload_ms'):.0f} ms in the background")
+    print(f"  apply() during the reload: {len(latencies)} calls, max {max(latencies):.2f} ms (before: max {idle_max:.2f} ms)")
+    print(f"  longest gap between calls: {max(gaps):.1f} ms (before: {idle_gap:.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="13,100,1000,10000")
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--legacy-max", type=int, default=10000, help="largest dictionary the legacy loop is timed with")
+    parser.add_argument("--reload-entries", type=int, help="measure a hot reload of a dictionary file with this many entries")
+    args = parser.parse_args()
+
+    if args.reload_entries:
+        bench_hot_reload(args.reload_entries, args.words)
+        return
+
+    print(f"{'entries':>8}  {'build ms':>9}  {'engine ms':>10}  {'legacy ms':>10}  {'speed-up':>8}  same output")
+    for size in (int(size) for size in args.sizes.split(',')):
+        rng = random.Random(size)
+        replacements = synthetic_dictionary(size, rng)
+        texts = [sample_text(replacements, args.words, rng) for _ in range(5)]
+
+        start = time.perf_counter()
+        engine = ReplacementEngine(replacements)
+        build_ms = (time.perf_counter() - start) * 1000
+        engine_ms = time_per_call(lambda: [engine.apply(text) for text in texts], args.runs) / len(texts)
+
+        if size <= args.legacy_max:
+            legacy_runs = max(1, args.runs if size <= 1000 else 1)
+            legacy_ms = time_per_call(lambda: [legacy_apply(replacements, text) for text in texts], legacy_runs) / len(texts)
+            longest_first = dict(sorted(replacements.items(), key=lambda item: -len(item[0])))
+            same = all(engine.apply(text)[0] == legacy_apply(longest_first, text) for text in texts)
+            print(f"{size:8d}  {build_ms:9.1f}  {engine_ms:10.3f}  {legacy_ms:10.1f}  {legacy_ms / engine_ms:7.0f}x  {same}")
+        else:
+            print(f"{size:8d}  {build_ms:9.1f}  {engine_ms:10.3f}  {'-':>10}  {'-':>8}  -")
+
+
+if __name__ == "__main__":
+    main()
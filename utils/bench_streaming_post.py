@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Time to the first pasted character: GPT-4o post-processing as one response
+versus streamed and pasted sentence by sentence.
+
+Runs OpenAIService's post-processing against the local stand-in (see
+utils/mock_whisper_server.py, which echoes the transcript at
+--tokens-per-second) and simulates the paste timings of the delivery
+stage: the full-text path waits for the whole completion and then needs
+about --full-paste-ms until the keystroke, the streamed path pastes each
+increment as soon as a sentence is complete (--increment-paste-ms each).
+The clock starts when post-processing starts.
+
+Usage:
+    python utils/bench_streaming_post.py [--words 150] [--runs 3] [--tokens-per-second 40]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from event_loop import AsyncLoopThread
+from http_pool import http_pool
+from mock_whisper_server import random_sentences, start_server, whisper_style
+from openai_service import OpenAIService
+from pipeline import TextStream
+
+
+def run_full(service, loop, transcript, full_paste_ms):
+    started = time.perf_counter()
+    text = loop.run(service.finalize_transcript(transcript, 'en'))
+    completed_ms = (time.perf_counter() - started) * 1000
+    time.sleep(full_paste_ms / 1000.0)
+    return completed_ms + full_paste_ms, completed_ms, text
+
+
+def run_streamed(service, loop, transcript, increment_paste_ms):
+    started = time.perf_counter()
+    stream = TextStream()
+
+    async def produce():
+        async for delta in service.finalize_transcript_stream(transcript, 'en'):
+            stream.feed(delta)
+        stream.close()
+
+    loop.submit(produce())
+    first_paste_ms = None
+    pasted = []
+    for _, ready in stream.chunks():
+        if ready:
+            time.sleep(increment_paste_ms / 1000.0)
+            if first_paste_ms is None:
+                first_paste_ms = (time.perf_counter() - started) * 1000
+            pasted.append(ready)
+    return first_paste_ms, (stream.finished_at - started) * 1000, ''.join(pasted), len(pasted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=150)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8769)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--full-paste-ms", type=float, default=1300.0, help="clipboard set-up until the keystroke")
+    parser.add_argument("--increment-paste-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    sentences = []
+    while sum(len(sentence) for sentence in sentences) < args.words:
+        sentences = random_sentences(len(sentences) + 1)
+    transcript = ' '.join(whisper_style(sentence) for sentence in sentences)
+
+    loop = AsyncLoopThread(name="bench-stream").start()
+    runner, _ = loop.run(start_server(port=args.port, latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second))
+    service = OpenAIService.initialize("sk-local", use_post_processing=True, base_url=f"http://127.0.0.1:{args.port}/v1")
+    print(f"{len(transcript.split())} words, {args.tokens_per_second:.0f} tokens/s")
+
+    results = {'full': [], 'streamed': []}
+    try:
+        for run in range(args.runs):
+            first_ms, completion_ms, full_text = run_full(service, loop, transcript, args.full_paste_ms)
+            results['full'].append(first_ms)
+            print(f"  run {run + 1} full:     first pasted char {first_ms:7.1f} ms  completion {completion_ms:7.1f} ms")
+            first_ms, completion_ms, streamed_text, increments = run_streamed(service, loop, transcript, args.increment_paste_ms)
+            results['streamed'].append(first_ms)
+            print(
+                f"  run {run + 1} streamed: first pasted char {first_ms:7.1f} ms  completion {completion_ms:7.1f} ms  "
+                f"increments={increments}  same text={streamed_text == full_text}"
+            )
+    finally:
+        loop.run(http_pool.close())
+        loop.run(runner.cleanup())
+        loop.stop()
+
+    print(
+        f"\nMedian time to first pasted character: full {statistics.median(results['full']):.1f} ms, "
+        f"streamed {statistics.median(results['streamed']):.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Vocabulary biasing of the first pass (vocabulary.py).
+
+1. Ranking and request building for growing correction dictionaries plus a
+   user vocabulary: time to re-rank after a dictation (on the delivery
+   thread) and to build the Whisper prompt / Deepgram keywords (on the
+   request path), and how much of the vocabulary fits the prompt budget.
+2. Sends a biased request to both local stand-ins (utils/mock_whisper_server.py,
+   utils/mock_deepgram_server.py) to check the prompt and keywords are
+   accepted.
+3. Runs the measurement mode over the fixture transcripts: the first pass
+   (with dictionary replacements) against GPT-4o post-processing by the
+   Whisper stand-in in instruction-following mode (--llm-optimized for the
+   LLM-optimized prompt), and prints the share of dictations that already
+   matched.
+
+Usage:
+    python utils/bench_vocabulary_bias.py [--sizes 13,1000,10000] [--terms 50] [--language de] [--llm-optimized]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import mock_deepgram_server
+import mock_whisper_server
+from audio_encoding import encode_pcm
+from bench_replacements import synthetic_dictionary
+from deepgram_service import DeepgramService, query_string
+from event_loop import AsyncLoopThread
+from http_pool import http_pool
+from metrics import metrics
+from openai_service import OpenAIService
+from prompt_regression import DEFAULT_FIXTURES
+from vocabulary import VocabularyBias, vocabulary, whisper_token_count
+from word_replacements import DictionaryStore, dictionaries
+
+RATE = 16000
+
+
+def time_per_call(func, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        func()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def bench_ranking(sizes, terms, language, runs):
+    print(f"{'entries':>8}  {'candidates':>10}  {'re-rank ms':>10}  {'prompt ms':>9}  {'keywords ms':>11}  prompt terms / tokens")
+    for size in sizes:
+        rng = random.Random(size)
+        replacements = synthetic_dictionary(size, rng)
+        with tempfile.TemporaryDirectory() as directory:
+            store = DictionaryStore(defaults={})
+            store.path = os.path.join(directory, "dictionaries.json")
+            store.vocabulary_path = os.path.join(directory, "vocabulary.txt")
+            with open(store.path, 'w', encoding='utf-8') as f:
+                json.dump({language: replacements}, f)
+            with open(store.vocabulary_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(f"{language}\tTerm{index}\n" for index in range(terms)))
+            store.reload()
+        bias = VocabularyBias(store)
+        corrections = list(replacements.values())
+        recent = [' '.join(rng.choice(corrections) for _ in range(5)) for _ in range(runs)]
+        rerank_ms = time_per_call(lambda: bias.note_transcript(recent.pop(), language), runs)
+        prompt_ms = time_per_call(lambda: bias.whisper_prompt(language), runs)
+        keywords_ms = time_per_call(lambda: bias.deepgram_keywords(language), runs)
+        prompt = bias.whisper_prompt(language)
+        candidates = len(bias.ranked_terms(language))
+        print(f"{size:8d}  {candidates:10d}  {rerank_ms:10.2f}  {prompt_ms:9.3f}  {keywords_ms:11.3f}  "
+              f"{prompt.count(',') + 1} / {whisper_token_count(prompt)}")
+
+
+def check_requests(loop, port, language):
+    pcm = mock_whisper_server.synthesize_speech(mock_whisper_server.random_sentences(2), RATE)
+    payload, mimetype = encode_pcm(pcm, 'wav', 1, RATE)
+
+    runner, mock = loop.run(mock_whisper_server.start_server(port=port, latency_ms=0, rtf=0.0))
+    try:
+        service = OpenAIService.initialize("sk-local", base_url=f"http://127.0.0.1:{port}/v1", vocabulary_biasing=True)
+        loop.run(service.transcribe_raw(payload.getvalue(), language, mimetype))
+        prompt = mock.transcription_prompts[-1]
+        print(f"Whisper: prompt received ({whisper_token_count(prompt or '')} tokens): {prompt!r}")
+    finally:
+        loop.run(runner.cleanup())
+
+    runner = loop.run(mock_deepgram_server.start_server(port=port, latency_ms=0, rtf=0.0))
+    try:
+        service = DeepgramService.initialize("0" * 40, f"http://127.0.0.1:{port}/v1", vocabulary_biasing=True)
+        options = service._build_options(language)
+        transcript = loop.run(service.transcribe_buffer(payload.getvalue(), language, mimetype))
+        print(f"Deepgram: {len(options.get('keywords', []))} keywords accepted "
+              f"({len(query_string(options))} characters query string), {len(transcript.split())} words")
+    finally:
+        loop.run(runner.cleanup())
+
+
+def measure_fixtures(loop, port, fixtures_path, llm_optimized):
+    with open(fixtures_path, encoding='utf-8') as f:
+        fixtures = json.load(f)
+    runner, _ = loop.run(mock_whisper_server.start_server(
+        port=port, latency_ms=0, tokens_per_second=100000, follow_instructions=True
+    ))
+    try:
+        service = OpenAIService.initialize(
+            "sk-local", use_post_processing=True, llm_optimized=llm_optimized, base_url=f"http://127.0.0.1:{port}/v1"
+        )
+        for fixture in fixtures:
+            final = loop.run(service.post_process_with_gpt4(fixture['text'], fixture['language']))
+            first_pass = dictionaries.apply(fixture['text'], fixture['language'])[0]
+            vocabulary.compare_first_pass(first_pass, final)
+    finally:
+        loop.run(runner.cleanup())
+    compared = metrics.get_counter("bias.compared")
+    print(f"Measurement: {metrics.get_counter('bias.exact_matches')} of {compared} first passes matched the "
+          f"post-processed text ({metrics.get_gauge('bias.exact_match_rate'):.0%}), "
+          f"mean word match {metrics.snapshot()['timings']['bias.word_match_ratio']['avg']:.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="13,1000,10000")
+    parser.add_argument("--terms", type=int, default=50, help="user vocabulary terms")
+    parser.add_argument("--language", default="de")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--llm-optimized", action="store_true", help="post-process with the LLM-optimized prompt")
+    parser.add_argument("--port", type=int, default=8772)
+    args = parser.parse_args()
+
+    bench_ranking([int(size) for size in args.sizes.split(',')], args.terms, args.language, args.runs)
+    print()
+    loop = AsyncLoopThread(name="bench-bias").start()
+    try:
+        check_requests(loop, args.port, args.language)
+        print()
+        measure_fixtures(loop, args.port, args.fixtures, args.llm_optimized)
+    finally:
+        loop.run(http_pool.close())
+        loop.stop()
+
+
+if __name__ == "__main__":
+    main()
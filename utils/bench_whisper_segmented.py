@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Segmented Whisper transcription versus a single upload after stop.
+
+Replays a tone-language fixture (see utils/mock_whisper_server.py) through
+the VAD like record_speech does. The single-upload path encodes while
+recording and uploads after stop. The segmented path cuts at pauses and
+transcribes segments while "recording". The script reports stop-to-text
+latency and whether the stitched transcript matches the spoken words
+(missing or duplicated words at cuts show up as errors).
+
+Usage:
+    python utils/bench_whisper_segmented.py [--sentences 8] [--runs 2] [--speed 1.0] [--max-segment-ms 30000]
+
+--max-segment-ms forces cuts in the middle of sentences to exercise the
+overlap/dedupe logic; --speed > 1 replays faster than real time.
+"""
+import argparse
+import difflib
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import openai_service
+from audio_encoding import StreamingEncoder
+from event_loop import AsyncLoopThread
+from mock_whisper_server import random_sentences, start_server, synthesize_speech
+from openai_service import OpenAIService
+from vad import SilenceGate
+
+RATE = 16000
+CHUNK_FRAMES = 1024
+
+
+def replay(pcm, speed, consumer):
+    """Feed chunks through a fresh VAD at microphone pace (divided by speed)"""
+    gate = SilenceGate(RATE, 1)
+    step = CHUNK_FRAMES * 2
+    chunk_seconds = CHUNK_FRAMES / float(RATE) / speed
+    start = time.perf_counter()
+    for index, offset in enumerate(range(0, len(pcm), step)):
+        consumer(gate.process(pcm[offset:offset + step]), gate.trailing_silence_ms)
+        delay = start + (index + 1) * chunk_seconds - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    consumer(gate.finish(), 0)
+
+
+def word_errors(expected, transcript):
+    """Insertions + deletions + substitutions between the expected and recognized words"""
+    actual = [word.strip('.,').lower() for word in transcript.split()]
+    errors = 0
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(a=expected, b=actual).get_opcodes():
+        if tag != 'equal':
+            errors += max(i2 - i1, j2 - j1)
+    return errors
+
+
+def run_single(service, loop, pcm, codec, speed):
+    encoder = StreamingEncoder(codec, 1, RATE)
+    replay(pcm, speed, lambda data, silence_ms: encoder.write(data))
+    stopped_at = time.perf_counter()
+    transcript = loop.run(service.transcribe_buffer(encoder.finish(), 'en', encoder.mimetype))
+    return (time.perf_counter() - stopped_at) * 1000, transcript
+
+
+def run_segmented(service, loop, pcm, codec, speed):
+    session = service.open_segmented_stream(loop, 'en', RATE, 1, codec)
+    replay(pcm, speed, session.send)
+    stopped_at = time.perf_counter()
+    transcript = loop.run(service.finalize_transcript(loop.run(session.finish()), 'en'))
+    return (time.perf_counter() - stopped_at) * 1000, transcript, len(session._futures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--codec", default="flac")
+    parser.add_argument("--max-segment-ms", type=int, default=openai_service.MAX_SEGMENT_MS)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--rtf", type=float, default=0.1)
+    args = parser.parse_args()
+
+    openai_service.MAX_SEGMENT_MS = args.max_segment_ms
+    sentences = random_sentences(args.sentences)
+    expected = [word for sentence in sentences for word in sentence]
+    pcm = synthesize_speech(sentences, RATE)
+
+    loop = AsyncLoopThread(name="bench-whisper").start()
+    runner, _ = loop.run(start_server(port=args.port, latency_ms=args.latency_ms, rtf=args.rtf))
+    service = OpenAIService.initialize("sk-local", base_url=f"http://127.0.0.1:{args.port}/v1")
+    print(f"{len(pcm) / 2.0 / RATE:.1f} s fixture, {len(expected)} words, replay speed {args.speed}x")
+
+    results = {'single': [], 'segmented': []}
+    try:
+        for run in range(args.runs):
+            latency_ms, transcript = run_single(service, loop, pcm, args.codec, args.speed)
+            results['single'].append(latency_ms)
+            print(f"  run {run + 1} single upload: {latency_ms:7.1f} ms  word errors={word_errors(expected, transcript)}")
+            latency_ms, transcript, segments = run_segmented(service, loop, pcm, args.codec, args.speed)
+            results['segmented'].append(latency_ms)
+            print(
+                f"  run {run + 1} segmented:     {latency_ms:7.1f} ms  word errors={word_errors(expected, transcript)}  "
+                f"segments={segments}"
+            )
+    finally:
+        loop.run(runner.cleanup())
+        loop.stop()
+
+    single = statistics.median(results['single'])
+    segmented = statistics.median(results['segmented'])
+    print(f"\nMedian stop-to-text: single upload {single:.1f} ms, segmented {segmented:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
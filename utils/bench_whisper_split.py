@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Long-form transcription: oversized recordings split at silence and
+transcribed with 1..N parallel uploads.
+
+A long tone-language fixture (see utils/mock_whisper_server.py) is passed to
+OpenAIService.transcribe_long() with max_upload_bytes lowered, so it gets
+split into several chunks like a recording over Whisper's 25 MB limit would.
+The script reports the wall time per parallelism and whether the reassembled
+transcript matches the spoken words (a word cut at a chunk boundary shows up
+as an error).
+
+Usage:
+    python utils/bench_whisper_split.py [--sentences 60] [--max-upload-kb 400] [--parallelism 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from audio_encoding import encode_pcm
+from audio_utils import AudioBuffer
+from bench_whisper_segmented import word_errors
+from event_loop import AsyncLoopThread
+from mock_whisper_server import random_sentences, start_server, synthesize_speech
+from openai_service import OpenAIService
+
+RATE = 16000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=60)
+    parser.add_argument("--codec", default="wav")
+    parser.add_argument("--max-upload-kb", type=int, default=400, help="stand-in for the 25 MB limit")
+    parser.add_argument("--parallelism", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--rtf", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sentences = random_sentences(args.sentences)
+    expected = [word for sentence in sentences for word in sentence]
+    audio = AudioBuffer(synthesize_speech(sentences, RATE), 1, RATE)
+    payload, _ = encode_pcm(audio.pcm, args.codec, 1, RATE)
+    compression = payload.getbuffer().nbytes / float(len(audio.pcm))
+
+    loop = AsyncLoopThread(name="bench-split").start()
+    runner, mock = loop.run(start_server(port=args.port, latency_ms=args.latency_ms, rtf=args.rtf))
+    service = OpenAIService.initialize("sk-local", base_url=f"http://127.0.0.1:{args.port}/v1")
+    service.max_upload_bytes = args.max_upload_kb * 1024
+    print(
+        f"{len(audio.pcm) / 2.0 / RATE:.1f} s fixture, {len(expected)} words, "
+        f"{payload.getbuffer().nbytes // 1024} KiB {args.codec} upload, limit {args.max_upload_kb} KiB"
+    )
+
+    baseline = None
+    try:
+        for parallelism in args.parallelism:
+            requests_before = mock.requests
+            started = time.perf_counter()
+            transcript = loop.run(service.transcribe_long(audio, 'en', args.codec, parallelism, compression))
+            transcript = loop.run(service.finalize_transcript(transcript, 'en'))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            baseline = baseline or elapsed_ms
+            print(
+                f"  parallelism {parallelism}: {elapsed_ms:7.1f} ms  ({baseline / elapsed_ms:.1f}x)  "
+                f"chunks={mock.requests - requests_before}  word errors={word_errors(expected, transcript)}"
+            )
+    finally:
+        loop.run(runner.cleanup())
+        loop.stop()
+
+
+if __name__ == "__main__":
+    main()
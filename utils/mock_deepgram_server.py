@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Deepgram API, for testing and benchmarking offline.
+
+Serves the two endpoints the app uses:
+  POST /v1/listen  prerecorded transcription (answers after the whole upload)
+  GET  /v1/listen  websocket live transcription (interim + final results while
+                   audio arrives, final segment + metadata after CloseStream)
+
+Transcripts are placeholder words (about 2.5 per second of audio). Latency
+is simulated: a fixed per-request overhead plus processing at --rtf times
+real time for audio that has not been processed yet, and optionally a
+throttled uplink for uploads.
+
+Usage:
+    python utils/mock_deepgram_server.py [--port 8765] [--latency-ms 150] [--rtf 0.05] [--uplink-kbps 0]
+
+Point the app at it with "deepgram_api_url": "http://127.0.0.1:8765/v1" in
+settings.json (any API key is accepted).
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import uuid
+import wave
+
+from aiohttp import WSMsgType, web
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from audio_encoding import soundfile
+
+WORDS = "the quick brown fox jumps over the lazy dog while we dictate a short note".split()
+WORDS_PER_SECOND = 2.5
+INTERIM_EVERY_SECONDS = 1.0
+FINAL_EVERY_SECONDS = 3.0
+
+
+def placeholder_words(seconds, offset=0):
+    count = max(1, int(round(seconds * WORDS_PER_SECOND))) if seconds > 0.2 else 0
+    return ' '.join(WORDS[(offset + i) % len(WORDS)] for i in range(count))
+
+
+def audio_seconds(body, mimetype):
+    """Duration of an uploaded container (WAV via wave, FLAC/OGG via soundfile)"""
+    try:
+        if mimetype == 'audio/wav':
+            wf = wave.open(io.BytesIO(body), 'rb')
+            try:
+                return wf.getnframes() / float(wf.getframerate())
+            finally:
+                wf.close()
+        if soundfile is not None:
+            info = soundfile.info(io.BytesIO(body))
+            return info.frames / float(info.samplerate)
+    except Exception:
+        pass
+    # Unknown container: assume 16 kHz mono int16
+    return len(body) / 32000.0
+
+
+def results_message(transcript, start, duration, is_final):
+    return {
+        'type': 'Results',
+        'start': start,
+        'duration': duration,
+        'is_final': is_final,
+        'channel': {'alternatives': [{'transcript': transcript, 'confidence': 0.99}]},
+    }
+
+
+class MockDeepgram:
+    def __init__(self, latency_ms=150, rtf=0.05, uplink_kbps=0):
+        self.latency = latency_ms / 1000.0
+        self.rtf = rtf
+        self.uplink_kbps = uplink_kbps
+
+    async def prerecorded(self, request):
+        body = await request.read()
+        if self.uplink_kbps:
+            await asyncio.sleep(len(body) * 8 / (self.uplink_kbps * 1000))
+        seconds = audio_seconds(body, request.headers.get('Content-Type', 'audio/wav'))
+        await asyncio.sleep(self.latency + seconds * self.rtf)
+        return web.json_response({
+            'metadata': {'request_id': str(uuid.uuid4()), 'duration': seconds},
+            'results': {'channels': [{'alternatives': [{'transcript': placeholder_words(seconds), 'confidence': 0.99}]}]},
+        })
+
+    async def live(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        bytes_per_second = int(request.query.get('sample_rate', 16000)) * int(request.query.get('channels', 1)) * 2
+        received = 0.0        # seconds of audio received
+        finalized = 0.0       # seconds covered by final results
+        last_interim = 0.0
+        words_sent = 0
+
+        async for message in ws:
+            if message.type == WSMsgType.BINARY:
+                received += len(message.data) / float(bytes_per_second)
+                pending = received - finalized
+                if pending >= FINAL_EVERY_SECONDS:
+                    text = placeholder_words(pending, words_sent)
+                    words_sent += len(text.split())
+                    await ws.send_json(results_message(text, finalized, pending, True))
+                    finalized = last_interim = received
+                elif received - last_interim >= INTERIM_EVERY_SECONDS:
+                    await ws.send_json(results_message(placeholder_words(pending, words_sent), finalized, pending, False))
+                    last_interim = received
+            elif message.type == WSMsgType.TEXT:
+                if json.loads(message.data).get('type') != 'CloseStream':
+                    continue
+                # Only the audio since the last final result still needs processing
+                pending = received - finalized
+                await asyncio.sleep(self.latency + pending * self.rtf)
+                if pending > 0:
+                    await ws.send_json(results_message(placeholder_words(pending, words_sent), finalized, pending, True))
+                await ws.send_json({
+                    'type': 'Metadata',
+                    'request_id': str(uuid.uuid4()),
+                    'sha256': uuid.uuid4().hex,
+                    'duration': received,
+                })
+                await ws.close()
+                break
+        return ws
+
+    async def listen(self, request):
+        if request.headers.get('Upgrade', '').lower() == 'websocket':
+            return await self.live(request)
+        return await self.prerecorded(request)
+
+    def app(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_route('*', '/v1/listen', self.listen)
+        return app
+
+
+async def start_server(host='127.0.0.1', port=8765, **kwargs):
+    """Start the stand-in on the running loop. Returns the aiohttp runner (call cleanup() to stop)"""
+    runner = web.AppRunner(MockDeepgram(**kwargs).app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fixed overhead per request/finalization")
+    parser.add_argument("--rtf", type=float, default=0.05, help="processing time per second of unprocessed audio")
+    parser.add_argument("--uplink-kbps", type=float, default=0.0, help="throttle prerecorded uploads (0 = unlimited)")
+    args = parser.parse_args()
+
+    app = MockDeepgram(args.latency_ms, args.rtf, args.uplink_kbps).app()
+    print(f"Mock Deepgram listening on http://{args.host}:{args.port}/v1")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI Whisper transcription endpoint, for testing
+segmentation and stitching offline. It also serves a chat completions
+endpoint (plain and stream=True) that echoes the user message back word by
+word at --tokens-per-second, for testing post-processing. Its usage reports
+cached prompt tokens like OpenAI's prompt caching: the longest prefix shared
+with an earlier prompt, in steps of 128 tokens, for prompts of at least 1024
+tokens (one token counted per 4 bytes). With --follow-instructions the
+echo applies what the system prompt asks for in a deterministic way (the
+German correction list, the "hey LLM" answer section), so prompt variants
+can be compared (see utils/prompt_regression.py).
+
+The stand-in "recognizes" a tiny tone language: every vocabulary word is a
+short sine burst at its own frequency (see synthesize_speech()). Bursts are
+found by frame energy and mapped back to words by their dominant frequency.
+So the transcript depends on the audio that was actually uploaded. A word
+cut in half at a segment boundary is lost, and a word repeated by the
+overlap shows up twice, exactly the cases stitching has to handle.
+Transcripts are capitalized and end with a period, like Whisper's.
+
+Usage:
+    python utils/mock_whisper_server.py [--port 8766] [--latency-ms 300] [--rtf 0.1] [--tokens-per-second 40]
+
+Point the app at it with "openai_api_url": "http://127.0.0.1:8766/v1" in
+settings.json (any API key is accepted). A fixture for the app can be
+written with --write-fixture speech.wav.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import textwrap
+import time
+import uuid
+import wave
+
+import numpy as np
+from aiohttp import web
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from audio_encoding import soundfile
+
+VOCABULARY = (
+    "alpha bravo charlie delta echo foxtrot golf hotel "
+    "india juliet kilo lima mike november oscar papa"
+).split()
+BASE_FREQUENCY = 400.0
+FREQUENCY_STEP = 60.0
+WORD_MS = 280
+WORD_GAP_MS = 100
+SENTENCE_PAUSE_MS = 800
+MIN_BURST_MS = 60
+
+
+def synthesize_speech(sentences, rate=16000, amplitude=8000):
+    """Render sentences (lists of vocabulary words) as int16 PCM bytes"""
+    def silence(ms):
+        return np.zeros(int(rate * ms / 1000), dtype=np.float32)
+
+    t = np.arange(int(rate * WORD_MS / 1000)) / float(rate)
+    fade = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.02)
+    parts = [silence(SENTENCE_PAUSE_MS)]
+    for sentence in sentences:
+        for word in sentence:
+            frequency = BASE_FREQUENCY + FREQUENCY_STEP * VOCABULARY.index(word)
+            parts.append(np.sin(2 * np.pi * frequency * t) * fade * amplitude)
+            parts.append(silence(WORD_GAP_MS))
+        parts.append(silence(SENTENCE_PAUSE_MS))
+    return np.concatenate(parts).astype(np.int16).tobytes()
+
+
+def random_sentences(count, seed=7):
+    rng = np.random.default_rng(seed)
+    return [[VOCABULARY[i] for i in rng.integers(0, len(VOCABULARY), rng.integers(4, 9))] for _ in range(count)]
+
+
+def recognize(samples, rate):
+    """Map the tone bursts of mono float samples back to vocabulary words"""
+    return [word for word, _, _ in recognize_timed(samples, rate)]
+
+
+def recognize_timed(samples, rate):
+    """Like recognize(), as (word, start_s, end_s) tuples"""
+    frame = max(1, rate // 100)
+    frame_count = len(samples) // frame
+    if frame_count == 0:
+        return []
+    rms = np.sqrt(np.mean(samples[:frame_count * frame].reshape(frame_count, frame) ** 2, axis=1))
+    active = rms > 1000
+    words = []
+    start = None
+    for index, is_active in enumerate(np.append(active, False)):
+        if is_active and start is None:
+            start = index
+        elif not is_active and start is not None:
+            if (index - start) * 10 >= MIN_BURST_MS:
+                burst = samples[start * frame:index * frame]
+                spectrum = np.abs(np.fft.rfft(burst * np.hanning(len(burst))))
+                frequency = np.argmax(spectrum) * rate / float(len(burst))
+                word_index = int(round((frequency - BASE_FREQUENCY) / FREQUENCY_STEP))
+                if 0 <= word_index < len(VOCABULARY):
+                    words.append((VOCABULARY[word_index], start * frame / float(rate), index * frame / float(rate)))
+            start = None
+    return words
+
+
+def decode_upload(data, filename):
+    """Return (mono float samples, rate) of an uploaded WAV/FLAC/OGG file"""
+    if filename.endswith('.wav'):
+        wf = wave.open(io.BytesIO(data), 'rb')
+        try:
+            rate, channels = wf.getframerate(), wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16).astype(np.float32)
+        finally:
+            wf.close()
+        return samples.reshape(-1, channels).mean(axis=1), rate
+    if soundfile is None:
+        raise ValueError("soundfile is required to decode compressed uploads")
+    samples, rate = soundfile.read(io.BytesIO(data), dtype='int16', always_2d=True)
+    return samples.astype(np.float32).mean(axis=1), rate
+
+
+def whisper_style(words):
+    if not words:
+        return ""
+    return (' '.join(words)).capitalize() + '.'
+
+
+# Prompt caching as documented by OpenAI
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_STEP_TOKENS = 128
+BYTES_PER_TOKEN = 4
+
+
+# Instructions the stand-in understands (see follow_instructions())
+CORRECTION_INSTRUCTION = re.compile(r"If you see '([^']+)' \(case-insensitive\), try to correct it to '([^']+)'")
+TRIGGER_INSTRUCTION = re.compile(r'"(hey LLM)"', re.IGNORECASE)
+ANSWER_FORMAT = re.compile(r'```markdown\n(.*?)```', re.DOTALL)
+
+
+def follow_instructions(system_prompt, text):
+    """Deterministic stand-in for the model: apply what system_prompt asks for to text.
+
+    Corrections listed in the prompt are applied; if the prompt defines a
+    trigger phrase and an answer format and the text contains the trigger,
+    the answer section (header lines up to ---) is appended.
+    """
+    for wrong, correct in CORRECTION_INSTRUCTION.findall(system_prompt):
+        text = re.sub(r'\b' + re.escape(wrong) + r'\b', correct, text, flags=re.IGNORECASE)
+    trigger = TRIGGER_INSTRUCTION.search(system_prompt)
+    answer_format = ANSWER_FORMAT.search(system_prompt)
+    if trigger and answer_format:
+        request = re.search(re.escape(trigger.group(1)) + r'[,:]?\s*(.*)', text, re.IGNORECASE | re.DOTALL)
+        if request:
+            header = []
+            for line in textwrap.dedent(answer_format.group(1)).strip().splitlines():
+                header.append(line)
+                if line.strip() == '---':
+                    break
+            text += '\n\n' + '\n'.join(header) + f"\nAntwort auf: {request.group(1)}"
+    return text
+
+
+def prompt_bytes(messages):
+    """Serialize chat messages in order, so equal prefixes give equal bytes"""
+    return b''.join(f"<|{message['role']}|>{message['content']}".encode() for message in messages)
+
+
+class MockWhisper:
+    def __init__(self, latency_ms=300, rtf=0.1, tokens_per_second=40.0, follow_instructions=False):
+        self.latency = latency_ms / 1000.0
+        self.rtf = rtf
+        self.tokens_per_second = tokens_per_second
+        self.follow_instructions = follow_instructions
+        self.requests = 0
+        self.prompts = []
+        # prompt field of each transcription request (vocabulary biasing), None if not sent
+        self.transcription_prompts = []
+
+    async def transcriptions(self, request):
+        form = await request.post()
+        upload = form.get('file')
+        if upload is None or not hasattr(upload, 'file'):
+            return web.json_response({'error': {'message': "Missing file"}}, status=400)
+        samples, rate = decode_upload(upload.file.read(), upload.filename or 'audio.wav')
+        seconds = len(samples) / float(rate)
+        if seconds < 0.1:
+            return web.json_response({'error': {'message': "Audio file is too short"}}, status=400)
+        self.requests += 1
+        self.transcription_prompts.append(form.get('prompt'))
+        await asyncio.sleep(self.latency + seconds * self.rtf)
+        words = recognize_timed(samples, rate)
+        text = whisper_style([word for word, _, _ in words])
+        if form.get('response_format') != 'verbose_json':
+            return web.json_response({'text': text})
+        response = {'task': 'transcribe', 'language': 'english', 'duration': seconds, 'text': text}
+        if 'word' in form.getall('timestamp_granularities[]', []):
+            response['words'] = [{'word': word, 'start': start, 'end': end} for word, start, end in words]
+        return web.json_response(response)
+
+    def prompt_usage(self, messages, completion_tokens):
+        prompt = prompt_bytes(messages)
+        prompt_tokens = -(-len(prompt) // BYTES_PER_TOKEN)
+        shared = max((len(os.path.commonprefix([prompt, earlier])) for earlier in self.prompts), default=0)
+        cached = shared // BYTES_PER_TOKEN // PROMPT_CACHE_STEP_TOKENS * PROMPT_CACHE_STEP_TOKENS
+        if prompt_tokens < PROMPT_CACHE_MIN_TOKENS or cached < PROMPT_CACHE_MIN_TOKENS:
+            cached = 0
+        self.prompts = self.prompts[-31:] + [prompt]
+        return {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+            'prompt_tokens_details': {'cached_tokens': cached},
+        }
+
+    async def chat_completions(self, request):
+        body = await request.json()
+        text = body['messages'][-1]['content']
+        if self.follow_instructions:
+            system_prompt = ''.join(message['content'] for message in body['messages'] if message['role'] == 'system')
+            text = follow_instructions(system_prompt, text)
+        # Whitespace stays attached to the following word, like model tokens
+        tokens = re.findall(r'\s*\S+', text) or ['']
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        await asyncio.sleep(self.latency)
+        if not body.get('stream'):
+            await asyncio.sleep(len(tokens) / self.tokens_per_second)
+            return web.json_response({
+                'id': completion_id, 'object': 'chat.completion', 'created': created, 'model': body.get('model'),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+                'usage': self.prompt_usage(body['messages'], len(tokens)),
+            })
+
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await response.prepare(request)
+
+        async def send(delta, finish_reason=None):
+            chunk = {
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': body.get('model'),
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        await send({'role': 'assistant', 'content': ''})
+        for token in tokens:
+            await asyncio.sleep(1.0 / self.tokens_per_second)
+            await send({'content': token})
+        await send({}, 'stop')
+        if (body.get('stream_options') or {}).get('include_usage'):
+            chunk = {
+                'id': completion_id, 'object': 'chat.completion.chunk', 'created': created, 'model': body.get('model'),
+                'choices': [], 'usage': self.prompt_usage(body['messages'], len(tokens)),
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def app(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_post('/v1/audio/transcriptions', self.transcriptions)
+        app.router.add_post('/v1/chat/completions', self.chat_completions)
+        return app
+
+
+async def start_server(host='127.0.0.1', port=8766, **kwargs):
+    """Start the stand-in on the running loop. Returns (runner, MockWhisper)"""
+    mock = MockWhisper(**kwargs)
+    runner = web.AppRunner(mock.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner, mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="fixed overhead per request")
+    parser.add_argument("--rtf", type=float, default=0.1, help="processing time per second of audio")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="chat completion generation speed")
+    parser.add_argument("--follow-instructions", action="store_true", help="apply the system prompt's corrections and answer format")
+    parser.add_argument("--write-fixture", metavar="WAV", help="write a 16 kHz fixture of random sentences and exit")
+    args = parser.parse_args()
+
+    if args.write_fixture:
+        sentences = random_sentences(8)
+        wf = wave.open(args.write_fixture, 'wb')
+        try:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(synthesize_speech(sentences))
+        finally:
+            wf.close()
+        print(' '.join(' '.join(sentence) for sentence in sentences))
+        return
+
+    print(f"Mock Whisper listening on http://{args.host}:{args.port}/v1")
+    web.run_app(
+        MockWhisper(args.latency_ms, args.rtf, args.tokens_per_second, args.follow_instructions).app(), host=args.host, port=args.port, print=None
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Regression check for the compacted prompts: original versus compact
+variant over a fixture transcript set.
+
+First checks that llm_prompts_compact.py is up to date with llm_prompts.py
+and prints the token budget of every prompt variant (see
+prompt_compiler.py). Then runs OpenAIService's post-processing with both
+variants, in standard and LLM-optimized mode, against the local stand-in
+in instruction-following mode (see utils/mock_whisper_server.py) and
+compares the outputs. Exits with 1 on a stale compact module, a failed
+request or a different output, so it can run in CI.
+
+Usage:
+    python utils/prompt_regression.py [--fixtures utils/fixtures/post_processing_transcripts.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import prompt_compiler
+from event_loop import AsyncLoopThread
+from http_pool import http_pool
+from metrics import metrics
+from mock_whisper_server import start_server
+from openai_service import OpenAIService
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "post_processing_transcripts.json")
+
+
+def post_process(loop, service, fixture):
+    """Post-processed text and the request's prompt tokens (None if the request failed)"""
+    requests = metrics.snapshot()['timings'].get('llm.prompt_tokens', {}).get('count', 0)
+    text = loop.run(service.post_process_with_gpt4(fixture['text'], fixture['language']))
+    if metrics.snapshot()['timings'].get('llm.prompt_tokens', {}).get('count', 0) == requests:
+        return text, None
+    return text, metrics.get_last("llm.prompt_tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES)
+    parser.add_argument("--port", type=int, default=8771)
+    args = parser.parse_args()
+
+    if not prompt_compiler.build_compact_module(check=True):
+        return 1
+    print()
+    with open(args.fixtures, encoding='utf-8') as f:
+        fixtures = json.load(f)
+
+    loop = AsyncLoopThread(name="prompt-regression").start()
+    runner, _ = loop.run(start_server(port=args.port, latency_ms=0, tokens_per_second=100000, follow_instructions=True))
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    failures = 0
+    try:
+        for llm_optimized in (False, True):
+            mode = 'llm-optimized' if llm_optimized else 'standard'
+            services = {
+                compact: OpenAIService.initialize(
+                    "sk-local", use_post_processing=True, llm_optimized=llm_optimized,
+                    base_url=base_url, compact_prompts=compact
+                )
+                for compact in (False, True)
+            }
+            tokens = {False: 0, True: 0}
+            for index, fixture in enumerate(fixtures):
+                original, original_tokens = post_process(loop, services[False], fixture)
+                compact, compact_tokens = post_process(loop, services[True], fixture)
+                if original_tokens is None or compact_tokens is None:
+                    failures += 1
+                    print(f"❌ {mode} #{index + 1}: request failed")
+                    continue
+                tokens[False] += original_tokens
+                tokens[True] += compact_tokens
+                if compact != original:
+                    failures += 1
+                    print(f"❌ {mode} #{index + 1} ({fixture['language']}): outputs differ\n"
+                          f"   original: {original!r}\n   compact:  {compact!r}")
+            saved = 1 - tokens[True] / tokens[False] if tokens[False] else 0
+            print(f"{mode}: {len(fixtures)} transcripts, prompt tokens {tokens[False]} original, "
+                  f"{tokens[True]} compact ({saved:.0%} saved)")
+    finally:
+        loop.run(http_pool.close())
+        loop.run(runner.cleanup())
+        loop.stop()
+
+    if failures:
+        print(f"❌ {failures} regression(s)")
+        return 1
+    print("✓ Compact prompts produce the same outputs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Energie-basierte Sprachaktivitätserkennung (VAD) zum Trimmen von Stille und Überspringen leerer Aufnahmen.
+"""
+from collections import deque
+
+import numpy as np
+
+
+# Defaults for the settings.json keys (vad_*)
+VAD_DEFAULTS = {
+    'vad_enabled': False,         # opt-in: trimming changes the audio and can drop quiet recordings
+    'vad_threshold_db': -45.0,    # absolute floor for speech energy (dBFS)
+    'vad_margin_db': 12.0,        # speech must also be this far above the tracked noise floor
+    'vad_frame_ms': 20,
+    'vad_min_speech_ms': 80,      # consecutive speech needed to open the gate (drops clicks / cue bleed)
+    'vad_padding_ms': 200,        # silence kept before the first and after the last speech
+    'vad_max_pause_ms': 600,      # internal pauses longer than this are compressed to it
+    'vad_endpointing': False,     # hands-free mode: stop recording after trailing silence
+    'vad_endpoint_silence_ms': 1000,
+}
+
+
+def vad_config_from_settings(settings):
+    """Merge settings.json values over VAD_DEFAULTS"""
+    return {key: settings.get(key, default) for key, default in VAD_DEFAULTS.items()}
+
+
+def frame_energies_db(samples, frame_size):
+    """RMS energy in dBFS for every complete frame of an int16 array (frames, channels)"""
+    frame_count = len(samples) // frame_size
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    framed = samples[:frame_count * frame_size].astype(np.float32).reshape(frame_count, -1)
+    rms = np.sqrt(np.mean(framed * framed, axis=1)) / 32768.0
+    return 20.0 * np.log10(np.maximum(rms, 1e-10))
+
+
+class _PendingSilence:
+    """Silence between speech segments, keeping only the parts we may emit later"""
+
+    def __init__(self, head_limit, tail_limit):
+        self.head_limit = head_limit
+        self.head = []
+        self.tail = deque(maxlen=tail_limit) if tail_limit else None
+
+    def add(self, frame):
+        if len(self.head) < self.head_limit:
+            self.head.append(frame)
+        elif self.tail is not None:
+            self.tail.append(frame)
+
+    def compressed(self):
+        """Frames to emit when speech resumes (head + tail of a long pause)"""
+        return self.head + (list(self.tail) if self.tail is not None else [])
+
+
+class SilenceGate:
+    """Streaming VAD that sits between capture and the encoder.
+
+    Energies are computed for all frames of a chunk at once. Leading silence
+    is dropped except for padding_ms, internal pauses longer than
+    max_pause_ms are shortened to max_pause_ms, and trailing silence is
+    dropped in finish(). Speech must last min_speech_ms before the gate opens
+    so short clicks such as the start cue are not treated as speech.
+
+    trailing_silence_ms is what hands-free endpointing checks after every
+    chunk to decide when the speaker has finished.
+    """
+
+    def __init__(self, rate, channels, config=None, sample_width=2):
+        config = dict(VAD_DEFAULTS, **(config or {}))
+        self.rate = rate
+        self.channels = channels
+        self.frame_ms = int(config['vad_frame_ms'])
+        self.frame_size = max(1, rate * self.frame_ms // 1000)
+        self.frame_bytes = self.frame_size * channels * sample_width
+        self.threshold_db = float(config['vad_threshold_db'])
+        self.margin_db = float(config['vad_margin_db'])
+        self.onset_frames = max(1, int(config['vad_min_speech_ms']) // self.frame_ms)
+        self.padding_frames = int(config['vad_padding_ms']) // self.frame_ms
+        half_pause = int(config['vad_max_pause_ms']) // 2 // self.frame_ms
+        self.pause_head_frames = max(half_pause, self.padding_frames)
+        self.pause_tail_frames = half_pause
+
+        self.noise_floor_db = None
+        self.in_speech = False
+        self.seen_speech = False
+        self.speech_frames = 0
+        self.silence_run_frames = 0
+        self.total_frames = 0
+        self.received_bytes = 0
+        self.emitted_bytes = 0
+        self._remainder = b''
+        self._candidate = []
+        # Leading silence: only the padding right before the first speech survives
+        self._pending = _PendingSilence(0, self.padding_frames)
+
+    # --- classification -------------------------------------------------
+
+    def _is_speech(self, energy_db):
+        threshold = self.threshold_db
+        if self.noise_floor_db is not None:
+            threshold = max(threshold, self.noise_floor_db + self.margin_db)
+        speech = energy_db > threshold
+        if not speech:
+            # Track the noise floor: drop immediately, rise slowly
+            if self.noise_floor_db is None or energy_db < self.noise_floor_db:
+                self.noise_floor_db = energy_db
+            else:
+                self.noise_floor_db += 0.05 * (energy_db - self.noise_floor_db)
+        return speech
+
+    # --- streaming API --------------------------------------------------
+
+    def process(self, pcm):
+        """Feed one chunk of PCM bytes, return the PCM bytes that pass the gate"""
+        self.received_bytes += len(pcm)
+        data = self._remainder + bytes(pcm) if self._remainder else bytes(pcm)
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return b''
+
+        samples = np.frombuffer(data[:usable], dtype=np.int16)
+        energies = frame_energies_db(samples, self.frame_size * self.channels)
+        output = []
+        for index, energy in enumerate(energies):
+            frame = data[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            self._push_frame(frame, self._is_speech(float(energy)), output)
+        return self._emit(output)
+
+    def _push_frame(self, frame, speech, output):
+        self.total_frames += 1
+        if speech:
+            self.speech_frames += 1
+            self.silence_run_frames = 0
+        else:
+            self.silence_run_frames += 1
+
+        if self.in_speech:
+            if speech:
+                output.append(frame)
+            else:
+                self.in_speech = False
+                self._pending = _PendingSilence(self.pause_head_frames, self.pause_tail_frames)
+                self._pending.add(frame)
+            return
+
+        if speech:
+            self._candidate.append(frame)
+            if len(self._candidate) >= self.onset_frames:
+                # Confirmed speech: emit the kept silence, then the onset frames
+                output.extend(self._pending.compressed())
+                output.extend(self._candidate)
+                self._candidate = []
+                self.in_speech = True
+                self.seen_speech = True
+        else:
+            # A too-short burst counts as silence
+            for candidate in self._candidate:
+                self._pending.add(candidate)
+            self._candidate = []
+            self._pending.add(frame)
+
+    def _emit(self, output):
+        data = b''.join(output)
+        self.emitted_bytes += len(data)
+        return data
+
+    def finish(self):
+        """Flush the trailing padding after the last speech and return it"""
+        output = []
+        if self.in_speech:
+            if self._remainder:
+                output.append(self._remainder)
+        elif self.seen_speech:
+            output.extend(self._pending.head[:self.padding_frames])
+        self._remainder = b''
+        self._candidate = []
+        return self._emit(output)
+
+    # --- stats ----------------------------------------------------------
+
+    @property
+    def has_speech(self):
+        return self.seen_speech
+
+    @property
+    def speech_ms(self):
+        return self.speech_frames * self.frame_ms
+
+    @property
+    def trailing_silence_ms(self):
+        """Silence since the last confirmed speech (0 until speech was seen)"""
+        if not self.seen_speech or self.in_speech:
+            return 0
+        return self.silence_run_frames * self.frame_ms
+
+    @property
+    def trimmed_ms(self):
+        bytes_per_ms = self.frame_bytes / float(self.frame_ms)
+        return int(max(0, self.received_bytes - self.emitted_bytes) / bytes_per_ms)
+
+
+def split_at_silence(pcm, rate, channels, max_chunk_bytes, sample_width=2, frame_ms=20, search_fraction=0.25):
+    """Cut PCM into chunks of at most max_chunk_bytes without splitting words.
+
+    Each cut is placed at the quietest point (energy smoothed over ~100 ms)
+    in the last search_fraction of the allowed chunk length. Returns
+    memoryview slices of pcm, so nothing is copied.
+    """
+    view = memoryview(pcm).cast('B')
+    if len(view) <= max_chunk_bytes:
+        return [view]
+    frame_size = max(1, rate * frame_ms // 1000)
+    frame_bytes = frame_size * channels * sample_width
+    max_frames = max(1, max_chunk_bytes // frame_bytes)
+    usable = len(view) - len(view) % (channels * sample_width)
+    energies = frame_energies_db(np.frombuffer(view[:usable], dtype=np.int16), frame_size * channels)
+    smoothing = max(1, 100 // frame_ms)
+
+    chunks = []
+    start = 0
+    while len(view) - start * frame_bytes > max_chunk_bytes:
+        limit = start + max_frames
+        search_start = max(start + 1, limit - max(1, int(max_frames * search_fraction)))
+        window = energies[search_start:limit]
+        if len(window):
+            smoothed = np.convolve(window, np.ones(smoothing) / smoothing, mode='same')
+            cut = search_start + int(np.argmin(smoothed))
+        else:
+            cut = limit
+        chunks.append(view[start * frame_bytes:cut * frame_bytes])
+        start = cut
+    chunks.append(view[start * frame_bytes:])
+    return chunks
@@ -0,0 +1,163 @@
+"""
+Vokabular-Biasing für die erste Erkennung: Whisper-Prompt und Deepgram-Keywords aus Korrektur-Wörterbuch und Benutzervokabular.
+"""
+import difflib
+import math
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+from metrics import metrics
+from word_replacements import dictionaries
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Whisper only reads the last 224 prompt tokens; stay below the limit
+WHISPER_PROMPT_MAX_TOKENS = 200
+# Whisper's prompt tokenizer; without tiktoken the estimate is deliberately conservative
+# (GPT-2 splits rare words and non-ASCII text into short pieces)
+WHISPER_TOKENIZER_ENCODING = "gpt2"
+WHISPER_BYTES_PER_TOKEN_ESTIMATE = 2
+WHISPER_PROMPT_SEPARATOR = ", "
+
+DEEPGRAM_MAX_KEYWORDS = 100
+DEEPGRAM_KEYWORD_BOOST = 2
+
+# Recent transcripts per language that count as context for the ranking
+RECENT_TRANSCRIPTS = 5
+
+# Ranking: user vocabulary ranks above dictionary corrections, mentions in the recent context above both
+VOCABULARY_SCORE = 2
+CORRECTION_SCORE = 1
+CONTEXT_MENTION_SCORE = 3
+MAX_CONTEXT_MENTIONS = 3
+
+WORD = re.compile(r"[\w'.+#-]+")
+
+
+def whisper_token_count(text):
+    """Number of tokens Whisper counts for text as a prompt (estimated when tiktoken is not installed)"""
+    if tiktoken is not None:
+        return len(tiktoken.get_encoding(WHISPER_TOKENIZER_ENCODING).encode(text))
+    return math.ceil(len(text.encode('utf-8')) / WHISPER_BYTES_PER_TOKEN_ESTIMATE)
+
+
+def _words(text):
+    return [word.strip(".-'").lower() for word in WORD.findall(text or '') if word.strip(".-'")]
+
+
+class VocabularyBias:
+    """Terms the recognizers are biased toward, ranked per language.
+
+    Candidates are the user vocabulary of the language and the correct
+    spellings of its correction dictionary (from a DictionaryStore). Terms
+    mentioned in the last RECENT_TRANSCRIPTS transcripts of the language
+    rank first. The ranking is cached until the store reloads or a
+    transcript is noted, so building a request never scans the dictionary.
+    """
+
+    def __init__(self, store=dictionaries):
+        self.store = store
+        self._recent = {}
+        self._context_revision = 0
+        # language -> (cache key, ranked terms)
+        self._ranked = {}
+        self._lock = threading.Lock()
+
+    def note_transcript(self, text, language):
+        """Add a delivered transcript to the recent context of language"""
+        if not text:
+            return
+        with self._lock:
+            self._recent.setdefault(language, deque(maxlen=RECENT_TRANSCRIPTS)).append(text)
+            self._context_revision += 1
+        # Re-rank now, on the delivery thread, instead of when the next request is built
+        self.ranked_terms(language)
+
+    def ranked_terms(self, language):
+        """Candidate terms of language, most relevant first"""
+        key = (self.store.revision, self.store.version_for(language), self._context_revision)
+        cached = self._ranked.get(language)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        start = time.perf_counter()
+        scores = {}
+        for term in self.store.vocabulary_for(language):
+            scores.setdefault(term, VOCABULARY_SCORE)
+        for term in self.store.replacements_for(language).values():
+            scores.setdefault(term, CORRECTION_SCORE)
+        with self._lock:
+            context = ' '.join(self._recent.get(language, ())).lower()
+        if context:
+            for term in scores:
+                mentions = context.count(term.lower())
+                if mentions:
+                    scores[term] += CONTEXT_MENTION_SCORE * min(mentions, MAX_CONTEXT_MENTIONS)
+        # sorted() is stable: equal scores keep the vocabulary/dictionary order
+        terms = sorted(scores, key=lambda term: -scores[term])
+        self._ranked[language] = (key, terms)
+        metrics.observe("bias.rank_ms", (time.perf_counter() - start) * 1000)
+        return terms
+
+    def whisper_prompt(self, language, max_tokens=WHISPER_PROMPT_MAX_TOKENS):
+        """Comma-separated term list for Whisper's prompt parameter ("" without terms)"""
+        selected = []
+        tokens = 0
+        for term in self.ranked_terms(language):
+            term_tokens = whisper_token_count(term + WHISPER_PROMPT_SEPARATOR)
+            if tokens + term_tokens > max_tokens:
+                break
+            selected.append(term)
+            tokens += term_tokens
+        if not selected:
+            return ""
+        # Most relevant last: Whisper weighs the end of the prompt (and truncates from the front)
+        prompt = WHISPER_PROMPT_SEPARATOR.join(reversed(selected)) + "."
+        metrics.observe("bias.whisper_prompt_terms", len(selected))
+        metrics.observe("bias.whisper_prompt_tokens", tokens)
+        return prompt
+
+    def deepgram_keywords(self, language, limit=DEEPGRAM_MAX_KEYWORDS, boost=DEEPGRAM_KEYWORD_BOOST):
+        """Deepgram keywords ("term:boost") for language; phrases are split into words"""
+        keywords = []
+        for term in self.ranked_terms(language):
+            for word in term.split():
+                if word not in keywords:
+                    keywords.append(word)
+            if len(keywords) >= limit:
+                break
+        keywords = keywords[:limit]
+        metrics.observe("bias.deepgram_keywords", len(keywords))
+        return [f"{word}:{boost}" for word in keywords]
+
+    @staticmethod
+    def compare_first_pass(first_pass, final):
+        """Record whether the biased first pass already matches the post-processed text.
+
+        Compares words only (case and punctuation are ignored). Returns the
+        word match ratio (1.0 = same words).
+        """
+        first_words, final_words = _words(first_pass), _words(final)
+        ratio = difflib.SequenceMatcher(None, first_words, final_words, autojunk=False).ratio()
+        metrics.increment("bias.compared")
+        if first_words == final_words:
+            metrics.increment("bias.exact_matches")
+        metrics.observe("bias.word_match_ratio", ratio)
+        match_rate = metrics.get_counter("bias.exact_matches") / metrics.get_counter("bias.compared")
+        metrics.set_gauge("bias.exact_match_rate", match_rate)
+        print(
+            f"🎯 First pass vs. post-processed: {ratio:.0%} same words "
+            f"({match_rate:.0%} of {metrics.get_counter('bias.compared')} dictations matched exactly)",
+            file=sys.stderr
+        )
+        return ratio
+
+
+# Globales Biasing, das alle Service-Instanzen gemeinsam nutzen
+vocabulary = VocabularyBias()
@@ -0,0 +1,335 @@
+"""
+Wort-Ersetzungen für typische Fehlerkennungen: ein kombinierter Trie-Regex je Wörterbuch-Version, ein Durchlauf pro Text.
+Die Wörterbücher je Sprache kommen aus einer vom Benutzer bearbeitbaren Datei, die im Hintergrund überwacht wird.
+"""
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import metrics
+
+# Marks a complete key in the trie
+_END = ''
+
+# Built-in entries; the dictionary file adds to and overrides them
+DEFAULT_REPLACEMENTS = {
+    'de': {
+        "v-test": "Vitest",
+        "v-tests": "Vitest",
+        "package jason": "package.json",
+        "achse": ".exe",
+        "echse": ".exe",
+        "gyra": "Jira",
+        "effektor": "Refactor",
+        "pulverquest": "Pull Request",
+        "konsole locks": "console.log",
+        "juju-id": "UUID",
+        "loks": "Logs",
+        "locken": "loggen",
+        "commentline": "Command Line",
+    },
+}
+
+# Entries under this key apply to every language (including auto-detect)
+ALL_LANGUAGES = '*'
+
+# User-editable dictionary file (settings.json: dictionary_file), .json or .tsv
+DEFAULT_DICTIONARY_FILE = "dictionaries.json"
+# Terms the recognizers should expect, one per line (settings.json: vocabulary_file)
+DEFAULT_VOCABULARY_FILE = "vocabulary.txt"
+DICTIONARY_POLL_SECONDS = 1.0
+
+# Compiled engines kept for dictionary versions that are no longer current
+MAX_CACHED_ENGINES = 32
+
+
+def dictionary_version(replacements):
+    """Fingerprint of a replacement dictionary (entries and their order)"""
+    digest = hashlib.sha1()
+    for wrong, correct in replacements.items():
+        digest.update(f"{wrong}\0{correct}\0".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _normalize(text):
+    # Hyphens match a hyphen or whitespace, so both spellings look up the same entry
+    return re.sub(r'[-\s]', ' ', text.lower())
+
+
+def _escape(char):
+    return r'[-\s]' if char == '-' else re.escape(char)
+
+
+def _trie_pattern(node):
+    """Regex for the keys below node; longer keys are tried first (greedy optional groups)"""
+    branches = [_escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char != _END]
+    if not branches:
+        return ''
+    if len(branches) == 1 and _END not in node:
+        return branches[0]
+    group = '(?:' + '|'.join(branches) + ')'
+    return group + '?' if _END in node else group
+
+
+class ReplacementEngine:
+    """All replacements of one dictionary in a single compiled regex.
+
+    Matching is case-insensitive on word boundaries. Every entry also
+    matches its plural (a trailing "s", unless the entry already ends with
+    one), and a hyphen in an entry matches a hyphen or whitespace, like the
+    patterns the per-entry replacement loop tried one by one. The keys are
+    merged into a trie, so the regex engine walks each position of the text
+    once, whatever the number of entries; the longest matching entry wins.
+    Replacements are applied in one pass, so a replaced word is never
+    matched again by another entry.
+    """
+
+    def __init__(self, replacements):
+        start = time.perf_counter()
+        self.replacements = dict(replacements)
+        # Normalized match -> (entry, replacement); explicit entries take precedence over plurals
+        self._table = {}
+        for wrong, correct in self.replacements.items():
+            self._table.setdefault(_normalize(wrong), (wrong, correct))
+        for wrong, correct in self.replacements.items():
+            if not wrong.endswith('s'):
+                self._table.setdefault(_normalize(wrong) + 's', (wrong, correct))
+
+        trie = {}
+        for wrong in self.replacements:
+            for key in (wrong.lower(), wrong.lower() + 's') if not wrong.endswith('s') else (wrong.lower(),):
+                node = trie
+                for char in key:
+                    node = node.setdefault(char, {})
+                node[_END] = True
+        self.pattern = re.compile(r'\b' + _trie_pattern(trie) + r'\b', re.IGNORECASE) if trie else None
+        metrics.observe("replacements.build_ms", (time.perf_counter() - start) * 1000)
+
+    def __len__(self):
+        return len(self.replacements)
+
+    def apply(self, text):
+        """Return (corrected text, [(entry, replacement), ...] in order of the matches)"""
+        if not text or self.pattern is None:
+            return text, []
+        replaced = []
+
+        def substitute(match):
+            entry = self._table.get(_normalize(match.group(0)))
+            if entry is None:
+                return match.group(0)
+            replaced.append(entry)
+            return entry[1]
+
+        with metrics.timer("replacements.apply_ms"):
+            corrected = self.pattern.sub(substitute, text)
+        return corrected, replaced
+
+
+# Compiled engines by dictionary version, shared by all service instances
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def get_engine(replacements, version=None):
+    """Compiled ReplacementEngine for replacements, built once per dictionary version"""
+    version = version or dictionary_version(replacements)
+    with _engines_lock:
+        engine = _engines.get(version)
+        if engine is not None:
+            _engines.move_to_end(version)
+            return engine
+    engine = ReplacementEngine(replacements)
+    with _engines_lock:
+        engine = _engines.setdefault(version, engine)
+        while len(_engines) > MAX_CACHED_ENGINES:
+            _engines.popitem(last=False)
+    return engine
+
+
+def load_dictionary_file(path):
+    """Read a dictionary file into {language: {wrong: correct}}.
+
+    JSON: {"de": {"package jason": "package.json"}, "*": {...}}
+    TSV: one "language<TAB>wrong<TAB>correct" entry per line, # starts a comment
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith('.tsv'):
+            dictionaries = {}
+            for line_number, row in enumerate(csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE), 1):
+                if not row or not row[0].strip() or row[0].lstrip().startswith('#'):
+                    continue
+                if len(row) != 3:
+                    raise ValueError(f"{path}:{line_number}: expected language, wrong and correct separated by tabs")
+                language, wrong, correct = (field.strip() for field in row)
+                dictionaries.setdefault(language, {})[wrong] = correct
+            return dictionaries
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(entries, dict) for entries in data.values()):
+        raise ValueError(f"{path}: expected an object of language -> {{wrong: correct}}")
+    return {language: {str(wrong): str(correct) for wrong, correct in entries.items()} for language, entries in data.items()}
+
+
+def load_vocabulary_file(path):
+    """Read a vocabulary file into {language: [term, ...]}.
+
+    One term per line, optionally "language<TAB>term" (otherwise it applies
+    to every language); # starts a comment.
+    """
+    vocabulary = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            language, _, term = line.rpartition('\t')
+            vocabulary.setdefault(language.strip() or ALL_LANGUAGES, []).append(term.strip())
+    return vocabulary
+
+
+class DictionaryStore:
+    """Per-language correction dictionaries with their compiled engines.
+
+    The dictionary of a language is the built-in entries, then the file's
+    "*" entries, then the file's entries for the language (later ones
+    override). watch() polls the file from a daemon thread; on a change it
+    is parsed and only languages whose entries changed are recompiled, in
+    that thread. Until a new engine is published, replacements keep using
+    the previous one, so dictation never waits for a recompile. A file
+    that fails to parse leaves the current dictionaries in place. The
+    optional vocabulary file (terms without a correction, for vocabulary
+    biasing) is watched and reloaded along with it; revision counts the
+    reloads.
+    """
+
+    def __init__(self, defaults=DEFAULT_REPLACEMENTS):
+        self.defaults = defaults
+        self.path = None
+        self.vocabulary_path = None
+        self.revision = 0
+        self._file_entries = {}
+        self._vocabulary = {}
+        # language -> (replacements, version, engine); replaced as a whole on reload
+        self._published = {}
+        self._lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    def replacements_for(self, language):
+        """Merged dictionary of language (built-ins, "*" entries, language entries)"""
+        return self._entry(language)[0]
+
+    def version_for(self, language):
+        """Fingerprint of the current dictionary of language"""
+        return self._entry(language)[1]
+
+    def vocabulary_for(self, language):
+        """User vocabulary of language ("*" terms first), without duplicates"""
+        terms = self._vocabulary.get(ALL_LANGUAGES, []) + (self._vocabulary.get(language, []) if language != ALL_LANGUAGES else [])
+        return list(dict.fromkeys(terms))
+
+    def apply(self, text, language):
+        """Return (corrected text, [(wrong, correct), ...]) using the current dictionary of language"""
+        engine = self._entry(language)[2]
+        return engine.apply(text)
+
+    def _entry(self, language):
+        entry = self._published.get(language)
+        if entry is None:
+            # First use of a language: built from the entries already loaded
+            with self._lock:
+                entry = self._published.get(language)
+                if entry is None:
+                    entry = self._published[language] = self._compile(language, self._file_entries)
+        return entry
+
+    def _merged(self, language, file_entries):
+        replacements = dict(self.defaults.get(language, {}))
+        replacements.update(file_entries.get(ALL_LANGUAGES, {}))
+        if language != ALL_LANGUAGES:
+            replacements.update(file_entries.get(language, {}))
+        return replacements
+
+    def _compile(self, language, file_entries):
+        replacements = self._merged(language, file_entries)
+        version = dictionary_version(replacements)
+        return replacements, version, get_engine(replacements, version)
+
+    def reload(self):
+        """Re-read the dictionary and vocabulary files and recompile the languages whose entries changed"""
+        start = time.perf_counter()
+        try:
+            file_entries = load_dictionary_file(self.path) if self.path and os.path.exists(self.path) else {}
+            vocabulary = (
+                load_vocabulary_file(self.vocabulary_path)
+                if self.vocabulary_path and os.path.exists(self.vocabulary_path) else {}
+            )
+        except (OSError, ValueError) as e:
+            metrics.increment("dictionaries.reload_errors")
+            print(f"⚠️ Dictionary file not loaded, keeping the current dictionaries: {str(e)}", file=sys.stderr)
+            return
+        # "*" is compiled too: languages without entries of their own share its engine
+        languages = set(self._published) | set(self.defaults) | set(file_entries) | {ALL_LANGUAGES}
+        published = {}
+        for language in languages:
+            current = self._published.get(language)
+            replacements = self._merged(language, file_entries)
+            if current is not None and current[0] == replacements:
+                published[language] = current
+            else:
+                published[language] = self._compile(language, file_entries)
+        with self._lock:
+            self._file_entries = file_entries
+            self._vocabulary = vocabulary
+            self._published = published
+            self.revision += 1
+        entries = sum(len(entries) for entries in file_entries.values())
+        terms = sum(len(terms) for terms in vocabulary.values())
+        metrics.set_gauge("dictionaries.entries", entries)
+        metrics.set_gauge("dictionaries.vocabulary_terms", terms)
+        metrics.observe("dictionaries.reload_ms", (time.perf_counter() - start) * 1000)
+        print(f"📖 Dictionaries loaded: {entries} entries from {self.path or 'built-ins only'}, {terms} vocabulary terms", file=sys.stderr)
+
+    def watch(self, path=DEFAULT_DICTIONARY_FILE, vocabulary_path=None, interval=DICTIONARY_POLL_SECONDS):
+        """Load the files in the background and reload them whenever they change (call again to switch files)"""
+        self.stop()
+        self.path = path
+        self.vocabulary_path = vocabulary_path
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(
+            target=self._watch, args=((path, vocabulary_path), interval, self._stop), name="dictionary-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, paths, interval, stop):
+        last_seen = ()  # always load once, also when the files do not exist (yet)
+        while not stop.is_set():
+            seen = []
+            for path in paths:
+                try:
+                    stat = os.stat(path) if path else None
+                    seen.append((stat.st_mtime_ns, stat.st_size) if stat else None)
+                except OSError:
+                    seen.append(None)
+            seen = tuple(seen)
+            if seen != last_seen:
+                last_seen = seen
+                # Let the editor finish writing before the file is parsed
+                if not stop.wait(min(interval, 0.2)):
+                    self.reload()
+            stop.wait(interval)
+
+    def stop(self):
+        """Stop watching the files"""
+        self._stop.set()
+        self._watcher = None
+
+
+# Globale Wörterbücher, die alle Service-Instanzen gemeinsam nutzen
+dictionaries = DictionaryStore()